@@ -1,130 +1,261 @@
 from abc import ABCMeta, abstractmethod
-from collections import deque
-from itertools import islice
-from typing import Generator, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, islice
+from threading import BoundedSemaphore, Condition
+from typing import Callable, Generator, List, Optional
 
 
 from env import QuerybookSettings
-from lib.utils.csv import string_to_csv, LINE_TERMINATOR, split_csv_to_chunks
+from lib.utils.compression import StreamDecompressor
+from lib.utils.csv import str_to_csv_iter, LINE_TERMINATOR_BYTES, CSVRowEndFinder
+from lib.utils.utf8 import split_by_last_invalid_utf8_char
 
 
 class FileDoesNotExist(Exception):
     pass
 
 
+class UploadPipeline(object):
+    """Runs the upload calls in background threads so the caller
+    can keep fetching data while the previous chunks are sent.
+    Submitting blocks if max_in_flight calls are not done yet,
+    which bounds the memory held by pending chunks.
+    """
+
+    def __init__(self, max_workers: int, max_in_flight: int = None):
+        max_in_flight = max(max_in_flight or max_workers, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = BoundedSemaphore(max_in_flight)
+        # Only the calls that are not done yet are kept, the first
+        # failure is recorded by the done callback
+        self._futures = set()
+        self._exception = None
+        self._done = Condition()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        self.raise_if_failed()
+
+        self._in_flight.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._in_flight.release()
+            raise
+        with self._done:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        with self._done:
+            self._futures.discard(future)
+            if self._exception is None and not future.cancelled():
+                self._exception = future.exception()
+            self._done.notify_all()
+        self._in_flight.release()
+
+    def raise_if_failed(self):
+        if self._exception is not None:
+            raise self._exception
+
+    def wait(self):
+        """Wait for all submitted calls, raises the first
+        exception if any of them failed
+        """
+        with self._done:
+            self._done.wait_for(lambda: not self._futures)
+            exception, self._exception = self._exception, None
+        if exception is not None:
+            raise exception
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def decode_buffer(buffer: bytearray, end: int) -> str:
+    """Decode buffer[:end] as utf-8 without copying the bytes first"""
+    with memoryview(buffer)[:end] as view:
+        return str(view, "utf-8")
+
+
 class ChunkReader(metaclass=ABCMeta):
     def __init__(
         self,
         read_size=QuerybookSettings.STORE_READ_SIZE,
         max_read_size=QuerybookSettings.STORE_MAX_READ_SIZE,
+        compression: Optional[str] = None,
     ):
         # The chunk read size
         self._read_size = read_size
-        # Max number of chars we will read
+        # Max number of bytes we will read
         self._max_read_size = max_read_size
+        # Set if the file is stored compressed
+        self._decompressor = (
+            StreamDecompressor(compression) if compression is not None else None
+        )
 
-        self._num_char_read = 0
+        self._num_bytes_read = 0
         self._eof = False
-        self._buffer_deque = deque([])
-        self._raw_buffer = ""
+        # Bytes read but not returned yet, reused across reads.
+        # Only the bytes returned are decoded to string
+        self._buffer = bytearray()
+        # Incomplete utf-8 char at the end of the last read()
+        self._left_over_bytes = b""
 
     def get_csv_iter(self, number_of_lines=None):
-        csv_line_count = 0
-        partial_csv_lines = []
-        for csv_chunk in self._read_csv_chunk():
-            valid_csv_chunk, partial_csv_lines = split_csv_to_chunks(
-                partial_csv_lines + csv_chunk
-            )
-            if len(valid_csv_chunk) == 0:
-                continue
-
-            csv_chunk_str = LINE_TERMINATOR.join(valid_csv_chunk)
-            csv = string_to_csv(csv_chunk_str)
+        csv_iter = chain.from_iterable(map(str_to_csv_iter, self._read_csv_chunk()))
+        return islice(csv_iter, number_of_lines)
 
-            if number_of_lines is None:
-                yield from csv
+    def _read_csv_chunk(self) -> Generator[str, None, None]:
+        """
+        Read the file by chunks of complete CSV rows, the incomplete
+        row at the end of a read is kept in the buffer for the next chunk
+        """
+        row_end_finder = CSVRowEndFinder()
+        buffer = self._buffer
+        while not self._eof:
+            raw = self.read_decompressed_bytes()
+            if len(raw) == 0:
+                self._eof = True
+                # The last row may not end with a line terminator,
+                # it is dropped if it ends inside a quoted cell
+                if row_end_finder.is_inside_cell:
+                    break
+                row_end = len(buffer)
             else:
-                rows_to_yield = min(len(csv), number_of_lines - csv_line_count)
-                csv_line_count += rows_to_yield
-                yield from islice(csv, rows_to_yield)
+                search_start = len(buffer)
+                buffer.extend(raw)
+                row_end = row_end_finder.find_last_row_end(buffer, search_start)
+                if row_end == -1:
+                    continue
 
-                if csv_line_count >= number_of_lines:
-                    break
+            row_end = self._limit_csv_chunk(row_end)
+            if row_end > 0:
+                yield decode_buffer(buffer, row_end)
+            # Remove the rows and their line terminator
+            del buffer[: row_end + 1]
 
-    def _read_csv_chunk(self) -> Generator[List[str], None, None]:
+    def _limit_csv_chunk(self, row_end: int) -> int:
         """
-        Similar to read_line, get the entire chunk of buffer_deque and process
-        them together as CSV
+        Count the bytes read and cut the rows in the buffer
+        to the ones that fit in the max read size
         """
-        while (not self._eof) or len(self._buffer_deque):
-            if len(self._buffer_deque) > 0:
-                line_chunks = []
-                while len(self._buffer_deque) > 0:
-                    line_chunks.append(self._buffer_deque.popleft())
-                yield line_chunks
+        self._num_bytes_read += row_end
+        if self._max_read_size is None or self._num_bytes_read <= self._max_read_size:
+            return row_end
 
-            # If not at the end, perform another round of loading
-            if not self._eof:
-                self._fill_buffer()
+        # We read enough, trigger a fake eof
+        self._eof = True
+        bytes_left = self._max_read_size - (self._num_bytes_read - row_end)
+        last_row_end = CSVRowEndFinder().find_last_row_end(
+            self._buffer, 0, bytes_left + 1
+        )
+        return max(last_row_end, 0)
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        """
+        Read the rest of the file chunk by chunk, max_read_size
+        is not applied. Should not be mixed with the line reads
+        """
+        while True:
+            raw = self.read()
+            if len(raw) == 0:
+                break
+            yield raw
 
     def read_lines(self, number_of_lines=None) -> List[str]:
         return [line for line in islice(self.read_line(), number_of_lines)]
 
     def read_line(self):  # generator
-        while (not self._eof) or len(self._buffer_deque):
-            if len(self._buffer_deque) > 0:
-                yield self._buffer_deque.popleft()
-            elif not self._eof:
-                self._fill_buffer()
-
-    def _fill_buffer(self):
-        raw = self.read()
-        if len(raw):
-            rawLines = raw.split(LINE_TERMINATOR)
-            rawLines[0] = self._raw_buffer + rawLines[0]
-            for line in rawLines[:-1]:
-                # Update how many chars are read
-                line_len = len(line)
-                self._num_char_read += line_len
-
-                # If we read enough, break
-                if (
-                    self._max_read_size is not None
-                    and self._num_char_read > self._max_read_size
-                ):
-                    self._trigger_eof(real_eof=False)
-                    return
-
-                self._buffer_deque.append(line)
-            self._raw_buffer = rawLines[-1]
-        else:
-            self._trigger_eof()
-
-    def _trigger_eof(self, real_eof=True):
-        # We can have real_eof which means we actually reached the end of file
-        # or fake eof when we read enough data
-        self._eof = True
-        if real_eof and len(self._raw_buffer):
-            self._num_char_read += len(self._raw_buffer)
+        buffer = self._buffer
+        search_start = 0
+        while True:
+            line_end = buffer.find(LINE_TERMINATOR_BYTES, search_start)
+            if line_end == -1:
+                if self._eof:
+                    break
+
+                search_start = len(buffer)
+                raw = self.read_decompressed_bytes()
+                if len(raw):
+                    buffer.extend(raw)
+                    continue
+
+                # The last line does not end with a line terminator
+                self._eof = True
+                if len(buffer) == 0:
+                    break
+                line_end = len(buffer)
+
+            # Update how many bytes are read
+            self._num_bytes_read += line_end
+            # If we read enough, stop
             if (
-                self._max_read_size is None
-                or self._num_char_read <= self._max_read_size
+                self._max_read_size is not None
+                and self._num_bytes_read > self._max_read_size
             ):
-                self._buffer_deque.append(self._raw_buffer)
+                self._eof = True
+                break
+
+            line = decode_buffer(buffer, line_end)
+            del buffer[: line_end + 1]
+            search_start = 0
+            yield line
 
     @abstractmethod
-    def read(self) -> str:
+    def read_bytes(self) -> bytes:
         """
-           Get string from the last read,
+           Get the raw bytes from the last read, without any decoding.
            It is expected that the size returned it equal to self._read_size but
            not required.
 
-           Return empty string when reaching eof
+           Return empty bytes when reaching eof
 
         Raises:
             NotImplementedError: Must be implemented by the child class
 
         Returns:
-            str -- The raw string from file
+            bytes -- The raw bytes from file
         """
         raise NotImplementedError()
+
+    def read_decompressed_bytes(self) -> bytes:
+        """
+           Same as read_bytes, but decompressed if the file is compressed.
+           The returned size can differ from self._read_size
+
+           Return empty bytes when reaching eof
+
+        Returns:
+            bytes -- The decompressed bytes from file
+        """
+        if self._decompressor is None:
+            return self.read_bytes()
+
+        while True:
+            raw = self.read_bytes()
+            if len(raw) == 0:
+                return self._decompressor.flush()
+
+            data = self._decompressor.decompress(raw)
+            if len(data):
+                return data
+
+    def read(self) -> str:
+        """
+           Get string from the next read, the incomplete utf-8 char
+           at the end of the bytes read is kept for the next read
+
+           Return empty string when reaching eof
+
+        Returns:
+            str -- The decoded string from file
+        """
+        while True:
+            raw = self.read_decompressed_bytes()
+            valid_raw, self._left_over_bytes = split_by_last_invalid_utf8_char(
+                self._left_over_bytes + raw
+            )
+            # Read again if the bytes were only part of a char
+            if len(valid_raw) or len(raw) == 0:
+                return valid_raw.decode("utf-8")
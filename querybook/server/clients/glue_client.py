@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import boto3
 from env import QuerybookSettings
@@ -88,12 +88,13 @@ class GlueDataCatalogClient:
             CatalogId=self.catalog_id, DatabaseName=db_name, Name=tb_name
         )
 
-    def get_partitions(self, db_name, tb_name):
+    def get_partitions(self, db_name, tb_name, expression: str = None):
         """
         Gets partition information for db_name.tb_name from the Glue Data Catalog
 
         :param db_name: The name of the database
         :param tb_name: The name of the table
+        :param expression: Filter applied by Glue on the partitions e.g. "dt='2016-03-14'"
         :return: The Glue partition objects of db_name.tb_name
         """
         _LOG.info(f"Get Glue partitions for ${db_name}.${tb_name}")
@@ -102,9 +103,15 @@ class GlueDataCatalogClient:
         partition_list = []
         result = {}
 
-        for page in paginator.paginate(
-            CatalogId=self.catalog_id, DatabaseName=db_name, TableName=tb_name
-        ):
+        paginate_params = {
+            "CatalogId": self.catalog_id,
+            "DatabaseName": db_name,
+            "TableName": tb_name,
+        }
+        if expression:
+            paginate_params["Expression"] = expression
+
+        for page in paginator.paginate(**paginate_params):
             partition_list.extend(page.get("Partitions", []))
 
         result["Partitions"] = partition_list
@@ -157,3 +164,42 @@ class GlueDataCatalogClient:
             )
 
         return result
+
+    def get_latest_hms_style_partition(
+        self, db_name, tb_name, conditions: Dict[str, str] = None
+    ) -> Optional[str]:
+        """
+        Gets the latest partition of db_name.tb_name from Glue Data Catalog in a Hive Metastore
+        style representation. The conditions are applied by Glue, so only the matching
+        partitions are fetched
+
+        :param db_name: The name of the database
+        :param tb_name: The name of the table
+        :param conditions: Filter conditions for the partition in the format { dt: '2016-03-14'}
+        :return: The greatest partition (in the order of the Hive Metastore) in the format
+                 'dt=2016-03-14/hr=00', None if there is no partition
+        """
+        _LOG.info(f"Get latest hms style partition for ${db_name}.${tb_name}")
+
+        table = self.get_table(db_name, tb_name)
+        partition_key_names = [
+            partition_key.get("Name")
+            for partition_key in table.get("Table").get("PartitionKeys")
+        ]
+
+        expression = (
+            " AND ".join(f"{key}='{value}'" for key, value in conditions.items())
+            if conditions
+            else None
+        )
+        partitions = self.get_partitions(db_name, tb_name, expression)
+
+        # Glue does not sort the partitions
+        partition_names = [
+            "/".join(
+                key_name + "=" + value
+                for key_name, value in zip(partition_key_names, partition.get("Values"))
+            )
+            for partition in partitions.get("Partitions")
+        ]
+        return max(partition_names) if partition_names else None
@@ -6,7 +6,7 @@ from urllib.parse import quote
 import requests
 
 from env import QuerybookSettings
-from .common import ChunkReader, FileDoesNotExist
+from .common import ChunkReader, FileDoesNotExist, UploadPipeline
 from lib.utils.utils import DATETIME_TO_UTC
 
 
@@ -41,11 +41,7 @@ def get_google_oauth_config():
 
 # Reference used: https://dev.to/sethmlarson/python-data-streaming-to-google-cloud-storage-with-resumable-uploads-458h
 class GoogleUploadClient(object):
-    def __init__(
-        self,
-        bucket_name: str,
-        blob_name: str,
-    ):
+    def __init__(self, bucket_name: str, blob_name: str, content_encoding: str = None):
         from google.cloud import storage
         from google.auth.transport import requests
 
@@ -55,6 +51,7 @@ class GoogleUploadClient(object):
         self._blob = self._bucket.blob(blob_name)
 
         self._chunk_size = QuerybookSettings.STORE_MIN_UPLOAD_CHUNK_SIZE
+        self._content_encoding = content_encoding
 
         self._transport = requests.AuthorizedSession(
             credentials=self._client._credentials
@@ -67,23 +64,58 @@ class GoogleUploadClient(object):
         self._stream = BytesIO()
         self._bytes_written = 0
 
+        # Data not yet handed to the background transmission
+        self._pending = []
+        self._pending_size = 0
+        # Resumable upload chunks must be sent in order, so only one worker
+        # is used, but the next chunks can be buffered while it transmits
+        self._pipeline = UploadPipeline(
+            max_workers=1,
+            max_in_flight=QuerybookSettings.STORE_MAX_CONCURRENT_UPLOADS,
+        )
+
         url = (
             f"https://www.googleapis.com/upload/storage/v1/b/"
             f"{self._bucket.name}/o?uploadType=resumable"
         )
+        metadata = {"name": self._blob.name}
+        if self._content_encoding is not None:
+            metadata["contentEncoding"] = self._content_encoding
+
         self._request = ResumableUpload(upload_url=url, chunk_size=self._chunk_size)
         self._request.initiate(
             transport=self._transport,
             content_type="application/octet-stream",
             stream=self._stream,
             stream_final=False,
-            metadata={"name": self._blob.name},
+            metadata=metadata,
         )
 
     def stop(self):
+        try:
+            if self._pending_size > 0:
+                self._submit_pending()
+            self._pipeline.wait()
+        finally:
+            self._pipeline.shutdown()
         self._request.transmit_next_chunk(self._transport)
 
     def write(self, data: bytes):
+        data_len = len(data)
+        self._pending.append(data)
+        self._pending_size += data_len
+
+        if self._pending_size > self._chunk_size:
+            self._submit_pending()
+        return data_len
+
+    def _submit_pending(self):
+        data = b"".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._pipeline.submit(self._transmit, data)
+
+    def _transmit(self, data: bytes):
         from google.resumable_media import common
 
         # Get the current stream pos
@@ -91,12 +123,11 @@ class GoogleUploadClient(object):
 
         # Move cursor to end for writing
         self._stream.seek(0, SEEK_END)
-        data_len = len(data)
         self._stream.write(data)
 
         # Move it back to original position
         self._stream.seek(cur_pos)
-        self._bytes_written += data_len
+        self._bytes_written += len(data)
 
         bytes_in_buffer = self._bytes_written - self._stream.tell()
         while bytes_in_buffer > self._chunk_size:
@@ -105,7 +136,6 @@ class GoogleUploadClient(object):
             except common.InvalidResponse:
                 self._request.recover(self._transport)
             bytes_in_buffer = self._bytes_written - self._stream.tell()
-        return data_len
 
 
 class GoogleDownloadClient(ChunkReader):
@@ -115,10 +145,12 @@ class GoogleDownloadClient(ChunkReader):
         blob_name,
         read_size=QuerybookSettings.STORE_READ_SIZE,
         max_read_size=QuerybookSettings.STORE_MAX_READ_SIZE,
+        compression=None,
+        byte_offset=0,
     ):
         from google.cloud import storage
         from google.auth.transport.requests import AuthorizedSession
-        from google.resumable_media.requests import ChunkedDownload
+        from google.resumable_media.requests import ChunkedDownload, RawChunkedDownload
 
         # First check for existence
         cred = get_google_credentials()
@@ -139,13 +171,20 @@ class GoogleDownloadClient(ChunkReader):
             f"{bucket_name}/o/{quote(blob_name, safe='')}?alt=media"
         )
 
-        self._download = ChunkedDownload(download_url, read_size, self._stream)
+        # Compressed blobs are stored with a Content-Encoding, the raw download
+        # keeps them compressed instead of decoding each chunk separately
+        download_class = RawChunkedDownload if compression else ChunkedDownload
+        self._download = download_class(
+            download_url, read_size, self._stream, start=byte_offset
+        )
 
-        super(GoogleDownloadClient, self).__init__(read_size, max_read_size)
+        super(GoogleDownloadClient, self).__init__(
+            read_size, max_read_size, compression
+        )
 
-    def read(self):
+    def read_bytes(self) -> bytes:
         if self._download.finished:
-            return ""
+            return b""
         self._download.consume_next_chunk(self._transport)
         self._stream.seek(0)
         content = self._stream.read()
@@ -154,7 +193,7 @@ class GoogleDownloadClient(ChunkReader):
         self._stream.seek(0)
         self._stream.truncate(0)
 
-        return content.decode("utf-8")
+        return content
 
 
 class GoogleKeySigner(object):
@@ -1,6 +1,7 @@
 import random
 import time
-from typing import List
+from typing import Dict, List, Optional
+from urllib.parse import unquote
 from thrift.transport.TTransport import TTransportException
 from socket import error as SocketError
 
@@ -269,6 +270,54 @@ class HiveMetastoreClient:
             lambda: self._read_client.get_partition_names(db_name, tb_name, -1)
         )
 
+    def get_latest_partition(
+        self, db_name: str, tb_name: str, conditions: Dict[str, str] = None
+    ) -> Optional[str]:
+        """
+        Queries the hive metastore DB for the latest partition of the table. Only the partition
+        names are fetched, the conditions are applied on the names instead of using
+        get_partitions_by_filter which returns the whole partition objects
+
+        Args:
+            db_name: The name of the db
+            tb_name: The name of the table
+            conditions: Filter conditions for the partition in the format { dt: '2016-03-14'}
+
+        Returns: The last matching partition in the format 'dt=2016-03-14/hr=00', None if there is none
+        """
+        _LOG.info("Get latest partition of %s.%s", db_name, tb_name)
+        # Partition names are sorted in ascending order
+        partition_names = self._perform_read_op(
+            lambda: self._read_client.get_partition_names(db_name, tb_name, -1)
+        )
+        for partition_name in reversed(partition_names or []):
+            if not conditions:
+                return partition_name
+
+            partition_values = get_values_from_partition_name(partition_name)
+            if all(
+                partition_values.get(key) == str(value)
+                for key, value in conditions.items()
+            ):
+                return partition_name
+        return None
+
+
+def get_values_from_partition_name(partition_name: str) -> Dict[str, str]:
+    """Returns the partition keys and values of the partition name
+
+    Args:
+        partition_name {str} -- Partition name escaped by the hive metastore e.g. "dt=2021-01-01/hr=01"
+
+    Returns:
+        Dict[str, str] -- Partition key to value e.g. {"dt": "2021-01-01", "hr": "01"}
+    """
+    partition_values = {}
+    for partition_col in partition_name.split("/"):
+        key, _, value = partition_col.partition("=")
+        partition_values[unquote(key)] = unquote(value)
+    return partition_values
+
 
 def format_partition_from_keys_and_values(
     partition_keys: List[str], partition_values: List[str]
@@ -1,22 +1,32 @@
+from typing import Union
+
 import boto3
 import botocore
 from botocore.client import Config
 
 from env import QuerybookSettings
-from lib.utils.utf8 import split_by_last_invalid_utf8_char
 
-from .common import ChunkReader, FileDoesNotExist
+from .common import ChunkReader, FileDoesNotExist, UploadPipeline
 
 
 class MultiPartUploader(object):
-    def __init__(self, bucket_name, key):
+    def __init__(self, bucket_name, key, content_encoding=None):
         self._bucket_name = bucket_name
         self._key = key
         self._s3 = boto3.client("s3")
-        self._mpu = self._s3.create_multipart_upload(Bucket=bucket_name, Key=key)
+
+        upload_params = {}
+        if content_encoding is not None:
+            upload_params["ContentEncoding"] = content_encoding
+        self._mpu = self._s3.create_multipart_upload(
+            Bucket=bucket_name, Key=key, **upload_params
+        )
         self._parts = []
         self._part_number = 1
 
+        # Parts are uploaded in the background while the next ones are written
+        self._pipeline = UploadPipeline(QuerybookSettings.STORE_MAX_CONCURRENT_UPLOADS)
+
         self.chunk = []
         self.chunk_datasize = 0
         self.is_first_upload = True
@@ -25,24 +35,33 @@ class MultiPartUploader(object):
         if self._part_number > QuerybookSettings.STORE_MAX_UPLOAD_CHUNK_NUM:
             return
 
+        try:
+            self._pipeline.submit(self._send_part, self._part_number, body)
+        except Exception:
+            # A previous part failed, the upload can't be completed
+            self._abort()
+            raise
+        self._part_number += 1
+
+    def _send_part(self, part_number, body):
         part = self._s3.upload_part(
             Bucket=self._bucket_name,
             Key=self._key,
-            PartNumber=self._part_number,
+            PartNumber=part_number,
             UploadId=self._mpu["UploadId"],
             Body=body,
         )
 
         self._parts.append(
-            {"PartNumber": self._part_number, "ETag": part["ETag"].replace('"', "")}
+            {"PartNumber": part_number, "ETag": part["ETag"].replace('"', "")}
         )
-        self._part_number += 1
 
-    def write(self, string: str) -> bool:
-        """Write a string to upload
+    def write(self, data: Union[str, bytes]) -> bool:
+        """Write a string or bytes to upload
 
         Arguments:
-            string {str} -- the string to upload
+            data {Union[str, bytes]} -- the string/bytes to upload,
+                                        strings are utf-8 encoded
 
         Returns:
             bool -- Whether or not the upload is successful
@@ -50,10 +69,13 @@ class MultiPartUploader(object):
         if self._part_number > QuerybookSettings.STORE_MAX_UPLOAD_CHUNK_NUM:
             return False
 
-        self.chunk.append(string)
-        self.chunk_datasize += len(string)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self.chunk.append(data)
+        self.chunk_datasize += len(data)
         if self.chunk_datasize > QuerybookSettings.STORE_MIN_UPLOAD_CHUNK_SIZE:
-            self._upload_part("".join(self.chunk))
+            self._upload_part(b"".join(self.chunk))
             self.chunk = []
             self.chunk_datasize = 0
         return True
@@ -61,14 +83,31 @@ class MultiPartUploader(object):
     def write_line(self, string: str):
         self.write(string + "\n")
 
+    def _abort(self):
+        self._pipeline.shutdown()
+        self._s3.abort_multipart_upload(
+            Bucket=self._bucket_name,
+            Key=self._key,
+            UploadId=self._mpu["UploadId"],
+        )
+
     def complete(self):
         if len(self.chunk) > 0:
-            self._upload_part("".join(self.chunk))
+            self._upload_part(b"".join(self.chunk))
+        try:
+            self._pipeline.wait()
+        except Exception:
+            self._abort()
+            raise
+        self._pipeline.shutdown()
+
         self._s3.complete_multipart_upload(
             Bucket=self._bucket_name,
             Key=self._key,
             UploadId=self._mpu["UploadId"],
-            MultipartUpload={"Parts": self._parts},
+            MultipartUpload={
+                "Parts": sorted(self._parts, key=lambda part: part["PartNumber"])
+            },
         )
 
 
@@ -108,18 +147,22 @@ class S3FileReader(ChunkReader):
         key,
         read_size=QuerybookSettings.STORE_READ_SIZE,
         max_read_size=QuerybookSettings.STORE_MAX_READ_SIZE,
+        compression=None,
+        byte_offset=0,
     ):
         self._bucket_name = bucket_name
         self._key = key
-        self._left_over_bytes = b""
 
-        super(S3FileReader, self).__init__(read_size, max_read_size)
+        super(S3FileReader, self).__init__(read_size, max_read_size, compression)
 
         # Now connect to s3 using boto3
         try:
             self._s3 = boto3.resource("s3")
             self._object = self._s3.Object(self._bucket_name, key)
-            self._body = self._object.get()["Body"]
+            get_params = {}
+            if byte_offset > 0:
+                get_params["Range"] = f"bytes={byte_offset}-"
+            self._body = self._object.get(**get_params)["Body"]
         except botocore.exceptions.ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 raise FileDoesNotExist(
@@ -128,7 +171,5 @@ class S3FileReader(ChunkReader):
             else:
                 raise e
 
-    def read(self):
-        raw = self._left_over_bytes + self._body.read(self._read_size)
-        valid_raw, self._left_over_bytes = split_by_last_invalid_utf8_char(raw)
-        return valid_raw.decode("utf-8")
+    def read_bytes(self) -> bytes:
+        return self._body.read(self._read_size)
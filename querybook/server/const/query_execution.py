@@ -41,3 +41,17 @@ class QueryEngineStatus(Enum):
 
 
 QUERY_EXECUTION_NAMESPACE = "/query_execution"
+
+
+class QueryExecutionPriority(Enum):
+    INTERACTIVE = "interactive"  # Run by users in the editor/datadoc
+    SCHEDULED = "scheduled"  # Run by scheduled datadocs
+    SAMPLE = "sample"  # Table samples
+
+
+# Share of the query slots of each priority when all of them are waiting
+QUERY_EXECUTION_PRIORITY_WEIGHTS = {
+    QueryExecutionPriority.INTERACTIVE: 4,
+    QueryExecutionPriority.SAMPLE: 2,
+    QueryExecutionPriority.SCHEDULED: 1,
+}
@@ -1,3 +1,4 @@
+import datetime
 from typing import Dict
 
 from flask import abort, Response, redirect
@@ -14,13 +15,19 @@ from app.auth.permission import (
 from clients.common import FileDoesNotExist
 from lib.export.all_exporters import ALL_EXPORTERS, get_exporter
 from lib.result_store import GenericReader
+from lib.result_store.preview_cache import get_result_preview, set_result_preview
 from lib.query_analysis.templating import (
     QueryTemplatingError,
     get_templated_variables_in_string,
     render_templated_query,
 )
 from lib.form import validate_form
-from const.query_execution import QueryExecutionExportStatus, QueryExecutionStatus
+from lib.query_executor.live_log import get_live_logs
+from const.query_execution import (
+    QueryExecutionExportStatus,
+    QueryExecutionStatus,
+    StatementExecutionStatus,
+)
 from const.datasources import RESOURCE_NOT_FOUND_STATUS_CODE
 from logic import query_execution as logic, datadoc as datadoc_logic, user as user_logic
 from logic.datadoc_permission import user_can_read
@@ -113,6 +120,16 @@ def cancel_query_execution(query_execution_id):
             requestor == execution_dict["uid"], "You can only cancel your own queries"
         )
 
+        if execution.status == QueryExecutionStatus.INITIALIZED:
+            # The query may wait in the queue of the query scheduler, the
+            # task state is overwritten each time the task is retried
+            logic.update_query_execution(
+                query_execution_id,
+                status=QueryExecutionStatus.CANCEL,
+                completed_at=datetime.datetime.utcnow(),
+                session=session,
+            )
+
         if execution_dict and "task_id" in execution_dict:
             task = run_query_task.AsyncResult(execution_dict["task_id"])
             if task is not None:
@@ -186,6 +203,13 @@ def get_query_execution_error(query_execution_id):
         return logic.get_query_execution_error(query_execution_id, session=session)
 
 
+def stream_reader_raw(reader: GenericReader):
+    try:
+        yield from reader.get_raw_iter()
+    finally:
+        reader.end()
+
+
 @register(
     "/statement_execution/<int:statement_execution_id>/result/download/",
     methods=["GET"],
@@ -214,10 +238,9 @@ def download_statement_execution_result(statement_execution_id):
             download_url = reader.get_download_url(custom_name=download_file_name)
             response = redirect(download_url)
         else:
-            # We read the raw file and download it for the user
+            # We stream the raw file chunk by chunk to the user
             reader.start()
-            raw = reader.read_raw()
-            response = Response(raw)
+            response = Response(stream_reader_raw(reader))
             response.headers["Content-Type"] = "text/csv"
             response.headers[
                 "Content-Disposition"
@@ -230,10 +253,11 @@ def download_statement_execution_result(statement_execution_id):
     methods=["GET"],
     require_auth=True,
 )
-def get_statement_execution_result(statement_execution_id, limit=None):
+def get_statement_execution_result(statement_execution_id, limit=None, offset=0):
     # TODO: make this customizable
     limit = 1000 if limit is None else limit
     api_assert(limit <= 5000, message="Too many rows requested")
+    api_assert(offset >= 0, message="Invalid offset")
 
     with DBSession() as session:
         try:
@@ -247,9 +271,25 @@ def get_statement_execution_result(statement_execution_id, limit=None):
                 statement_execution.query_execution_id, session=session
             )
 
+            if offset == 0:
+                result = get_result_preview(statement_execution_id, limit)
+                if result is not None:
+                    return result
+
             with GenericReader(statement_execution.result_path) as reader:
-                result = reader.read_csv(number_of_lines=limit + 1)  # 1 row for column
-                return result
+                # 1 row for column
+                if offset == 0:
+                    result = reader.read_csv(number_of_lines=limit + 1)
+                else:
+                    result = reader.read_rows(offset, limit, with_columns=True)
+
+            # The result is final only once the statement is done
+            if (
+                offset == 0
+                and statement_execution.status == StatementExecutionStatus.DONE
+            ):
+                set_result_preview(statement_execution_id, limit, result)
+            return result
         except FileDoesNotExist as e:
             abort(RESOURCE_NOT_FOUND_STATUS_CODE, str(e))
 
@@ -274,8 +314,16 @@ def get_statement_execution_log(statement_execution_id):
         log_path = statement_execution.log_path
         try:
             if log_path.startswith("stream"):
-                logs = logic.get_statement_execution_stream_logs(statement_execution_id)
-                return list(map(lambda log: log.log, logs))
+                logs = get_live_logs(statement_execution_id, limit=100)
+                if len(logs) == 0:
+                    # Statements that started before the logs were moved to redis
+                    logs = [
+                        log.log
+                        for log in logic.get_statement_execution_stream_logs(
+                            statement_execution_id
+                        )
+                    ]
+                return logs
             else:
                 with DBSession() as session:
                     MAX_LOG_RETURN_LINES = 2000
@@ -43,6 +43,20 @@ class QuerybookSettings(object):
     FLASK_CACHE_CONFIG = json.loads(get_env_config("FLASK_CACHE_CONFIG"))
     # Celery
     REDIS_URL = get_env_config("REDIS_URL", optional=False)
+    EXECUTOR_MULTIPLEX_MAX_QUERIES = int(
+        get_env_config("EXECUTOR_MULTIPLEX_MAX_QUERIES")
+    )
+    QUERY_CLIENT_POOL_IDLE_TIMEOUT = int(
+        get_env_config("QUERY_CLIENT_POOL_IDLE_TIMEOUT")
+    )
+    QUERY_SCHEDULER_MAX_RUNNING = int(get_env_config("QUERY_SCHEDULER_MAX_RUNNING"))
+    QUERY_SCHEDULER_MAX_RUNNING_PER_USER = int(
+        get_env_config("QUERY_SCHEDULER_MAX_RUNNING_PER_USER")
+    )
+    QUERY_SCHEDULER_MAX_RUNNING_PER_ENGINE = int(
+        get_env_config("QUERY_SCHEDULER_MAX_RUNNING_PER_ENGINE")
+    )
+    LATEST_PARTITION_CACHE_TTL = int(get_env_config("LATEST_PARTITION_CACHE_TTL"))
 
     # Search
     ELASTICSEARCH_HOST = get_env_config("ELASTICSEARCH_HOST", optional=False)
@@ -101,13 +115,23 @@ class QuerybookSettings(object):
 
     # Result Store
     RESULT_STORE_TYPE = get_env_config("RESULT_STORE_TYPE")
+    RESULT_STORE_FORMAT = get_env_config("RESULT_STORE_FORMAT")
+    RESULT_STORE_COMPRESSION = get_env_config("RESULT_STORE_COMPRESSION")
 
     STORE_BUCKET_NAME = get_env_config("STORE_BUCKET_NAME")
     STORE_PATH_PREFIX = get_env_config("STORE_PATH_PREFIX")
     STORE_MIN_UPLOAD_CHUNK_SIZE = int(get_env_config("STORE_MIN_UPLOAD_CHUNK_SIZE"))
     STORE_MAX_UPLOAD_CHUNK_NUM = int(get_env_config("STORE_MAX_UPLOAD_CHUNK_NUM"))
+    STORE_MAX_CONCURRENT_UPLOADS = int(get_env_config("STORE_MAX_CONCURRENT_UPLOADS"))
     STORE_MAX_READ_SIZE = int(get_env_config("STORE_MAX_READ_SIZE"))
     STORE_READ_SIZE = int(get_env_config("STORE_READ_SIZE"))
+    RESULT_PREVIEW_CACHE_EXPIRATION = int(
+        get_env_config("RESULT_PREVIEW_CACHE_EXPIRATION")
+    )
+    RESULT_PREVIEW_CACHE_LOCAL_SIZE = int(
+        get_env_config("RESULT_PREVIEW_CACHE_LOCAL_SIZE")
+    )
+    RESULT_PREVIEW_ROW_COUNT = int(get_env_config("RESULT_PREVIEW_ROW_COUNT"))
     S3_BUCKET_S3V4_ENABLED = get_env_config("S3_BUCKET_S3V4_ENABLED") == "true"
     AWS_REGION = get_env_config("AWS_REGION")
 
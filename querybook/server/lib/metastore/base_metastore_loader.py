@@ -1,10 +1,12 @@
 from abc import ABCMeta, abstractmethod, abstractclassmethod
 import gevent
 import math
-from typing import NamedTuple, List, Dict, Tuple
+from typing import NamedTuple, List, Dict, Optional, Tuple
 import traceback
 
 from app.db import DBSession, with_session
+from clients.redis_client import get_redis
+from env import QuerybookSettings
 from lib.logger import get_logger
 
 from lib.form import AllFormField
@@ -26,11 +28,25 @@ from logic.metastore import (
     get_table_by_schema_id_and_name,
 )
 
-from .utils import MetastoreTableACLChecker
+from .utils import get_metastore_acl_checker
 
 LOG = get_logger(__name__)
 
 
+def get_latest_partition_cache_key(
+    metastore_id: int,
+    schema_name: str,
+    table_name: str,
+    conditions: Dict[str, str] = None,
+) -> str:
+    return "latest_partition:{}:{}.{}:{}".format(
+        metastore_id,
+        schema_name,
+        table_name,
+        json.dumps(sorted((conditions or {}).items())),
+    )
+
+
 class DataSchema(NamedTuple):
     name: str
 
@@ -68,7 +84,9 @@ class DataColumn(NamedTuple):
 class BaseMetastoreLoader(metaclass=ABCMeta):
     def __init__(self, metastore_dict: Dict):
         self.metastore_id = metastore_dict["id"]
-        self.acl_checker = MetastoreTableACLChecker(metastore_dict["acl_control"])
+        self.acl_checker = get_metastore_acl_checker(
+            self.metastore_id, metastore_dict["acl_control"]
+        )
 
     @with_session
     def sync_create_or_update_table(self, schema_name, table_name, session=None) -> int:
@@ -140,8 +158,53 @@ class BaseMetastoreLoader(metaclass=ABCMeta):
         self._create_tables_batched(schema_tables)
 
     def get_latest_partition(
+        self,
+        schema_name: str,
+        table_name: str,
+        conditions: Dict[str, str] = None,
+        redis_conn=None,
+    ) -> Optional[str]:
+        """Get the latest partition of the table, cached in redis for
+           LATEST_PARTITION_CACHE_TTL seconds
+
+        Returns:
+            Optional[str] -- The partition like dt=2015-01-01/column1=val1
+        """
+        cache_ttl = QuerybookSettings.LATEST_PARTITION_CACHE_TTL
+        if cache_ttl <= 0:
+            return self.fetch_latest_partition(schema_name, table_name, conditions)
+
+        key = get_latest_partition_cache_key(
+            self.metastore_id, schema_name, table_name, conditions
+        )
+        try:
+            redis_conn = redis_conn or get_redis()
+            raw_latest_partition = redis_conn.get(key)
+            if raw_latest_partition is not None:
+                return json.loads(raw_latest_partition)
+        except Exception:
+            LOG.info("Failed to get the cached latest partition", exc_info=True)
+
+        latest_partition = self.fetch_latest_partition(
+            schema_name, table_name, conditions
+        )
+        try:
+            redis_conn = redis_conn or get_redis()
+            redis_conn.set(key, json.dumps(latest_partition), ex=cache_ttl)
+        except Exception:
+            LOG.info("Failed to cache the latest partition", exc_info=True)
+        return latest_partition
+
+    def fetch_latest_partition(
         self, schema_name: str, table_name: str, conditions: Dict[str, str] = None
-    ):
+    ) -> Optional[str]:
+        """Override this method to get the latest partition without
+           fetching all the partitions of the table.
+           Returns the last of get_partitions by default.
+
+        Returns:
+            Optional[str] -- The partition like dt=2015-01-01/column1=val1
+        """
         partitions = self.get_partitions(schema_name, table_name, conditions)
         latest_partition = partitions[-1] if partitions and len(partitions) else None
         return latest_partition
@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from lib.form import ExpandableFormField, FormField, FormFieldType, StructFormField
 from hmsclient.genthrift.hive_metastore.ttypes import NoSuchObjectException
 
@@ -97,6 +97,14 @@ class HMSMetastoreLoader(BaseMetastoreLoader):
             self.hmc, schema_name, table_name, conditions
         )
 
+    def fetch_latest_partition(
+        self, schema_name: str, table_name: str, conditions: Dict[str, str] = None
+    ) -> Optional[str]:
+        try:
+            return self.hmc.get_latest_partition(schema_name, table_name, conditions)
+        except NoSuchObjectException:
+            return None
+
     def _get_hmc(self, metastore_dict):
         return HiveMetastoreClient(
             hmss_ro_addrs=metastore_dict["metastore_params"]["hms_connection"]
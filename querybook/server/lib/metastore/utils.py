@@ -1,6 +1,8 @@
-from typing import Dict, List
+from threading import Lock
+from typing import Dict, Iterable, List
 from logic import metastore as logic
 from app.db import with_session
+from lib.utils import json
 
 
 class MetastoreTableACLChecker(object):
@@ -8,6 +10,18 @@ class MetastoreTableACLChecker(object):
         self._type = acl_config.get("type")
         self._tables_by_schema = self.process_tables(acl_config.get("tables", []))
 
+        # Sets of the listed tables, for the checks
+        self._tables = set(
+            (schema_name, table_name)
+            for schema_name, table_names in self._tables_by_schema.items()
+            for table_name in table_names
+        )
+        self._schemas_with_all_tables = set(
+            schema_name
+            for schema_name, table_names in self._tables_by_schema.items()
+            if "*" in table_names
+        )
+
     def process_tables(self, tables: List[str]):
         tables_by_schema = {}
         for table in tables:
@@ -20,35 +34,78 @@ class MetastoreTableACLChecker(object):
 
         return tables_by_schema
 
+    @property
+    def has_acl(self) -> bool:
+        return self._type == "allowlist" or self._type == "denylist"
+
     def _is_table_in_list(
         self,
         schema,
         table,
     ):
-        if schema in self._tables_by_schema:
-            for schema_table in self._tables_by_schema[schema]:
-                if schema_table == table or schema_table == "*":
-                    return True
-        return False
+        return (
+            schema in self._schemas_with_all_tables or (schema, table) in self._tables
+        )
 
     def is_table_valid(
         self,
         schema,
         table,
     ):
-        if self._type != "allowlist" and self._type != "denylist":
+        if not self.has_acl:
             return True
 
         table_in_list = self._is_table_in_list(schema, table)
         return table_in_list if self._type == "allowlist" else not table_in_list
 
+    def get_invalid_tables(self, full_table_names: Iterable[str]) -> List[str]:
+        """Check all the tables at once
+
+        Arguments:
+            full_table_names {Iterable[str]} -- Tables in the format <schema_name>.<table_name>
+
+        Returns:
+            List[str] -- The tables that are not allowed, in the given order
+        """
+        if not self.has_acl:
+            return []
+
+        return [
+            full_table_name
+            for full_table_name in dict.fromkeys(full_table_names)
+            if not self.is_table_valid(*full_table_name.split(".", 1))
+        ]
+
     def is_schema_valid(self, schema):
-        if self._type != "allowlist" and self._type != "denylist":
+        if not self.has_acl:
             return True
         schema_in_list = schema in self._tables_by_schema
         return schema_in_list if self._type == "allowlist" else not schema_in_list
 
 
+# metastore id -> (acl_control, ACL checker)
+_acl_checker_by_metastore_id = {}
+_acl_checker_lock = Lock()
+
+
+def get_metastore_acl_checker(
+    metastore_id: int, acl_control: Dict
+) -> MetastoreTableACLChecker:
+    """Get the ACL checker of the metastore, it is only built again
+    when the acl_control of the metastore changes
+    """
+    raw_acl_control = json.dumps(acl_control or {})
+    with _acl_checker_lock:
+        cached = _acl_checker_by_metastore_id.get(metastore_id)
+        if cached is not None and cached[0] == raw_acl_control:
+            return cached[1]
+
+    acl_checker = MetastoreTableACLChecker(acl_control or {})
+    with _acl_checker_lock:
+        _acl_checker_by_metastore_id[metastore_id] = (raw_acl_control, acl_checker)
+    return acl_checker
+
+
 class DataTableFinder:
     def __init__(self, metastore_id):
         self.metastore_id = metastore_id
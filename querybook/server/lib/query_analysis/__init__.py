@@ -1,3 +1,5 @@
+import re
+
 import sqlparse
 
 skip_token_type = [
@@ -7,8 +9,98 @@ skip_token_type = [
     sqlparse.tokens.Newline,
 ]
 
+# The rules of the sqlparse lexer, in the same order so that the tokens
+# have the same boundaries, grouped by what matters to split statements
+_STATEMENT_TOKEN_RULES = [
+    ("hint", r"(?:--|# )\+.*?(?:\r\n|\r|\n|$)|/\*\+[\s\S]*?\*/"),
+    ("comment", r"(?:--|# ).*?(?:\r\n|\r|\n|$)"),
+    ("multiline_comment", r"/\*[\s\S]*?\*/"),
+    ("whitespace", r"\s+"),
+    ("operator", r":=|::|\*"),
+    (
+        "quoted",
+        r"`(?:``|[^`])*`|´(?:´´|[^´])*´|(?P<dollar_tag>\$(?:[_A-Z]\w*)?\$)[\s\S]*?(?P=dollar_tag)",
+    ),
+    (
+        "name",
+        r"\?|%(?:\(\w+\))?s|(?<!\w)[$:?]\w+|(?:CASE|IN|VALUES|USING)\b|(?:@|##|#)[A-Z]\w+"
+        r"|[A-Z]\w*(?=\s*\.)|(?<=\.)[A-Z]\w*|[A-Z]\w*(?=\()",
+    ),
+    ("number", r"-?0x[\dA-F]+|-?\d*(?:\.\d+)?E-?\d+|-?\d*\.\d+|-?\d+"),
+    ("string", r"'(?:''|\\\\|\\'|[^'])*'|\"\"|\".*?[^\\]\"|(?<![\w\])])\[[^\]]+\]"),
+    (
+        "keyword",
+        r"(?:(?:LEFT\s+|RIGHT\s+|FULL\s+)?(?:INNER\s+|OUTER\s+|STRAIGHT\s+)?"
+        r"|(?:CROSS\s+|NATURAL\s+)?)?JOIN\b|END(?:\s+IF|\s+LOOP|\s+WHILE)?\b"
+        r"|NOT\s+NULL\b|UNION\s+ALL\b",
+    ),
+    ("create", r"CREATE(?:\s+OR\s+REPLACE)?\b"),
+    ("name", r"DOUBLE\s+PRECISION\b|[_A-Z][_$#\w]*"),
+    ("semicolon", r";"),
+    ("operator", r"[:()\[\],\.]|[<>=~!]+|[+/@#%^&|`?^-]+|[\s\S]"),
+]
+_STATEMENT_TOKEN_REGEX = re.compile(
+    "|".join(
+        f"(?P<rule{index}>{pattern})"
+        for index, (_, pattern) in enumerate(_STATEMENT_TOKEN_RULES)
+    ),
+    re.IGNORECASE | re.UNICODE,
+)
+_STATEMENT_TOKEN_KINDS = {
+    f"rule{index}": kind for index, (kind, _) in enumerate(_STATEMENT_TOKEN_RULES)
+}
+# Tokens before the start of a statement
+_SKIPPED_TOKEN_KINDS = set(["comment", "whitespace"])
+# Tokens removed by get_sanitized_statement
+_SANITIZED_TOKEN_KINDS = set(["hint", "comment", "multiline_comment", "whitespace"])
+# Keywords that let sqlparse keep the ";" of a procedure (CREATE ... BEGIN ... END)
+# in the statement, which is only handled by sqlparse
+_BLOCK_KEYWORDS = set(["BEGIN", "DECLARE"])
+
 
 def get_statement_ranges(query):
+    """Get the (start, end) of each non empty statement of the query,
+    the start skips the whitespaces and single line comments, and the
+    end excludes the ";"
+
+    The statements are split with a single regex scan of the query,
+    it gives the same ranges as splitting them with sqlparse (which
+    is much slower for long queries)
+    """
+    statement_ranges = []
+    statement_start = None
+    is_empty_statement = True
+    is_create = False
+
+    for match in _STATEMENT_TOKEN_REGEX.finditer(query):
+        kind = _STATEMENT_TOKEN_KINDS[match.lastgroup]
+
+        if kind == "semicolon":
+            if not is_empty_statement:
+                statement_ranges.append((statement_start, match.start()))
+            statement_start = None
+            is_empty_statement = True
+            continue
+
+        if kind == "create":
+            is_create = True
+        elif is_create and kind == "name" and match.group().upper() in _BLOCK_KEYWORDS:
+            return get_statement_ranges_with_sqlparse(query)
+
+        if statement_start is None and kind not in _SKIPPED_TOKEN_KINDS:
+            statement_start = match.start()
+        if kind not in _SANITIZED_TOKEN_KINDS:
+            is_empty_statement = False
+
+    if not is_empty_statement:
+        statement_ranges.append((statement_start, len(query)))
+    return statement_ranges
+
+
+def get_statement_ranges_with_sqlparse(query):
+    """Same as get_statement_ranges, used for the procedures since
+    sqlparse does not split them at the ";" inside BEGIN ... END
+    """
     statements = sqlparse.parse(query)
     statement_ranges = []
     start_index = 0
@@ -54,3 +146,12 @@ def get_statements(query):
 
 def get_sanitized_statement(statement):
     return sqlparse.format(statement, strip_comments=True).strip(" \n\r\t;")
+
+
+def get_normalized_statement(statement):
+    """Format the statement so that statements only differing by
+    comments, whitespaces or keyword cases are the same
+    """
+    return sqlparse.format(
+        statement, strip_comments=True, strip_whitespace=True, keyword_case="upper"
+    ).strip(" \n\r\t;")
@@ -0,0 +1,124 @@
+"""
+The statement ranges, statement types, tables and lineage of a query,
+computed with a single tokenization of the query. The analysis of a
+query is needed by the executor, the table logs and the search index,
+so it is cached by query hash in the process memory and in redis.
+"""
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from clients.redis_client import get_redis
+from lib.logger import get_logger
+from lib.query_analysis import get_statement_ranges
+from lib.query_analysis.lineage import (
+    get_statement_table_type,
+    process_statements,
+    tokenize_by_statement,
+)
+from lib.utils import json
+from lib.utils.cache import SizedLRUCache
+
+LOG = get_logger(__file__)
+
+QUERY_ANALYSIS_LOCAL_CACHE_SIZE = 16 * 1024 * 1024  # 16MB of query text
+QUERY_ANALYSIS_CACHE_EXPIRATION = 24 * 60 * 60  # 1 day
+
+_local_query_analysis_cache = SizedLRUCache(QUERY_ANALYSIS_LOCAL_CACHE_SIZE)
+
+
+class QueryAnalysis(object):
+    def __init__(
+        self,
+        statement_ranges: List[Tuple[int, int]],
+        statement_types: List[Optional[str]],
+        table_per_statement: List[List[str]],
+        lineage_per_statement: List[List[Dict]],
+    ):
+        # Ranges of the non empty statements in the original query
+        self.statement_ranges = statement_ranges
+
+        # Same as get_table_statement_type/process_query, one per
+        # statement returned by tokenize_by_statement
+        self.statement_types = statement_types
+        self.table_per_statement = table_per_statement
+        self.lineage_per_statement = lineage_per_statement
+
+    @classmethod
+    def from_query(cls, query: str, language: str = None) -> "QueryAnalysis":
+        statements = tokenize_by_statement(query)
+        table_per_statement, lineage_per_statement = process_statements(
+            statements, language
+        )
+        return cls(
+            statement_ranges=get_statement_ranges(query),
+            statement_types=[
+                get_statement_table_type(statement) for statement in statements
+            ],
+            table_per_statement=table_per_statement,
+            lineage_per_statement=lineage_per_statement,
+        )
+
+    @classmethod
+    def from_dict(cls, analysis_dict: Dict) -> "QueryAnalysis":
+        return cls(
+            statement_ranges=[
+                tuple(statement_range)
+                for statement_range in analysis_dict["statement_ranges"]
+            ],
+            statement_types=analysis_dict["statement_types"],
+            table_per_statement=analysis_dict["table_per_statement"],
+            lineage_per_statement=analysis_dict["lineage_per_statement"],
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "statement_ranges": self.statement_ranges,
+            "statement_types": self.statement_types,
+            "table_per_statement": self.table_per_statement,
+            "lineage_per_statement": self.lineage_per_statement,
+        }
+
+
+def get_query_analysis_cache_key(query: str, language: str = None) -> str:
+    query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    return f"query_analysis:{language or ''}:{query_hash}"
+
+
+def get_query_analysis(
+    query: str, language: str = None, redis_conn=None
+) -> QueryAnalysis:
+    """Get the analysis of the query, cached by query hash.
+       The query is analyzed again if redis is not available
+
+    Arguments:
+        query {str} -- The SQL query
+        language {str} -- The language of the query engine (default: {None})
+    """
+    key = get_query_analysis_cache_key(query, language)
+
+    analysis = _local_query_analysis_cache.get(key)
+    if analysis is not None:
+        return analysis
+
+    try:
+        redis_conn = redis_conn or get_redis()
+        raw_analysis = redis_conn.get(key)
+        if raw_analysis is not None:
+            analysis = QueryAnalysis.from_dict(json.loads(raw_analysis))
+    except Exception:
+        LOG.info("Failed to get the cached query analysis", exc_info=True)
+
+    if analysis is None:
+        analysis = QueryAnalysis.from_query(query, language)
+        try:
+            redis_conn = redis_conn or get_redis()
+            redis_conn.set(
+                key,
+                json.dumps(analysis.to_dict()),
+                ex=QUERY_ANALYSIS_CACHE_EXPIRATION,
+            )
+        except Exception:
+            LOG.info("Failed to cache the query analysis", exc_info=True)
+
+    _local_query_analysis_cache.set(key, analysis, len(query))
+    return analysis
@@ -32,6 +32,11 @@ def process_query(query, language=None):
         Lineage: [{table: [lineage]}],
         Statements: [{table: 'statement' }]
     """
+    return process_statements(tokenize_by_statement(query), language)
+
+
+def process_statements(statements, language=None):
+    """Same as process_query, for the statements returned by tokenize_by_statement"""
     if language == "sqlite":
         default_schema = "main"
     else:
@@ -40,7 +45,6 @@ def process_query(query, language=None):
     lineage_per_statement = []
     table_per_statement = []
     # This tracks which schema (generic parent table specified in a USE statement) is in use
-    statements = tokenize_by_statement(query)
     # A list of placeholders but are not real tables
 
     for statement in statements:
@@ -67,36 +71,42 @@ def get_table_statement_type(query: str) -> List[str]:
                      Return None if not identifiable.
     """
 
-    statements = tokenize_by_statement(query)
-    statement_types = []
-    for statement in statements:
-        statement_type = None
-
-        # Find the first Keyword that is not a WITH
-        index, token = statement.token_next(-1)
-        while token and (not token.is_keyword or token.value == "WITH"):
-            index, token = statement.token_next(index)
-
-        if token is not None and hasattr(token, "ttype"):
-            if token.value in ("SELECT", "INSERT"):
-                statement_type = token.value
-            elif (
-                token.ttype == sqlparse.tokens.Keyword.DML
-                or token.ttype == sqlparse.tokens.Keyword.DDL
-            ):
-                # need to check if DML/DDL is related to a table
-                # for example DROP TABLE, CREATE TABLE etc
-                table_token = token
-                while (
-                    table_token and table_token.is_keyword
-                ):  # Go through next few keywords
-                    index, table_token = statement.token_next(index)
-                    if str(table_token) == "TABLE":
-                        # Found table, so the statement is indeed about table
-                        statement_type = token.value
-                        break
-        statement_types.append(statement_type)
-    return statement_types
+    return [
+        get_statement_table_type(statement)
+        for statement in tokenize_by_statement(query)
+    ]
+
+
+def get_statement_table_type(statement) -> str:
+    """Same as get_table_statement_type, for a statement
+    returned by tokenize_by_statement
+    """
+    statement_type = None
+
+    # Find the first Keyword that is not a WITH
+    index, token = statement.token_next(-1)
+    while token and (not token.is_keyword or token.value == "WITH"):
+        index, token = statement.token_next(index)
+
+    if token is not None and hasattr(token, "ttype"):
+        if token.value in ("SELECT", "INSERT"):
+            statement_type = token.value
+        elif (
+            token.ttype == sqlparse.tokens.Keyword.DML
+            or token.ttype == sqlparse.tokens.Keyword.DDL
+        ):
+            # need to check if DML/DDL is related to a table
+            # for example DROP TABLE, CREATE TABLE etc
+            table_token = token
+            while (
+                table_token and table_token.is_keyword
+            ):  # Go through next few keywords
+                index, table_token = statement.token_next(index)
+                if str(table_token) == "TABLE":
+                    # Found table, so the statement is indeed about table
+                    statement_type = token.value
+                    break
+    return statement_type
 
 
 def get_statement_placeholders(statement):
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 import json
 import re
-from typing import Callable, Dict, Set
+from typing import Callable, Dict, Set, Tuple
 
 from jinja2.exceptions import TemplateSyntaxError
 from jinja2.sandbox import SandboxedEnvironment
@@ -9,10 +9,19 @@ from jinja2 import meta
 
 from app.db import DBSession
 from lib import metastore
+from lib.utils.cache import SizedLRUCache
 from logic import admin as admin_logic
 
 _DAG = Dict[str, Set[str]]
 
+TEMPLATE_CACHE_SIZE = 4 * 1024 * 1024  # 4MB of template text
+
+# Template text -> compiled jinja code, shared by all the environments
+# since they only differ by their globals
+_compiled_template_cache = SizedLRUCache(TEMPLATE_CACHE_SIZE)
+# Template text -> undeclared variables (including the globals)
+_template_variables_cache = SizedLRUCache(TEMPLATE_CACHE_SIZE)
+
 
 class QueryTemplatingError(Exception):
     pass
@@ -45,23 +54,41 @@ def _escape_sql_comments(query: str):
     )
 
 
-def _detect_cycle_helper(node: str, dag: _DAG, seen: Set[str]) -> bool:
+def _detect_cycle_helper(
+    node: str, dag: _DAG, seen: Set[str], visited: Set[str]
+) -> bool:
     if node in seen:
         return True
+    # The descendants of a visited node are already checked
+    if node in visited:
+        return False
 
     seen.add(node)
 
     children = dag.get(node, [])
     for child in children:
-        if _detect_cycle_helper(child, dag, seen):
+        if _detect_cycle_helper(child, dag, seen, visited):
             return True
     seen.remove(node)
+    visited.add(node)
     return False
 
 
 def _detect_cycle(dag: _DAG) -> bool:
     seen = set()
-    return any(_detect_cycle_helper(node, dag, seen) for node in dag.keys())
+    visited = set()
+    return any(_detect_cycle_helper(node, dag, seen, visited) for node in dag.keys())
+
+
+def _get_template(s: str, jinja_env):
+    """Same as jinja_env.from_string, but the template is only compiled once"""
+    code = _compiled_template_cache.get(s)
+    if code is None:
+        code = jinja_env.compile(s)
+        _compiled_template_cache.set(s, code, len(s))
+    return jinja_env.template_class.from_code(
+        jinja_env, code, jinja_env.make_globals(None)
+    )
 
 
 def get_default_variables():
@@ -73,6 +100,8 @@ def get_default_variables():
 
 def create_get_latest_partition(engine_id: int) -> Callable[[str, str], str]:
     _metastore_loader = None
+    # Memoized latest partitions of the tables used in the render
+    _latest_partitions = {}
 
     def get_metastore():
         """Lazily initialize metastore_loader from DB.
@@ -130,10 +159,19 @@ def create_get_latest_partition(engine_id: int) -> Callable[[str, str], str]:
 
         [schema_name, table_name] = full_table_name_parts
 
-        metastore_loader = get_metastore()
-        latest_partition = metastore_loader.get_latest_partition(
-            schema_name, table_name, conditions
+        latest_partition_key = (
+            schema_name,
+            table_name,
+            tuple(sorted((conditions or {}).items())),
         )
+        if latest_partition_key not in _latest_partitions:
+            metastore_loader = get_metastore()
+            _latest_partitions[
+                latest_partition_key
+            ] = metastore_loader.get_latest_partition(
+                schema_name, table_name, conditions
+            )
+        latest_partition = _latest_partitions[latest_partition_key]
 
         if latest_partition:
             # latest_partition is like dt=2015-01-01/column1=val1
@@ -179,8 +217,11 @@ def get_templated_variables_in_string(s: str, jinja_env=None) -> Set[str]:
     """
     jinja_env = jinja_env or SandboxedEnvironment()
 
-    ast = jinja_env.parse(s)
-    variables = meta.find_undeclared_variables(ast)
+    variables = _template_variables_cache.get(s)
+    if variables is None:
+        ast = jinja_env.parse(s)
+        variables = meta.find_undeclared_variables(ast)
+        _template_variables_cache.set(s, variables, len(s))
 
     # temporarily applying https://github.com/pallets/jinja/pull/994/files
     # since the current version is binded by flask
@@ -206,7 +247,7 @@ def verify_all_variables_are_defined(variables_required, variables_provided):
 
 
 def render_query_with_variables(s, variables, jinja_env):
-    template = jinja_env.from_string(s)
+    template = _get_template(s, jinja_env)
 
     return template.render(**variables)
 
@@ -238,16 +279,16 @@ def _flatten_variable(
 
     # Now all dependencies are solved
     jinja_env = jinja_env or SandboxedEnvironment(autoescape=False)
-    template = jinja_env.from_string(variable_defs[var_name])
+    template = _get_template(variable_defs[var_name], jinja_env)
     flattened_variables[var_name] = template.render(
         **{dep_var_name: flattened_variables[dep_var_name] for dep_var_name in var_deps}
     )
 
 
-def flatten_recursive_variables(
+def get_variables_dag(
     raw_variables: Dict[str, str], jinja_env
-) -> Dict[str, str]:
-    """Given a list of variables, recursively replace variables that refers other variables
+) -> Tuple[Dict[str, str], _DAG]:
+    """Find the variables that refers other variables
 
     Arguments:
         raw_variables {Dict[str, str]} -- The variable name/value pair
@@ -256,7 +297,8 @@ def flatten_recursive_variables(
         QueryHasCycleException: If the partials contains a cycle
 
     Returns:
-        Dict[str, str] -- the variables replaced with other variables
+        Tuple[Dict[str, str], _DAG] -- the variables that do not need to be rendered,
+                                       and the variables each other variable refers
     """
     flattened_variables = {}
     variables_dag = {}
@@ -284,7 +326,17 @@ def flatten_recursive_variables(
         raise QueryHasCycleException(
             "Infinite recursion in variable definition detected."
         )
+    return flattened_variables, variables_dag
 
+
+def resolve_variables_dag(
+    raw_variables: Dict[str, str],
+    flattened_variables: Dict[str, str],
+    variables_dag: _DAG,
+    jinja_env,
+) -> Dict[str, str]:
+    """Render the variables of the dag given by get_variables_dag"""
+    flattened_variables = dict(flattened_variables)
     # Resolve everything within the dag
     for var_name in variables_dag:
         _flatten_variable(
@@ -293,6 +345,26 @@ def flatten_recursive_variables(
     return flattened_variables
 
 
+def flatten_recursive_variables(
+    raw_variables: Dict[str, str], jinja_env
+) -> Dict[str, str]:
+    """Given a list of variables, recursively replace variables that refers other variables
+
+    Arguments:
+        raw_variables {Dict[str, str]} -- The variable name/value pair
+    Raises:
+        UndefinedVariableException: If the variable refers to a variable that does not exist
+        QueryHasCycleException: If the partials contains a cycle
+
+    Returns:
+        Dict[str, str] -- the variables replaced with other variables
+    """
+    flattened_variables, variables_dag = get_variables_dag(raw_variables, jinja_env)
+    return resolve_variables_dag(
+        raw_variables, flattened_variables, variables_dag, jinja_env
+    )
+
+
 def get_templated_query_variables(variables_provided, jinja_env):
     return flatten_recursive_variables(
         {
@@ -303,6 +375,57 @@ def get_templated_query_variables(variables_provided, jinja_env):
     )
 
 
+class TemplatedQueryRenderer(object):
+    """Render many queries with the same variables, such as the query cells
+    of a data doc. The variables DAG is only built once, and the variables
+    are only resolved once per query engine since latest_partition depends
+    on the metastore of the engine
+    """
+
+    def __init__(self, variables: Dict[str, str]):
+        self._raw_variables = {
+            **get_default_variables(),
+            **variables,
+        }
+        self._variables_dag = None
+        # engine id -> jinja env/resolved variables
+        self._jinja_envs = {}
+        self._resolved_variables = {}
+
+    def get_jinja_env(self, engine_id: int):
+        if engine_id not in self._jinja_envs:
+            self._jinja_envs[engine_id] = get_templated_query_env(engine_id)
+        return self._jinja_envs[engine_id]
+
+    def get_variables(self, engine_id: int) -> Dict[str, str]:
+        if engine_id not in self._resolved_variables:
+            jinja_env = self.get_jinja_env(engine_id)
+            if self._variables_dag is None:
+                self._variables_dag = get_variables_dag(self._raw_variables, jinja_env)
+
+            flattened_variables, variables_dag = self._variables_dag
+            self._resolved_variables[engine_id] = resolve_variables_dag(
+                self._raw_variables, flattened_variables, variables_dag, jinja_env
+            )
+        return self._resolved_variables[engine_id]
+
+    def render(self, query: str, engine_id: int) -> str:
+        """Same as render_templated_query"""
+        jinja_env = self.get_jinja_env(engine_id)
+        try:
+            escaped_query = _escape_sql_comments(query)
+            variables_in_query = get_templated_variables_in_string(
+                escaped_query, jinja_env
+            )
+
+            all_variables = self.get_variables(engine_id)
+            verify_all_variables_are_defined(variables_in_query, all_variables)
+
+            return render_query_with_variables(escaped_query, all_variables, jinja_env)
+        except TemplateSyntaxError as e:
+            raise QueryJinjaSyntaxException(f"Line {e.lineno}: {e.message}")
+
+
 def render_templated_query(
     query: str, variables: Dict[str, str], engine_id: int
 ) -> str:
@@ -323,14 +446,4 @@ def render_templated_query(
     Returns:
         str -- The rendered string
     """
-    jinja_env = get_templated_query_env(engine_id)
-    try:
-        escaped_query = _escape_sql_comments(query)
-        variables_in_query = get_templated_variables_in_string(escaped_query, jinja_env)
-
-        all_variables = get_templated_query_variables(variables, jinja_env)
-        verify_all_variables_are_defined(variables_in_query, all_variables)
-
-        return render_query_with_variables(escaped_query, all_variables, jinja_env)
-    except TemplateSyntaxError as e:
-        raise QueryJinjaSyntaxException(f"Line {e.lineno}: {e.message}")
+    return TemplatedQueryRenderer(variables).render(query, engine_id)
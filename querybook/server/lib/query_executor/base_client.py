@@ -1,9 +1,24 @@
 from time import sleep
 from abc import ABCMeta, abstractmethod
-from typing import List, Any
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Generator, Iterator, List, Any, TypeVar
+
+from lib.logger import get_logger
+
+LOG = get_logger(__file__)
+
+# Default number of rows fetched at a time
+DEFAULT_FETCH_SIZE = 10000
 
 
 class ClientBaseClass(metaclass=ABCMeta):
+    # If true, the client can be kept in the client pool after a
+    # query execution succeeds and be used by the next query executions
+    # with the same settings. The client must then support running
+    # queries one after another
+    REUSABLE = False
+
     @abstractmethod
     def cursor(self):
         """Return Something that
@@ -12,8 +27,25 @@ class ClientBaseClass(metaclass=ABCMeta):
 
         pass
 
+    def is_healthy(self) -> bool:
+        """Checked before a pooled client is reused,
+        unhealthy clients are closed
+        """
+        return True
+
+    def close(self):
+        """Release the connection of the client,
+        called when the client is evicted from the pool
+        """
+        pass
+
 
 class CursorBaseClass(metaclass=ABCMeta):
+    _fetch_size = DEFAULT_FETCH_SIZE
+    _prefetch = False
+    _row_limit = None
+    _result_truncated = False
+
     @abstractmethod
     def run(self, query):
         pass
@@ -33,6 +65,17 @@ class CursorBaseClass(metaclass=ABCMeta):
     def cancel(self):
         pass
 
+    def wait_for_update(self, timeout: float):
+        """Called by the executor between two polls. By default it
+           sleeps for timeout seconds. Cursors of engines that support
+           long polling can override it to wait on the engine instead,
+           and return early once the query state changes
+
+        Arguments:
+            timeout {float} -- Max seconds to wait
+        """
+        sleep(timeout)
+
     @abstractmethod
     def get_one_row(self) -> List[Any]:
         pass
@@ -93,15 +136,96 @@ class CursorBaseClass(metaclass=ABCMeta):
 
         return ""
 
+    def set_fetch_options(
+        self, fetch_size: int = None, prefetch: bool = False, row_limit: int = None
+    ):
+        """Configure how get_rows_chunk_iter fetches the rows, called
+           before run. Override to pass the fetch size to the engine
+
+        Keyword Arguments:
+            fetch_size {int} -- Number of rows fetched at a time,
+                                DEFAULT_FETCH_SIZE if None (default: {None})
+            prefetch {bool} -- If true, the next block of rows is fetched in a
+                               background thread while the current block
+                               is processed (default: {False})
+            row_limit {int} -- Max number of rows returned by get_rows_chunk_iter,
+                               once reached the query is stopped (default: {None})
+        """
+        self._fetch_size = fetch_size or DEFAULT_FETCH_SIZE
+        self._prefetch = prefetch
+        self._row_limit = row_limit or None
+
+    def stop_fetching(self):
+        """Called when no more rows will be read from the query,
+        cancels the query so the engine stops producing rows
+        """
+        try:
+            self.cancel()
+        except Exception:
+            # The query may be already finished in the engine
+            LOG.info("Failed to cancel the query after fetching", exc_info=True)
+
+    @property
+    def result_truncated(self) -> bool:
+        """True if get_rows_chunk_iter stopped at the row limit
+        while the query has more rows
+        """
+        return self._result_truncated
+
     # These functions are intended to use as is
-    def get_rows_iter(self, chunk_size: int = 10000):
+    def get_rows_chunk_iter(
+        self, chunk_size: int = None
+    ) -> Generator[List[List[Any]], None, None]:
+        """Fetch the rows block by block with get_n_rows
+
+        Keyword Arguments:
+            chunk_size {int} -- max number of rows per block,
+                                the fetch size if None (default: {None})
+
+        Returns:
+            Iterator[List[List[Any]]] -- non empty blocks of rows, close() the
+                                         iterator before using the cursor again
+                                         if it is not iterated until the end
+        """
+        chunks = self._fetch_rows_chunks(chunk_size or self._fetch_size)
+        if self._prefetch:
+            return prefetch_iter(chunks)
+        return chunks
+
+    def _fetch_rows_chunks(
+        self, chunk_size: int
+    ) -> Generator[List[List[Any]], None, None]:
+        self._result_truncated = False
+        rows_left = self._row_limit
         while True:
-            rows = self.get_n_rows(chunk_size)
+            if rows_left is not None and rows_left == 0:
+                # Fetch a single row to know if the result has more rows
+                if len(self._fetch_rows(1)):
+                    self._result_truncated = True
+                    self.stop_fetching()
+                break
 
-            if rows is None or len(rows) == 0:
+            rows = self._fetch_rows(
+                chunk_size if rows_left is None else min(chunk_size, rows_left)
+            )
+            if len(rows) == 0:
                 break
-            for row in rows:
-                yield row
+            if rows_left is not None:
+                rows_left -= len(rows)
+            yield rows
+
+    def _fetch_rows(self, n: int) -> List[List[Any]]:
+        rows = self.get_n_rows(n)
+        if rows is None:
+            return []
+        # The default get_n_rows returns a generator
+        if not isinstance(rows, list):
+            rows = list(rows)
+        return rows
+
+    def get_rows_iter(self, chunk_size: int = None):
+        for rows in self.get_rows_chunk_iter(chunk_size):
+            yield from rows
 
     def get_rows(self) -> List:
         return [row for row in self.get_rows_iter()]
@@ -130,3 +254,71 @@ class CursorBaseClass(metaclass=ABCMeta):
             if self.poll():
                 break
             sleep(poll_interval)
+
+
+T = TypeVar("T")
+
+# Seconds between checks of whether the consumer stopped iterating
+PREFETCH_STOP_CHECK_INTERVAL = 1
+
+
+def prefetch_iter(iterator: Iterator[T], max_prefetched: int = 1) -> Iterator[T]:
+    """Iterate over iterator in a background thread, so its next items
+       are produced while the caller processes the current item
+
+    Arguments:
+        iterator {Iterator[T]} -- The iterator, it is only used by the thread
+
+    Keyword Arguments:
+        max_prefetched {int} -- Max items produced ahead (default: {1})
+
+    Returns:
+        Iterator[T] -- Same items as iterator
+    """
+    queue = Queue(maxsize=max_prefetched)
+    stopped = Event()
+    # Sentinel put in the queue once the iterator ends
+    end = object()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=PREFETCH_STOP_CHECK_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)) or stopped.is_set():
+                    return
+        except Exception as e:
+            put((end, e))
+        else:
+            put((end, None))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item, error = queue.get(timeout=PREFETCH_STOP_CHECK_INTERVAL)
+            except Empty:
+                if not thread.is_alive() and queue.empty():
+                    return
+                continue
+
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+        # Unblock the producer if it waits for a free slot, and wait for it
+        # so the cursor is no longer used once the iteration stops
+        while not queue.empty():
+            queue.get_nowait()
+        thread.join()
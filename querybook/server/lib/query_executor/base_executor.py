@@ -13,10 +13,23 @@ from const.query_execution import (
     StatementExecutionStatus,
     QUERY_EXECUTION_NAMESPACE,
 )
+from env import QuerybookSettings
 
 from lib.form import AllFormField
 from lib.logger import get_logger
 from lib.query_executor.base_client import ClientBaseClass
+from lib.query_executor.client_pool import (
+    get_client_pool,
+    get_client_pool_key,
+    is_session_free_statement,
+)
+from lib.query_executor.live_log import (
+    append_live_logs,
+    delete_live_logs,
+    get_live_logs,
+)
+from lib.query_executor.poll_scheduler import PollScheduler
+from lib.query_executor.result_cache import QueryResultCache
 from lib.query_executor.utils import (
     spread_dict,
     merge_str,
@@ -24,7 +37,10 @@ from lib.query_executor.utils import (
     format_if_internal_error_with_stack_trace,
 )
 from lib.result_store import GenericUploader
-from lib.utils.csv import row_to_csv
+from lib.result_store.formats import get_upload_result_format
+from lib.result_store.preview_cache import ResultPreviewCollector
+from lib.result_store.row_index import upload_row_index
+from lib.utils.compression import add_compression_extension
 from logic import query_execution as qe_logic
 
 
@@ -41,6 +57,12 @@ class QueryExecutorLogger(object):
         [type] -- [description]
     """
 
+    # Log and progress updates of a statement are coalesced and
+    # written to mysql/socketio at most once per interval (in seconds),
+    # or once the pending log exceeds the size (in chars)
+    UPDATE_FLUSH_INTERVAL = 5
+    UPDATE_FLUSH_LOG_SIZE = description_length
+
     def __init__(self, query_execution_id, celery_task, query, statement_ranges):
         self._query_execution_id = query_execution_id
 
@@ -58,6 +80,7 @@ class QueryExecutorLogger(object):
         self._meta_info = None  # statement_urls
         self._percent_complete = 0  # percent_complete
         self._statement_progress = {}
+        self._reset_pending_update()
 
         # Connect to mysql db
         with DBSession() as session:
@@ -116,6 +139,13 @@ class QueryExecutorLogger(object):
         self._log_cache = ""  # [statement_logs]
         self._meta_info = ""  # statement_urls
         self._percent_complete = None  # percent_complete
+        self._reset_pending_update()
+
+    def _reset_pending_update(self):
+        self._pending_logs = []
+        self._pending_log_size = 0
+        self._pending_percent_complete = False
+        self._last_update_flush_time = time.time()
 
     def on_statement_start(self, statement_index):
         self.reset_logging_variables()
@@ -139,31 +169,90 @@ class QueryExecutorLogger(object):
             room=self._query_execution_id,
         )
 
+    def on_statement_cached(self, statement_index, cached_result):
+        """Create the statement execution with the result of
+           a previous execution of the same statement
+
+        Arguments:
+            statement_index {int}
+            cached_result {Dict} -- Returned by QueryResultCache.get_statement_result
+        """
+        self.on_statement_start(statement_index)
+        statement_execution_id = self.statement_execution_ids[-1]
+
+        statement_execution = qe_logic.update_statement_execution(
+            statement_execution_id,
+            status=StatementExecutionStatus.DONE,
+            meta_info="Result reused from statement execution {}\n".format(
+                cached_result["statement_execution_id"]
+            ),
+            completed_at=datetime.datetime.utcnow(),
+            result_row_count=cached_result["result_row_count"],
+            result_truncated=cached_result["result_truncated"],
+            result_path=cached_result["result_path"],
+        ).to_dict()
+
+        self._statement_progress = {}
+        self.update_progress()
+        socketio.emit(
+            "statement_end",
+            statement_execution,
+            namespace=QUERY_EXECUTION_NAMESPACE,
+            room=self._query_execution_id,
+        )
+
     def on_statement_update(
         self,
         log: str = "",
         meta_info: str = None,
         percent_complete=None,
     ):
-        statement_execution_id = self.statement_execution_ids[-1]
+        """Record the new log/progress of the running statement,
+        they are flushed by flush_statement_update
+        """
+        if len(log):
+            self._pending_logs.append(log)
+            self._pending_log_size += len(log)
+
+        if percent_complete is not None and self._percent_complete != percent_complete:
+            self._percent_complete = percent_complete
+            self._pending_percent_complete = True
 
-        updated_meta_info = False
-        if meta_info is not None and self._meta_info != meta_info:
+        # A new meta info (such as the tracking url) is sent right away
+        updated_meta_info = meta_info is not None and self._meta_info != meta_info
+        if updated_meta_info:
             self._meta_info = meta_info
+
+        if (
+            updated_meta_info
+            or self._pending_log_size >= self.UPDATE_FLUSH_LOG_SIZE
+            or time.time() - self._last_update_flush_time >= self.UPDATE_FLUSH_INTERVAL
+        ):
+            self.flush_statement_update(updated_meta_info=updated_meta_info)
+
+    def flush_statement_update(self, updated_meta_info: bool = False):
+        """Write the pending log and progress of the running statement
+           into mysql and send them via socketio. Called before any
+           status change of the statement
+
+        Keyword Arguments:
+            updated_meta_info {bool} -- If true, also save self._meta_info
+                                        (default: {False})
+        """
+        if len(self.statement_execution_ids) == 0:
+            return
+        statement_execution_id = self.statement_execution_ids[-1]
+
+        if updated_meta_info:
             qe_logic.update_statement_execution(
-                statement_execution_id, meta_info=meta_info
+                statement_execution_id, meta_info=self._meta_info
             )
-            updated_meta_info = True
 
-        has_log = len(log)
+        has_log = len(self._pending_logs) > 0
         if has_log:
-            self._stream_log(statement_execution_id, log)
+            self._stream_log(statement_execution_id, "\n".join(self._pending_logs))
 
-        percent_complete_change = (
-            percent_complete is not None and self._percent_complete != percent_complete
-        )
-        if percent_complete_change:
-            self._percent_complete = percent_complete
+        percent_complete_change = self._pending_percent_complete
 
         if updated_meta_info or has_log or percent_complete_change:
             statement_update_dict = {
@@ -172,16 +261,16 @@ class QueryExecutorLogger(object):
             }
 
             if updated_meta_info:
-                statement_update_dict["meta_info"] = meta_info
+                statement_update_dict["meta_info"] = self._meta_info
 
             if has_log:
-                statement_update_dict["log"] = [log]
+                statement_update_dict["log"] = self._pending_logs
 
             if percent_complete_change:
-                statement_update_dict["percent_complete"] = percent_complete
+                statement_update_dict["percent_complete"] = self._percent_complete
                 self._statement_progress = {
                     statement_execution_id: {
-                        "percent_complete": percent_complete,
+                        "percent_complete": self._percent_complete,
                     }
                 }
 
@@ -194,7 +283,10 @@ class QueryExecutorLogger(object):
                 room=self._query_execution_id,
             )
 
+        self._reset_pending_update()
+
     def on_statement_end(self, cursor):
+        self.flush_statement_update()
         statement_execution_id = self.statement_execution_ids[-1]
         qe_logic.update_statement_execution(
             statement_execution_id,
@@ -212,9 +304,11 @@ class QueryExecutorLogger(object):
             room=self._query_execution_id,
         )
 
-        result_path, result_row_count = self._upload_query_result(
-            cursor, statement_execution_id
-        )
+        (
+            result_path,
+            result_row_count,
+            result_truncated,
+        ) = self._upload_query_result(cursor, statement_execution_id)
         upload_path, has_log = self._upload_log(statement_execution_id)
 
         statement_execution = qe_logic.update_statement_execution(
@@ -222,6 +316,7 @@ class QueryExecutorLogger(object):
             status=StatementExecutionStatus.DONE,
             completed_at=datetime.datetime.utcnow(),
             result_row_count=result_row_count,
+            result_truncated=result_truncated,
             has_log=self._has_log,
             result_path=result_path,
             log_path=upload_path if has_log else None,
@@ -235,8 +330,10 @@ class QueryExecutorLogger(object):
             namespace=QUERY_EXECUTION_NAMESPACE,
             room=self._query_execution_id,
         )
+        return statement_execution
 
     def on_cancel(self):
+        self.flush_statement_update()
         utcnow = datetime.datetime.utcnow()
         if len(self.statement_execution_ids) > 0:
             statement_execution_id = self.statement_execution_ids[-1]
@@ -316,7 +413,11 @@ class QueryExecutorLogger(object):
             },
         )
 
-        self._celery_task.update_state(state="PROGRESS", meta=progress)
+        # The task id is given since the progress can be updated from
+        # another thread than the task (see ExecutorMultiplexer)
+        self._celery_task.update_state(
+            task_id=self._task_id, state="PROGRESS", meta=progress
+        )
 
     def _upload_query_result(self, cursor, statement_execution_id: int):
         # While uploading, the first few rows are fetched and stored as well
@@ -326,50 +427,64 @@ class QueryExecutorLogger(object):
         if (
             columns is None or len(columns) == 0
         ):  # No need to go through queries because no information
-            return None, rows_uploaded
+            return None, rows_uploaded, False
 
-        key = "querybook_temp/%s/result.csv" % str(statement_execution_id)
+        result_format = get_upload_result_format()
+        key = add_compression_extension(
+            "querybook_temp/%s/result.%s"
+            % (str(statement_execution_id), result_format.file_extension),
+            QuerybookSettings.RESULT_STORE_COMPRESSION,
+        )
         uploader = GenericUploader(key)
         uploader.start()
+        result_writer = result_format.get_writer(uploader)
+        preview_collector = ResultPreviewCollector(
+            QuerybookSettings.RESULT_PREVIEW_ROW_COUNT
+        )
 
-        uploader.write(row_to_csv(columns))
+        result_writer.write_columns(columns)
+        preview_collector.add_columns(columns)
         rows_uploaded += 1  # 1 row for the column
 
-        for row in cursor.get_rows_iter():
-            did_upload = uploader.write(row_to_csv(row))
-            if not did_upload:
+        upload_limit_reached = False
+        rows_chunk_iter = cursor.get_rows_chunk_iter()
+        for rows in rows_chunk_iter:
+            rows_written = result_writer.write_rows(rows)
+            preview_collector.add_rows(rows[:rows_written])
+            rows_uploaded += rows_written
+            if rows_written < len(rows):
+                upload_limit_reached = True
                 break
-            rows_uploaded += 1
+        if upload_limit_reached:
+            # The result store cannot take more, stop the query once
+            # the rows are no longer fetched
+            rows_chunk_iter.close()
+            cursor.stop_fetching()
+        result_writer.end()
         uploader.end()
+        upload_row_index(key, result_writer.row_index)
 
-        return uploader.upload_url, rows_uploaded
+        try:
+            preview_collector.save(statement_execution_id)
+        except Exception:
+            # The preview is only an optimization, the result is read
+            # from the result store if it is missing
+            LOG.error("Failed to save the result preview", exc_info=True)
+
+        return (
+            uploader.upload_url,
+            rows_uploaded,
+            upload_limit_reached or cursor.result_truncated,
+        )
 
     def _upload_log(self, statement_execution_id: int):
-        db_read_limit = 50
-        db_read_offset = 0
-
         try:
             self._stream_log(statement_execution_id, "", clear_cache=True)
 
-            logs = []
             has_log = False
             log_path = None
 
-            with DBSession() as session:
-                while True:
-                    log_rows = qe_logic.get_statement_execution_stream_logs(
-                        statement_execution_id,
-                        limit=db_read_limit,
-                        offset=db_read_offset,
-                        session=session,
-                    )
-
-                    logs += map(lambda log: log.log, log_rows)
-
-                    if len(log_rows) < db_read_limit:
-                        break
-                    db_read_offset += db_read_limit
-
+            logs = get_live_logs(statement_execution_id)
             if len(logs):
                 has_log = True
                 uri = f"querybook_temp/{statement_execution_id}/log.txt"
@@ -380,9 +495,7 @@ class QueryExecutorLogger(object):
                         did_upload = uploader.write(log)
                         if not did_upload:
                             break
-                qe_logic.delete_statement_execution_stream_log(
-                    statement_execution_id, session=session
-                )
+                delete_live_logs(statement_execution_id)
             return log_path, has_log
         except Exception as e:
             import traceback
@@ -396,7 +509,7 @@ class QueryExecutorLogger(object):
         self, statement_execution_id: int, log: str, clear_cache: bool = False
     ):
         """
-        Persists the log in DB that's over description_length
+        Persists the log in redis in chunks of description_length
         for them to be read from frontend while query is running
 
         Arguments:
@@ -404,34 +517,26 @@ class QueryExecutorLogger(object):
             log {str} -- Incoming new log
 
         Keyword Arguments:
-            clear_cache {bool} -- [If true, will push all _log_cache into mysql DB] (default: {False})
+            clear_cache {bool} -- [If true, will push all _log_cache into redis] (default: {False})
         """
         merged_log = merge_str(self._log_cache, log)
-        created_log = False
+        log_chunks = []
         chunk_size = description_length
         cache_length = 0 if clear_cache else chunk_size
 
-        with DBSession() as session:
-            while len(merged_log) > cache_length:
-                size_of_chunk = min(len(merged_log), chunk_size)
-
-                log_chunk = merged_log[:size_of_chunk]
-                qe_logic.create_statement_execution_stream_log(
-                    statement_execution_id, log_chunk, commit=False, session=session
-                )
-                created_log = True
-                merged_log = merged_log[size_of_chunk:]
-
-            if not self._has_log and created_log:
-                qe_logic.update_statement_execution(
-                    statement_execution_id,
-                    has_log=True,
-                    log_path="stream://",
-                    session=session,
-                )
-                self._has_log = True
+        while len(merged_log) > cache_length:
+            size_of_chunk = min(len(merged_log), chunk_size)
+            log_chunks.append(merged_log[:size_of_chunk])
+            merged_log = merged_log[size_of_chunk:]
 
-            session.commit()
+        append_live_logs(statement_execution_id, log_chunks)
+        if not self._has_log and len(log_chunks):
+            qe_logic.update_statement_execution(
+                statement_execution_id,
+                has_log=True,
+                log_path="stream://",
+            )
+            self._has_log = True
 
         self._log_cache = merged_log
 
@@ -480,6 +585,10 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
     def LOGGER_CLASS(cls) -> QueryExecutorLogger:
         return QueryExecutorLogger
 
+    @classmethod
+    def POLL_SCHEDULER_CLASS(cls) -> PollScheduler:
+        return PollScheduler
+
     @classmethod
     def match(cls, language: str, name: str) -> bool:
         if name != cls.EXECUTOR_NAME():
@@ -499,6 +608,7 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         query: str,
         statement_ranges,
         client_setting,
+        result_cache: QueryResultCache = None,
     ):
         self._query = query
 
@@ -522,6 +632,14 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         self._client_setting = client_setting
         self._client = None
         self._cursor = None
+        # Whether or not the session of the client is unchanged by the statements
+        self._is_client_session_free = True
+
+        self._poll_scheduler = self.POLL_SCHEDULER_CLASS()()
+
+        # Optional, reuse the results of previous executions
+        self._result_cache = result_cache
+        self._statement_start_time = None
 
     def __del__(self):
         del self._logger
@@ -538,7 +656,6 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         del self._cursor
         self._cursor = self._get_cursor()
 
-        self._start_time = time.time()
         self._run_next_statement()
 
     def poll(self):
@@ -563,12 +680,17 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             LOG.error(error_message)
             self._handle_exception(e, stack_trace)
 
+    def next_poll_interval(self) -> float:
+        """Seconds to wait before the next poll"""
+        return self._poll_scheduler.next_interval()
+
     def sleep(self):
-        # For the first 15 mins, we check every second
-        # Afterwards, check every 10 seconds
-        time_passed = time.time() - self._start_time  # unit in seconds
-        sleep_time = 1 if time_passed < 900 else 10
-        time.sleep(sleep_time)
+        sleep_time = self.next_poll_interval()
+        if self._cursor:
+            # The cursor may return early if the query state changes
+            self._cursor.wait_for_update(sleep_time)
+        else:
+            time.sleep(sleep_time)
 
     @property
     def meta_info(self):
@@ -585,6 +707,13 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             self._cursor.cancel()
 
     def _run_next_statement(self):
+        while self._current_query_index < len(self._statement_ranges):
+            cached_result = self._get_cached_statement_result()
+            if cached_result is None:
+                break
+            self._logger.on_statement_cached(self._current_query_index, cached_result)
+            self._current_query_index += 1
+
         if self._current_query_index < len(self._statement_ranges):
             self._logger.on_statement_start(self._current_query_index)
 
@@ -592,16 +721,59 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             statement_start, statement_end = statement_range
 
             statement = self._query[statement_start:statement_end]
+            self._poll_scheduler.reset()
+            self._statement_start_time = time.time()
+            if self._is_client_session_free:
+                self._is_client_session_free = is_session_free_statement(statement)
             self._execute(statement)
             self._current_query_index += 1
         else:
             self._on_query_completion()
 
+    def _get_statements(self, end_index: int) -> List[str]:
+        """Return the statements up to (and including) end_index"""
+        return [
+            self._query[statement_start:statement_end]
+            for statement_start, statement_end in self._statement_ranges[
+                : end_index + 1
+            ]
+        ]
+
+    def _get_cached_statement_result(self):
+        if self._result_cache is None:
+            return None
+
+        try:
+            return self._result_cache.get_statement_result(
+                self._get_statements(self._current_query_index)
+            )
+        except Exception:
+            LOG.error("Failed to get cached statement result", exc_info=True)
+            return None
+
+    def _set_cached_statement_result(self, statement_execution):
+        if self._result_cache is None:
+            return
+
+        try:
+            # The current statement index is incremented once it starts
+            self._result_cache.set_statement_result(
+                self._get_statements(self._current_query_index - 1),
+                statement_execution_id=statement_execution["id"],
+                started_at=self._statement_start_time,
+                result_path=statement_execution["result_path"],
+                result_row_count=statement_execution["result_row_count"],
+                result_truncated=statement_execution["result_truncated"],
+            )
+        except Exception:
+            LOG.error("Failed to cache statement result", exc_info=True)
+
     def _handle_exception(self, e, stack_trace: str):
         try:
             # Try our best to fetch logs again
             if self._cursor:
                 self._logger.on_statement_update(log=self._get_logs())
+            self._logger.flush_statement_update()
         except Exception:
             # In case of failure just ignore
             pass
@@ -623,17 +795,20 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             self.status = QueryExecutionStatus.ERROR
 
     def _on_statement_completion(self):
-        self._logger.on_statement_end(self._cursor)
+        statement_execution = self._logger.on_statement_end(self._cursor)
+        self._set_cached_statement_result(statement_execution)
 
     def _on_query_completion(self):
         self._logger.on_query_end()
         self.status = QueryExecutionStatus.DONE
+        self._release_client()
 
     def _execute(self, statement):
         self._cursor.run(statement)
 
     def _is_statement_completed(self):
         completed = self._cursor.poll()
+        self._poll_scheduler.record_progress(self._cursor.percent_complete)
 
         self._logger.on_statement_update(
             log=self._get_logs(),
@@ -645,9 +820,41 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
 
     def _get_cursor(self):
         if self._client is None:
-            self._client = self._get_client(self._client_setting)
+            self._client = get_client_pool().acquire(
+                self._get_client_pool_key(),
+                lambda: self._get_client(self._client_setting),
+            )
+
+        cursor = self._client.cursor()
+        cursor.set_fetch_options(
+            fetch_size=self._client_setting.get("fetch_size"),
+            prefetch=self._client_setting.get("prefetch") or False,
+            row_limit=self._client_setting.get("row_limit"),
+        )
+        return cursor
 
-        return self._client.cursor()
+    def _get_client_pool_key(self):
+        executor_class = type(self)
+        return get_client_pool_key(
+            f"{executor_class.__module__}.{executor_class.__name__}",
+            self._client_setting,
+        )
+
+    def _release_client(self):
+        """Give the client back to the pool once the query succeeds,
+        clients of failed or cancelled queries are not reused
+        """
+        if self._client is None:
+            return
+
+        # The cursor may hold a connection of the client
+        self._cursor = None
+        get_client_pool().release(
+            self._get_client_pool_key(),
+            self._client,
+            reusable=self._is_client_session_free,
+        )
+        self._client = None
 
     def _get_logs(self):
         return self._cursor.get_logs()
@@ -0,0 +1,131 @@
+import json
+import re
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from env import QuerybookSettings
+from lib.logger import get_logger
+from lib.query_executor.base_client import ClientBaseClass
+
+LOG = get_logger(__file__)
+
+# Statements that leave the session of the client as it was. A client
+# that ran any other statement (ex. USE, SET, CREATE TEMPORARY TABLE)
+# is not reused, since the next query would run in the changed session
+_SESSION_FREE_STATEMENT_REGEX = re.compile(
+    r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*"
+    r"(?:SELECT|WITH|INSERT|UPDATE|DELETE|MERGE|SHOW|DESCRIBE|DESC|EXPLAIN)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def is_session_free_statement(statement: str) -> bool:
+    return _SESSION_FREE_STATEMENT_REGEX.match(statement) is not None
+
+
+def get_client_pool_key(
+    executor_class_name: str, client_setting: Dict
+) -> Tuple[str, str]:
+    """The client setting includes both the query engine
+    params and the proxy user of the query execution
+    """
+    return (executor_class_name, json.dumps(client_setting, sort_keys=True))
+
+
+class ClientPool(object):
+    """Keep the clients of succeeded query executions in the worker process
+    so the next query executions with the same client setting skip the
+    connection setup. A client is used by one query execution at a time.
+    """
+
+    def __init__(self, idle_timeout: float):
+        self._idle_timeout = idle_timeout
+        # key -> [(time released, client)]
+        self._idle_clients: Dict[
+            Hashable, List[Tuple[float, ClientBaseClass]]
+        ] = defaultdict(list)
+        self._lock = Lock()
+
+    def acquire(
+        self, key: Hashable, create_client: Callable[[], ClientBaseClass]
+    ) -> ClientBaseClass:
+        self._evict_idle_clients()
+
+        while True:
+            with self._lock:
+                idle_clients = self._idle_clients.get(key)
+                if not idle_clients:
+                    break
+                # Most recently released first, it is the least likely to be stale
+                _, client = idle_clients.pop()
+
+            if self._is_healthy(client):
+                return client
+            self._close(client)
+
+        return create_client()
+
+    def release(self, key: Hashable, client: ClientBaseClass, reusable: bool = True):
+        """Put the client back to the pool, it must not be used by the caller after
+
+        Arguments:
+            reusable {bool} -- False to close the client instead, ex. if the
+                               session of the client got changed
+        """
+        if self._idle_timeout <= 0 or not reusable or not client.REUSABLE:
+            self._close(client)
+            return
+
+        with self._lock:
+            self._idle_clients[key].append((time.time(), client))
+        self._evict_idle_clients()
+
+    def _evict_idle_clients(self):
+        evicted_clients = []
+        expire_time = time.time() - self._idle_timeout
+        with self._lock:
+            for key in list(self._idle_clients.keys()):
+                clients = self._idle_clients[key]
+                evicted_clients.extend(
+                    client
+                    for released_at, client in clients
+                    if released_at < expire_time
+                )
+                clients = [
+                    (released_at, client)
+                    for released_at, client in clients
+                    if released_at >= expire_time
+                ]
+                if clients:
+                    self._idle_clients[key] = clients
+                else:
+                    del self._idle_clients[key]
+
+        for client in evicted_clients:
+            self._close(client)
+
+    def _is_healthy(self, client: ClientBaseClass) -> bool:
+        try:
+            return client.is_healthy()
+        except Exception:
+            LOG.info("Query engine client health check failed", exc_info=True)
+            return False
+
+    def _close(self, client: ClientBaseClass):
+        try:
+            client.close()
+        except Exception:
+            LOG.info("Failed to close query engine client", exc_info=True)
+
+
+_client_pool = None
+
+
+def get_client_pool() -> ClientPool:
+    """Return the client pool of the current process"""
+    global _client_pool
+    if _client_pool is None:
+        _client_pool = ClientPool(QuerybookSettings.QUERY_CLIENT_POOL_IDLE_TIMEOUT)
+    return _client_pool
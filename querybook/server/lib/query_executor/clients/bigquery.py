@@ -4,6 +4,8 @@ from lib.utils.json import safe_loads
 
 
 class BigQueryClient(ClientBaseClass):
+    REUSABLE = True
+
     def __init__(self, google_credentials_json=None, *args, **kwargs):
         from google.cloud.bigquery import dbapi, Client
 
@@ -38,6 +40,15 @@ class BigQueryCursor(CursorBaseClass):
         # Can't cancel (yet)
         pass
 
+    def set_fetch_options(
+        self, fetch_size: int = None, prefetch: bool = False, row_limit: int = None
+    ):
+        super(BigQueryCursor, self).set_fetch_options(
+            fetch_size=fetch_size, prefetch=prefetch, row_limit=row_limit
+        )
+        # Used as the page size of the query results
+        self._cursor.arraysize = self._fetch_size
+
     def poll(self):
         # Query should immediately start to block after
         # run, so when it gets to poll it is already
@@ -11,6 +11,8 @@ hive_tracking_url_pattern = re.compile(r"View progress at (.*)")
 
 
 class HiveClient(ClientBaseClass):
+    REUSABLE = True
+
     def __init__(
         self,
         connection_string=None,
@@ -44,6 +46,12 @@ class HiveClient(ClientBaseClass):
     def cursor(self) -> CursorBaseClass:
         return HiveCursor(cursor=self._connection.cursor())
 
+    def is_healthy(self) -> bool:
+        return self._connection._transport.isOpen()
+
+    def close(self):
+        self._connection.close()
+
 
 class HiveCursor(CursorBaseClass):
     def __init__(self, cursor):
@@ -63,6 +71,15 @@ class HiveCursor(CursorBaseClass):
     def cancel(self):
         self._cursor.cancel()
 
+    def set_fetch_options(
+        self, fetch_size: int = None, prefetch: bool = False, row_limit: int = None
+    ):
+        super(HiveCursor, self).set_fetch_options(
+            fetch_size=fetch_size, prefetch=prefetch, row_limit=row_limit
+        )
+        # Max rows per FetchResults call to HiveServer2
+        self._cursor.arraysize = self._fetch_size
+
     def poll(self):
         poll_result = self._cursor.poll()
         status = poll_result.operationState
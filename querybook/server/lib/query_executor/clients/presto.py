@@ -1,10 +1,17 @@
+from time import sleep
+
 from pyhive import presto
 
 from lib.query_executor.base_client import ClientBaseClass, CursorBaseClass
 from lib.query_executor.connection_string.presto import get_presto_connection_conf
 
+# Seconds presto holds a request on nextUri when the query state does not change
+NEXT_URI_MAX_WAIT = 1
+
 
 class PrestoClient(ClientBaseClass):
+    REUSABLE = True
+
     def __init__(
         self,
         connection_string,
@@ -46,6 +53,7 @@ class PrestoCursor(CursorBaseClass):
     def _init_query_state_vars(self):
         self._tracking_url = None
         self._percent_complete = 0
+        self._polled_by_wait = False
 
     def run(self, query: str):
         self._init_query_state_vars()
@@ -55,7 +63,14 @@ class PrestoCursor(CursorBaseClass):
         self._cursor.cancel()
 
     def poll(self):
-        poll_result = self._cursor.poll()
+        if self._polled_by_wait:
+            # wait_for_update already polled at the end of the interval
+            self._polled_by_wait = False
+        else:
+            poll_result = self._cursor.poll()
+            if poll_result:
+                self._update_percent_complete(poll_result)
+                self._update_tracking_url(poll_result)
 
         # PyHive does not support presto async, so we need to hack
         status = self._cursor._state
@@ -64,12 +79,21 @@ class PrestoCursor(CursorBaseClass):
             self._cursor._STATE_RUNNING,
             self._cursor._STATE_NONE,
         )
+        return completed
+
+    def wait_for_update(self, timeout: float):
+        # Each poll is a long poll on nextUri, presto holds the request until
+        # the query state changes or for about a second. So the poll is made
+        # at the end of the interval, and the next call of poll reuses it
+        if self._cursor._state != self._cursor._STATE_RUNNING:
+            return
 
+        sleep(max(timeout - NEXT_URI_MAX_WAIT, 0))
+        poll_result = self._cursor.poll()
         if poll_result:
             self._update_percent_complete(poll_result)
             self._update_tracking_url(poll_result)
-
-        return completed
+        self._polled_by_wait = True
 
     def get_one_row(self):
         return self._cursor.fetchone()
@@ -5,6 +5,8 @@ from lib.query_executor.connection_string.sqlalchemy import create_sqlalchemy_en
 
 
 class SqlAlchemyClient(ClientBaseClass):
+    REUSABLE = True
+
     def __init__(
         self, connection_string=None, connect_args=[], proxy_user=None, *args, **kwargs
     ):
@@ -17,6 +19,9 @@ class SqlAlchemyClient(ClientBaseClass):
         super(SqlAlchemyClient, self).__init__()
 
     def __del__(self):
+        self.close()
+
+    def close(self):
         self._engine.dispose()
 
     def cursor(self) -> CursorBaseClass:
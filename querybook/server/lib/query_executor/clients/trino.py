@@ -1,9 +1,16 @@
+from time import sleep
+
 import trino
 from lib.query_executor.base_client import ClientBaseClass, CursorBaseClass
 from lib.query_executor.connection_string.trino import get_trino_connection_conf
 
+# Seconds trino holds a request on nextUri when the query state does not change
+NEXT_URI_MAX_WAIT = 1
+
 
 class TrinoClient(ClientBaseClass):
+    REUSABLE = True
+
     def __init__(
         self, connection_string, username=None, proxy_user=None, *args, **kwargs
     ):
@@ -37,6 +44,7 @@ class TrinoCursor(CursorBaseClass):
     def _init_query_state_vars(self):
         self._tracking_url = None
         self._percent_complete = 0
+        self._fetched_by_wait = False
 
     def run(self, query: str):
         self._init_query_state_vars()
@@ -46,17 +54,33 @@ class TrinoCursor(CursorBaseClass):
         self._cursor.cancel()
 
     def poll(self):
+        if self._fetched_by_wait:
+            # wait_for_update already fetched at the end of the interval
+            self._fetched_by_wait = False
+        elif not self._cursor._query._finished:
+            self._fetch()
+        return self._cursor._query._finished
+
+    def wait_for_update(self, timeout: float):
+        # Each fetch is a long poll on nextUri, trino holds the request until
+        # the query state changes or for about a second. So the fetch is made
+        # at the end of the interval, and the next call of poll reuses it
+        if self._cursor._query._finished:
+            return
+
+        sleep(max(timeout - NEXT_URI_MAX_WAIT, 0))
+        self._fetch()
+        self._fetched_by_wait = True
+
+    def _fetch(self):
         # this needs to be take care
         self.rows.extend(self._cursor._query.fetch())
         self._cursor._iterator = iter(self.rows)
         poll_result = self._cursor.stats
-        completed = self._cursor._query._finished
         if poll_result:
             self._update_percent_complete(poll_result)
             self._update_tracking_url(poll_result)
 
-        return completed
-
     def get_one_row(self):
         return self._cursor.fetchone()
 
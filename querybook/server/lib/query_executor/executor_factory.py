@@ -4,7 +4,8 @@ from app.db import with_session
 from const.query_execution import QueryExecutionStatus
 from lib.logger import get_logger
 from lib.query_analysis import get_statement_ranges
-from lib.query_analysis.lineage import process_query
+from lib.query_analysis.analysis import get_query_analysis
+from lib.query_executor.result_cache import QueryResultCache
 from logic import (
     admin as admin_logic,
     query_execution as qe_logic,
@@ -44,11 +45,29 @@ def _get_executor_params_and_engine(query_execution_id, celery_task, session=Non
             "query": query,
             "statement_ranges": statement_ranges,
             "client_setting": client_setting,
+            "result_cache": get_result_cache_from_engine(engine, client_setting),
         },
         engine,
     )
 
 
+def get_result_cache_from_engine(engine, client_setting: Dict) -> QueryResultCache:
+    """Return the result cache of the engine,
+    None unless the result_cache_ttl of the engine is set
+    """
+    result_cache_ttl = client_setting.get("result_cache_ttl")
+    if not result_cache_ttl or result_cache_ttl <= 0:
+        return None
+
+    return QueryResultCache(
+        engine_id=engine.id,
+        metastore_id=engine.metastore_id,
+        language=engine.language,
+        client_setting=client_setting,
+        ttl=result_cache_ttl,
+    )
+
+
 @with_session
 def get_client_setting_from_engine(engine, uid=None, session=None) -> Dict:
     """Compute the settings passed to the query engine.
@@ -98,10 +117,7 @@ def _get_query_execution_info(query_execution_id, session=None):
 @with_session
 def _assert_safe_query(query, engine_id, session=None):
     try:
-        from lib.metastore.utils import MetastoreTableACLChecker
-
-        table_per_statement, _ = process_query(query)
-        all_tables = [table for tables in table_per_statement for table in tables]
+        from lib.metastore.utils import get_metastore_acl_checker
 
         query_engine = admin_logic.get_query_engine_by_id(engine_id, session=session)
         if query_engine.metastore_id is None:
@@ -111,14 +127,21 @@ def _assert_safe_query(query, engine_id, session=None):
         metastore = admin_logic.get_query_metastore_by_id(
             query_engine.metastore_id, session=session
         )
-        acl_checker = MetastoreTableACLChecker(metastore.acl_control)
-
-        for table in all_tables:
-            schema_name, table_name = table.split(".")
-            if not acl_checker.is_table_valid(schema_name, table_name):
-                raise InvalidQueryExecution(
-                    f"Table {table} is not allowed by metastore"
-                )
+        acl_checker = get_metastore_acl_checker(metastore.id, metastore.acl_control)
+        if not acl_checker.has_acl:
+            LOG.debug("No ACL for metastore, skipping")
+            return
+
+        table_per_statement = get_query_analysis(
+            query, query_engine.language
+        ).table_per_statement
+        invalid_tables = acl_checker.get_invalid_tables(
+            table for tables in table_per_statement for table in tables
+        )
+        if len(invalid_tables):
+            raise InvalidQueryExecution(
+                f"Table {invalid_tables[0]} is not allowed by metastore"
+            )
     except InvalidQueryExecution as e:
         raise e
     except Exception as e:
@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import (
+    BoundedSemaphore,
+    Condition,
+    Event,
+    Thread,
+    current_thread,
+    main_thread,
+)
+
+from const.query_execution import QueryExecutionStatus
+from lib.logger import get_logger
+from lib.query_executor.base_executor import QueryExecutorBaseClass
+
+LOG = get_logger(__file__)
+
+# Number of threads running executor.poll, polls of different
+# executors can block (for example while uploading the result)
+MAX_POLL_WORKERS = 8
+
+
+class _ExecutorEntry(object):
+    def __init__(self, celery_task, executor: QueryExecutorBaseClass):
+        self.celery_task = celery_task
+        # The celery request is thread local, the polls run in other threads
+        self.task_id = celery_task.request.id
+        self.executor = executor
+        self.done = Event()
+        self.error = None
+        # The task stopped waiting for the query (ex. killed or timed out)
+        self.abandoned = False
+
+
+class ExecutorMultiplexer(object):
+    """Drive many query executors from a single process.
+
+    Instead of every query looping on poll/sleep in its own worker slot,
+    the executors are kept in a queue ordered by their next poll time and
+    a single scheduler thread polls the executors that are due. At most
+    max_executors queries run at the same time, the others wait in run().
+
+    Meant for celery workers using the gevent or threads pool, where
+    the tasks waiting in run() are cheap. With the prefork pool each
+    task waiting in run() still holds its worker process, so
+    can_multiplex_executors is False and the queries are polled in
+    their own task instead.
+    """
+
+    def __init__(self, max_executors: int, max_poll_workers: int = MAX_POLL_WORKERS):
+        self._slots = BoundedSemaphore(max_executors)
+        self._poll_pool = ThreadPoolExecutor(max_workers=max_poll_workers)
+
+        # Heap of (next poll time, counter, entry)
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = Condition()
+
+        self._thread = None
+
+    def run(self, celery_task, executor: QueryExecutorBaseClass):
+        """Run the executor until it finishes, same as polling
+           and sleeping in a loop. Blocks until a slot is free
+
+        Arguments:
+            celery_task -- The task that runs the query, to check if it is aborted.
+                           Must be called from the thread of the task
+            executor {QueryExecutorBaseClass} -- The executor of the query
+        """
+        entry = _ExecutorEntry(celery_task, executor)
+        with self._slots:
+            self._schedule(entry, time.time())
+            try:
+                entry.done.wait()
+            except BaseException:
+                # The query is cancelled on its next poll,
+                # it must not run without the task
+                entry.abandoned = True
+                raise
+
+        if entry.error is not None:
+            raise entry.error
+
+    def _schedule(self, entry: _ExecutorEntry, poll_time: float):
+        with self._condition:
+            self._start_scheduler_thread()
+            heapq.heappush(self._queue, (poll_time, next(self._counter), entry))
+            self._condition.notify()
+
+    def _start_scheduler_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(target=self._schedule_polls, daemon=True)
+            self._thread.start()
+
+    def _schedule_polls(self):
+        while True:
+            with self._condition:
+                while len(self._queue) == 0:
+                    self._condition.wait()
+
+                poll_time, _, entry = self._queue[0]
+                wait_time = poll_time - time.time()
+                if wait_time > 0:
+                    # A new executor can be added in the meantime
+                    self._condition.wait(wait_time)
+                    continue
+                heapq.heappop(self._queue)
+
+            self._poll_pool.submit(self._poll, entry)
+
+    def _poll(self, entry: _ExecutorEntry):
+        executor = entry.executor
+        try:
+            if entry.abandoned or entry.celery_task.is_aborted(task_id=entry.task_id):
+                executor.cancel()
+            else:
+                executor.poll()
+                if executor.status == QueryExecutionStatus.RUNNING:
+                    if not entry.abandoned:
+                        self._schedule(
+                            entry, time.time() + executor.next_poll_interval()
+                        )
+                        return
+                    executor.cancel()
+        except Exception as e:
+            LOG.error("Failed to poll query executor", exc_info=True)
+            entry.error = e
+
+        entry.done.set()
+
+
+_executor_multiplexer = None
+
+
+def can_multiplex_executors() -> bool:
+    """Whether the current celery task runs in a gevent greenlet or a pool
+    thread. The tasks of the prefork and solo pools run in the main thread
+    of the worker process, which they block until the query finishes
+    """
+    return current_thread() is not main_thread()
+
+
+def get_executor_multiplexer(max_executors: int) -> ExecutorMultiplexer:
+    """Return the multiplexer of the current process"""
+    global _executor_multiplexer
+    if _executor_multiplexer is None:
+        _executor_multiplexer = ExecutorMultiplexer(max_executors)
+    return _executor_multiplexer
@@ -1,5 +1,36 @@
 from lib.form import FormField, StructFormField, FormFieldType, ExpandableFormField
 
+fetch_size_field = FormField(
+    field_type=FormFieldType.Number,
+    helper="""
+<p>Number of rows fetched from the query engine at a time when the result is uploaded.</p>
+<p>Defaults to 10000.</p>""",
+)
+
+row_limit_field = FormField(
+    field_type=FormFieldType.Number,
+    helper="""
+<p>Max number of rows kept in the query result. Once reached, no more rows
+are fetched and the query is cancelled in the query engine.</p>
+<p>Defaults to no limit other than the result store upload limit.</p>""",
+)
+
+prefetch_field = FormField(
+    field_type=FormFieldType.Boolean,
+    helper="""
+<p>If true, the next rows are fetched from the query engine in the background
+while the current rows are uploaded.</p>""",
+)
+
+result_cache_ttl_field = FormField(
+    field_type=FormFieldType.Number,
+    helper="""
+<p>Number of seconds the result of a SELECT statement is reused when the same
+statement is run again by the same user. Results are not reused once a table read
+by the statement is updated in the metastore.</p>
+<p>Defaults to no result reuse.</p>""",
+)
+
 hive_executor_template = StructFormField(
     hive_resource_manager=FormField(
         description="Provide resource manager link here to provide insights"
@@ -20,6 +51,10 @@ jdbc:hive2://&lt;host1&gt;:&lt;port1&gt;,&lt;host2&gt;:&lt;port2&gt;/dbName;sess
     username=FormField(regex="\\w+"),
     password=FormField(hidden=True),
     impersonate=FormField(field_type=FormFieldType.Boolean),
+    fetch_size=fetch_size_field,
+    prefetch=prefetch_field,
+    row_limit=row_limit_field,
+    result_cache_ttl=result_cache_ttl_field,
 )
 
 presto_executor_template = StructFormField(
@@ -41,6 +76,10 @@ presto_executor_template = StructFormField(
 <p>Defaults to username. Possible values are username, email, fullname </p>
 <p>See [here](https://prestodb.github.io/docs/current/installation/jdbc.html) for more details.</p>""",
     ),
+    fetch_size=fetch_size_field,
+    prefetch=prefetch_field,
+    row_limit=row_limit_field,
+    result_cache_ttl=result_cache_ttl_field,
 )
 
 trino_executor_template = StructFormField(
@@ -61,6 +100,10 @@ trino_executor_template = StructFormField(
 <p>Defaults to username. Possible values are username, email, fullname </p>
 <p>See [here](https://trino.io/docs/current/installation/jdbc.html) for more details.</p>""",
     ),
+    fetch_size=fetch_size_field,
+    prefetch=prefetch_field,
+    row_limit=row_limit_field,
+    result_cache_ttl=result_cache_ttl_field,
 )
 
 sqlalchemy_template = StructFormField(
@@ -81,10 +124,18 @@ sqlalchemy_template = StructFormField(
             ),
         )
     ),
+    fetch_size=fetch_size_field,
+    prefetch=prefetch_field,
+    row_limit=row_limit_field,
+    result_cache_ttl=result_cache_ttl_field,
 )
 
 bigquery_template = StructFormField(
     google_credentials_json=FormField(
         helper="The JSON string used to log in as service account. If not provided then **GOOGLE_CREDS** from settings will be used.",
-    )
+    ),
+    fetch_size=fetch_size_field,
+    prefetch=prefetch_field,
+    row_limit=row_limit_field,
+    result_cache_ttl=result_cache_ttl_field,
 )
@@ -0,0 +1,51 @@
+"""
+Logs of running statements, kept in a redis list so they can be read
+while the statement runs. The log is uploaded to the result store
+once the statement ends and the list is then deleted.
+"""
+from typing import List
+
+from clients.redis_client import with_redis
+
+# Only the latest chunks are kept, and the list is deleted if the
+# statement does not end (ex. the worker is killed)
+LIVE_LOG_MAX_CHUNKS = 10000
+LIVE_LOG_EXPIRATION = 2 * 24 * 60 * 60  # 2 days, same as the query timeout
+
+
+def get_live_log_key(statement_execution_id: int) -> str:
+    return f"statement_execution/{statement_execution_id}/live_log"
+
+
+@with_redis
+def append_live_logs(statement_execution_id: int, logs: List[str], redis_conn=None):
+    if len(logs) == 0:
+        return
+
+    key = get_live_log_key(statement_execution_id)
+    pipeline = redis_conn.pipeline()
+    pipeline.rpush(key, *logs)
+    pipeline.ltrim(key, -LIVE_LOG_MAX_CHUNKS, -1)
+    pipeline.expire(key, LIVE_LOG_EXPIRATION)
+    pipeline.execute()
+
+
+@with_redis
+def get_live_logs(
+    statement_execution_id: int, limit: int = None, redis_conn=None
+) -> List[str]:
+    """Get the log chunks of the statement in order
+
+    Keyword Arguments:
+        limit {int} -- Max number of chunks returned, all if None (default: {None})
+    """
+    end = -1 if limit is None else limit - 1
+    return [
+        log.decode("utf-8")
+        for log in redis_conn.lrange(get_live_log_key(statement_execution_id), 0, end)
+    ]
+
+
+@with_redis
+def delete_live_logs(statement_execution_id: int, redis_conn=None):
+    redis_conn.delete(get_live_log_key(statement_execution_id))
@@ -0,0 +1,60 @@
+import time
+from typing import Optional
+
+
+class PollScheduler(object):
+    """Decide how long the executor waits between two polls of a statement.
+
+    The interval starts at min_interval and grows exponentially up to
+    max_interval, so short statements are noticed quickly and long ones
+    are polled rarely. If the engine reports its progress, the interval
+    is also capped by the estimated time left for the statement.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.5,
+        max_interval: float = 10,
+        backoff_factor: float = 1.5,
+    ):
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self.reset()
+
+    def reset(self):
+        """Called when a new statement starts"""
+        self._interval = self._min_interval
+        self._first_progress = None  # (time, percent_complete)
+        self._last_progress = None
+
+    def record_progress(self, percent_complete: Optional[float]):
+        if percent_complete is None:
+            return
+
+        progress = (time.time(), percent_complete)
+        if self._first_progress is None:
+            self._first_progress = progress
+        self._last_progress = progress
+
+    def get_estimated_time_left(self) -> Optional[float]:
+        if self._first_progress is None:
+            return None
+
+        first_time, first_percent = self._first_progress
+        last_time, last_percent = self._last_progress
+        if last_time <= first_time or last_percent <= first_percent:
+            return None
+
+        progress_rate = (last_percent - first_percent) / (last_time - first_time)
+        return max(100 - last_percent, 0) / progress_rate
+
+    def next_interval(self) -> float:
+        """Return the seconds to wait before the next poll"""
+        interval = self._interval
+        self._interval = min(self._interval * self._backoff_factor, self._max_interval)
+
+        time_left = self.get_estimated_time_left()
+        if time_left is not None:
+            interval = max(min(interval, time_left), self._min_interval)
+        return interval
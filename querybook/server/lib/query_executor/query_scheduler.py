@@ -0,0 +1,390 @@
+"""
+Fair scheduling of the query tasks sent to celery.
+
+Query tasks (run_query_task and run_sample_query) ask for a slot before
+running the query, and are retried later by celery if none is given.
+Slots are limited globally, per user and per query engine (either by the
+max_concurrent_executions of the engine or by the setting), and are given
+in the weighted fair order of the waiting tasks: each (priority, user) is
+a flow, and the tasks of a flow are ordered after the previous tasks of
+the same flow. So a user running a datadoc with many cells only delays
+their own queries, and interactive queries get a bigger share of the
+slots than the scheduled ones.
+
+The scheduler state is kept in redis and only updated under a redis lock.
+Running jobs are touched by their task, so the slot of a job whose worker
+got killed is freed after a few minutes.
+"""
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from clients.redis_client import with_redis
+from const.query_execution import (
+    QueryExecutionPriority,
+    QUERY_EXECUTION_PRIORITY_WEIGHTS,
+)
+from env import QuerybookSettings
+from lib.logger import get_logger
+from lib.utils import json
+
+LOG = get_logger(__file__)
+
+QUERY_SCHEDULER_STATE_KEY = "query_scheduler:state"
+QUERY_SCHEDULER_LOCK_KEY = "query_scheduler:lock"
+QUERY_SCHEDULER_LOCK_TIMEOUT = 10
+
+# Seconds before a task waiting for a slot asks again
+ADMISSION_RETRY_INTERVAL = 2
+# Seconds between two touches of a running job by its task
+RUNNING_JOB_HEARTBEAT_INTERVAL = 30
+# Jobs are removed if their task did not report for a while
+# (ex. the worker running the task got killed)
+WAITING_JOB_EXPIRATION = 2 * 60
+RUNNING_JOB_EXPIRATION = 5 * RUNNING_JOB_HEARTBEAT_INTERVAL
+
+
+def is_query_scheduler_enabled(engine_max_running: int = 0) -> bool:
+    return (
+        engine_max_running > 0
+        or QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING > 0
+        or QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING_PER_USER > 0
+        or QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING_PER_ENGINE > 0
+    )
+
+
+def get_engine_max_running(engine) -> int:
+    """The max concurrent executions of the query engine, 0 for no limit"""
+    return int(engine.get_feature_params().get("max_concurrent_executions") or 0)
+
+
+def get_query_execution_job_id(query_execution_id: int) -> str:
+    return f"query_execution:{query_execution_id}"
+
+
+def get_sample_query_job_id(task_id: str) -> str:
+    return f"sample_query:{task_id}"
+
+
+class QuerySchedulerState(object):
+    """The waiting and running jobs, 0 for any limit means no limit"""
+
+    def __init__(
+        self,
+        state: Dict = None,
+        max_running: int = 0,
+        max_running_per_user: int = 0,
+        max_running_per_engine: int = 0,
+    ):
+        state = state or {}
+        # The tag of the last admitted job
+        self.virtual_time = state.get("virtual_time", 0)
+        # flow -> tag of the last job of the flow
+        self.flow_tags = state.get("flow_tags", {})
+        # job id -> {uid, engine_id, engine_max_running, priority, tag, updated_at}
+        self.waiting = state.get("waiting", {})
+        self.running = state.get("running", {})
+
+        self._max_running = max_running
+        self._max_running_per_user = max_running_per_user
+        self._max_running_per_engine = max_running_per_engine
+
+    def to_dict(self) -> Dict:
+        return {
+            "virtual_time": self.virtual_time,
+            "flow_tags": self.flow_tags,
+            "waiting": self.waiting,
+            "running": self.running,
+        }
+
+    def admit(
+        self,
+        job_id: str,
+        uid: int,
+        engine_id: int,
+        priority: QueryExecutionPriority,
+        now: float,
+        engine_max_running: int = 0,
+    ) -> bool:
+        """Add the job to the waiting jobs if needed, and start it
+           if its turn has come
+
+        Arguments:
+            engine_max_running {int} -- The limit of the engine, overrides
+                                        max_running_per_engine if set
+
+        Returns:
+            bool -- True if the job can run
+        """
+        self._expire_jobs(now)
+        if job_id in self.running:
+            return True
+
+        job = self.waiting.get(job_id)
+        if job is None:
+            flow = f"{priority.value}:{uid}"
+            tag = max(self.virtual_time, self.flow_tags.get(flow, 0)) + (
+                1 / QUERY_EXECUTION_PRIORITY_WEIGHTS[priority]
+            )
+            self.flow_tags[flow] = tag
+            job = {
+                "uid": uid,
+                "engine_id": engine_id,
+                "priority": priority.value,
+                "tag": tag,
+            }
+            self.waiting[job_id] = job
+        job["engine_max_running"] = engine_max_running
+        job["updated_at"] = now
+
+        if job_id not in self._get_admissible_job_ids():
+            return False
+
+        del self.waiting[job_id]
+        self.running[job_id] = job
+        self.virtual_time = max(self.virtual_time, job["tag"])
+        # Flows behind the virtual time are the same as new flows
+        self.flow_tags = {
+            flow: tag for flow, tag in self.flow_tags.items() if tag > self.virtual_time
+        }
+        return True
+
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        """The position of the waiting job in the queue, starting from 1.
+        Only the jobs before that take the same slots are counted
+        """
+        job = self.waiting.get(job_id)
+        if job is None:
+            return None
+
+        return 1 + sum(
+            1
+            for other_job_id, other_job in self.waiting.items()
+            if (other_job["tag"], other_job_id) < (job["tag"], job_id)
+            and self._is_competing_job(job, other_job)
+        )
+
+    def touch(self, job_id: str, now: float):
+        """Keep the running job from expiring"""
+        if job_id in self.running:
+            self.running[job_id]["updated_at"] = now
+
+    def release(self, job_id: str):
+        self.waiting.pop(job_id, None)
+        self.running.pop(job_id, None)
+
+    def _get_admissible_job_ids(self) -> Set[str]:
+        """Waiting jobs that get a slot if they ask now. The slots of the
+        jobs before in the fair order are kept for them
+        """
+        total_count = len(self.running)
+        user_counts = {}
+        engine_counts = {}
+        for job in self.running.values():
+            self._count_job(job, user_counts, engine_counts)
+
+        admissible_job_ids = set()
+        for job_id, job in sorted(
+            self.waiting.items(), key=lambda item: (item[1]["tag"], item[0])
+        ):
+            if self._max_running > 0 and total_count >= self._max_running:
+                break
+            max_running_per_engine = (
+                job.get("engine_max_running") or self._max_running_per_engine
+            )
+            if (
+                self._max_running_per_user > 0
+                and user_counts.get(job["uid"], 0) >= self._max_running_per_user
+            ) or (
+                max_running_per_engine > 0
+                and engine_counts.get(job["engine_id"], 0) >= max_running_per_engine
+            ):
+                continue
+
+            admissible_job_ids.add(job_id)
+            total_count += 1
+            self._count_job(job, user_counts, engine_counts)
+        return admissible_job_ids
+
+    def _is_competing_job(self, job: Dict, other_job: Dict) -> bool:
+        """If the other job takes a slot that the job is waiting for"""
+        if self._max_running > 0:
+            return True
+        if self._max_running_per_user > 0 and other_job["uid"] == job["uid"]:
+            return True
+        max_running_per_engine = (
+            job.get("engine_max_running") or self._max_running_per_engine
+        )
+        return max_running_per_engine > 0 and other_job["engine_id"] == job["engine_id"]
+
+    def _count_job(self, job: Dict, user_counts: Dict, engine_counts: Dict):
+        user_counts[job["uid"]] = user_counts.get(job["uid"], 0) + 1
+        engine_counts[job["engine_id"]] = engine_counts.get(job["engine_id"], 0) + 1
+
+    def _expire_jobs(self, now: float):
+        self.waiting = {
+            job_id: job
+            for job_id, job in self.waiting.items()
+            if job["updated_at"] >= now - WAITING_JOB_EXPIRATION
+        }
+        self.running = {
+            job_id: job
+            for job_id, job in self.running.items()
+            if job["updated_at"] >= now - RUNNING_JOB_EXPIRATION
+        }
+
+
+def _get_state(redis_conn) -> QuerySchedulerState:
+    raw_state = redis_conn.get(QUERY_SCHEDULER_STATE_KEY)
+    return QuerySchedulerState(
+        json.loads(raw_state) if raw_state is not None else None,
+        max_running=QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING,
+        max_running_per_user=QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING_PER_USER,
+        max_running_per_engine=QuerybookSettings.QUERY_SCHEDULER_MAX_RUNNING_PER_ENGINE,
+    )
+
+
+def _set_state(redis_conn, state: QuerySchedulerState):
+    redis_conn.set(QUERY_SCHEDULER_STATE_KEY, json.dumps(state.to_dict()))
+
+
+@with_redis
+def try_admit_job(
+    job_id: str,
+    uid: int,
+    engine_id: int,
+    priority: QueryExecutionPriority,
+    engine_max_running: int = 0,
+    now: float = None,
+    redis_conn=None,
+) -> Tuple[bool, Optional[int]]:
+    """Ask for a slot to run the job, the job keeps its place
+       in the queue until it is admitted or released
+
+    Returns:
+        Tuple[bool, Optional[int]] -- True if the job can run, otherwise ask
+                                      again later. And the position of the job
+                                      in the queue if it cannot run
+    """
+    if not is_query_scheduler_enabled(engine_max_running):
+        return True, None
+
+    with redis_conn.lock(
+        QUERY_SCHEDULER_LOCK_KEY, timeout=QUERY_SCHEDULER_LOCK_TIMEOUT
+    ):
+        state = _get_state(redis_conn)
+        admitted = state.admit(
+            job_id,
+            uid,
+            engine_id,
+            priority,
+            now if now is not None else time.time(),
+            engine_max_running=engine_max_running,
+        )
+        queue_position = None if admitted else state.get_queue_position(job_id)
+        _set_state(redis_conn, state)
+    return admitted, queue_position
+
+
+@with_redis
+def touch_job(job_id: str, now: float = None, redis_conn=None):
+    """Report that the task of the running job is still alive"""
+    try:
+        with redis_conn.lock(
+            QUERY_SCHEDULER_LOCK_KEY, timeout=QUERY_SCHEDULER_LOCK_TIMEOUT
+        ):
+            state = _get_state(redis_conn)
+            state.touch(job_id, now if now is not None else time.time())
+            _set_state(redis_conn, state)
+    except Exception:
+        LOG.error("Failed to touch query task", exc_info=True)
+
+
+# job id -> event set to stop touching the job
+_job_heartbeats: Dict[str, Event] = {}
+_job_heartbeats_lock = Lock()
+
+
+def _start_job_heartbeat(job_id: str):
+    """Touch the running job in a thread of the task until it is released,
+    so the job expires soon after the worker running it gets killed
+    """
+    stopped = Event()
+    with _job_heartbeats_lock:
+        if job_id in _job_heartbeats:
+            return
+        _job_heartbeats[job_id] = stopped
+
+    def beat():
+        while not stopped.wait(RUNNING_JOB_HEARTBEAT_INTERVAL):
+            touch_job(job_id)
+
+    Thread(target=beat, daemon=True).start()
+
+
+def _stop_job_heartbeat(job_id: str):
+    with _job_heartbeats_lock:
+        stopped = _job_heartbeats.pop(job_id, None)
+    if stopped is not None:
+        stopped.set()
+
+
+@with_redis
+def release_job(job_id: str, redis_conn=None):
+    """Free the slot of the job (or its place in the queue)"""
+    _stop_job_heartbeat(job_id)
+    try:
+        with redis_conn.lock(
+            QUERY_SCHEDULER_LOCK_KEY, timeout=QUERY_SCHEDULER_LOCK_TIMEOUT
+        ):
+            state = _get_state(redis_conn)
+            state.release(job_id)
+            _set_state(redis_conn, state)
+    except Exception:
+        # The slot is freed once the job expires
+        LOG.error("Failed to release query task", exc_info=True)
+
+
+def wait_for_admission(
+    celery_task,
+    job_id: str,
+    uid: int,
+    engine_id: int,
+    priority: QueryExecutionPriority,
+    engine_max_running: int = 0,
+    on_queued: Callable[[int], None] = None,
+) -> bool:
+    """Return if the job can run, otherwise retry the celery task later.
+       Jobs run right away if the scheduler fails
+
+    Arguments:
+        on_queued {Callable[[int], None]} -- Called with the position of the
+                                             job in the queue before retrying
+
+    Raises:
+        Retry: The celery task is sent again
+
+    Returns:
+        bool -- Whether or not the job got a slot, it must be released after
+    """
+    if not is_query_scheduler_enabled(engine_max_running):
+        return False
+
+    try:
+        admitted, queue_position = try_admit_job(
+            job_id, uid, engine_id, priority, engine_max_running=engine_max_running
+        )
+    except Exception:
+        LOG.error("Failed to schedule query task", exc_info=True)
+        return False
+
+    if admitted:
+        _start_job_heartbeat(job_id)
+        return True
+
+    if on_queued is not None:
+        try:
+            on_queued(queue_position)
+        except Exception:
+            LOG.info("Failed to report the queue position", exc_info=True)
+    raise celery_task.retry(countdown=ADMISSION_RETRY_INTERVAL, max_retries=None)
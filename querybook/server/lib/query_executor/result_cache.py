@@ -0,0 +1,201 @@
+"""
+Opt-in cache of statement results, enabled per query engine by
+setting the result_cache_ttl of the engine. When a statement with the
+same normalized text is run again on the same engine by the same
+engine user (and the same preceding statements), the new statement
+execution reuses the result_path of the previous one instead of
+running the statement again.
+
+Entries expire after the TTL, and are ignored once any of the tables
+read by the statement has a table_updated_at (as synced from the
+metastore) later than the time the cached statement started.
+"""
+import datetime
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional
+
+import sqlparse
+
+from app.db import with_session
+from clients.redis_client import with_redis
+from lib.logger import get_logger
+from lib.query_analysis import get_normalized_statement
+from lib.query_analysis.analysis import get_query_analysis
+from logic import metastore as m_logic
+
+LOG = get_logger(__file__)
+
+# Statements allowed before a cached statement, they do not change any data
+PRECEDING_STATEMENT_TYPES = set(["SELECT", "USE", "SET"])
+
+
+def get_statement_type(statement: str) -> Optional[str]:
+    parsed_statements = sqlparse.parse(statement)
+    if len(parsed_statements) == 0:
+        return None
+
+    parsed_statement = parsed_statements[0]
+    statement_type = parsed_statement.get_type()
+    if statement_type != "UNKNOWN":
+        return statement_type
+
+    first_token = parsed_statement.token_first(skip_cm=True)
+    return first_token.value.upper() if first_token is not None else None
+
+
+def is_cacheable_statement(
+    statements: List[str],
+    get_type: Callable[[str], Optional[str]] = get_statement_type,
+) -> bool:
+    """Whether or not the result of the last statement can be
+       cached, given the statements that run before it
+
+    Arguments:
+        statements {List[str]} -- The statements up to (and including) the cached one
+        get_type {Callable[[str], Optional[str]]} -- Returns the type of a statement
+    """
+    *preceding_statements, statement = statements
+    return get_type(statement) == "SELECT" and all(
+        get_type(preceding_statement) in PRECEDING_STATEMENT_TYPES
+        for preceding_statement in preceding_statements
+    )
+
+
+class QueryResultCache(object):
+    def __init__(
+        self,
+        engine_id: int,
+        metastore_id: Optional[int],
+        language: str,
+        client_setting: Dict,
+        ttl: int,
+    ):
+        self._engine_id = engine_id
+        self._metastore_id = metastore_id
+        self._language = language
+        # The client setting contains the proxy user, so results are
+        # only shared between executions running as the same engine user
+        self._client_setting = client_setting
+        self._ttl = ttl
+
+        # The lookups of a query execution are given the statements before
+        # as well, so each statement is only typed and normalized once
+        self._statement_types: Dict[str, Optional[str]] = {}
+        self._normalized_statements: Dict[str, str] = {}
+
+    def get_cache_key(self, statements: List[str]) -> str:
+        key = json.dumps(
+            {
+                "engine_id": self._engine_id,
+                "client_setting": self._client_setting,
+                "statements": [
+                    self._get_normalized_statement(statement)
+                    for statement in statements
+                ],
+            },
+            sort_keys=True,
+        )
+        return "query_result_cache:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @with_redis
+    @with_session
+    def get_statement_result(
+        self, statements: List[str], redis_conn=None, session=None
+    ) -> Optional[Dict]:
+        """Get the cached result of the last statement
+
+        Arguments:
+            statements {List[str]} -- The statements up to (and including) the cached one
+
+        Returns:
+            Optional[Dict] -- statement_execution_id, result_path, result_row_count,
+                              result_truncated and started_at. None if not cached
+        """
+        if not self._is_cacheable_statement(statements):
+            return None
+
+        raw_result = redis_conn.get(self.get_cache_key(statements))
+        if raw_result is None:
+            return None
+
+        result = json.loads(raw_result)
+        if self._is_table_updated_since(
+            statements, result["started_at"], session=session
+        ):
+            return None
+        return result
+
+    @with_redis
+    def set_statement_result(
+        self,
+        statements: List[str],
+        statement_execution_id: int,
+        started_at: float,
+        result_path: str,
+        result_row_count: int,
+        result_truncated: bool,
+        redis_conn=None,
+    ):
+        """Cache the result of the last statement
+
+        Arguments:
+            statements {List[str]} -- The statements up to (and including) the cached one
+            statement_execution_id {int} -- The statement execution of the last statement
+            started_at {float} -- Timestamp of when the statement started
+        """
+        if result_path is None or not self._is_cacheable_statement(statements):
+            return
+
+        redis_conn.set(
+            self.get_cache_key(statements),
+            json.dumps(
+                {
+                    "statement_execution_id": statement_execution_id,
+                    "started_at": started_at,
+                    "result_path": result_path,
+                    "result_row_count": result_row_count,
+                    "result_truncated": result_truncated,
+                }
+            ),
+            ex=self._ttl,
+        )
+
+    def _is_cacheable_statement(self, statements: List[str]) -> bool:
+        return is_cacheable_statement(statements, self._get_statement_type)
+
+    def _get_statement_type(self, statement: str) -> Optional[str]:
+        if statement not in self._statement_types:
+            self._statement_types[statement] = get_statement_type(statement)
+        return self._statement_types[statement]
+
+    def _get_normalized_statement(self, statement: str) -> str:
+        if statement not in self._normalized_statements:
+            self._normalized_statements[statement] = get_normalized_statement(statement)
+        return self._normalized_statements[statement]
+
+    def _is_table_updated_since(
+        self, statements: List[str], timestamp: float, session=None
+    ) -> bool:
+        if self._metastore_id is None:
+            return False
+
+        table_per_statement = get_query_analysis(
+            ";\n".join(statements), self._language
+        ).table_per_statement
+        all_tables = set(table for tables in table_per_statement for table in tables)
+        cached_at = datetime.datetime.fromtimestamp(timestamp)
+
+        for table_name in all_tables:
+            schema_name, name = table_name.split(".", 1)
+            table = m_logic.get_table_by_name(
+                schema_name, name, self._metastore_id, session=session
+            )
+            if (
+                table is not None
+                and table.table_updated_at is not None
+                and table.table_updated_at >= cached_at
+            ):
+                LOG.debug(f"Cached result is stale since {table_name} is updated")
+                return True
+        return False
@@ -1,7 +1,9 @@
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Union
 
 from .all_result_stores import ALL_RESULT_STORES
 from .stores.base_store import BaseReader, BaseUploader
+from .formats import get_result_format_by_uri
+from .row_index import read_row_index
 from env import QuerybookSettings
 
 
@@ -18,7 +20,13 @@ class GenericUploader(BaseUploader):
     def start(self) -> None:
         self._uploader.start()
 
-    def write(self, data: str) -> bool:
+    @classmethod
+    def supports_binary(cls) -> bool:
+        return ALL_RESULT_STORES[
+            QuerybookSettings.RESULT_STORE_TYPE
+        ].uploader.supports_binary()
+
+    def write(self, data: Union[str, bytes]) -> bool:
         return self._uploader.write(data)
 
     def end(self):
@@ -37,7 +45,10 @@ class GenericUploader(BaseUploader):
 class GenericReader(BaseReader):
     def __init__(self, uri: str, **kwargs):
         store_type, uri_suffix = uri.split("://")
+        self._store_type = store_type
+        self._uri_suffix = uri_suffix
         self._reader = ALL_RESULT_STORES[store_type].reader(uri_suffix, **kwargs)
+        self._result_format = get_result_format_by_uri(uri_suffix)
 
     def start(self):
         self._reader.start()
@@ -45,17 +56,45 @@ class GenericReader(BaseReader):
     def get_csv_iter(
         self, number_of_lines: Optional[int]
     ) -> Generator[List[List[str]], None, None]:
-        return self._reader.get_csv_iter(number_of_lines)
+        return self._result_format.get_csv_iter(self._reader, number_of_lines)
 
     def read_lines(self, number_of_lines: int) -> List[str]:
-        return self._reader.read_lines(number_of_lines)
+        return self._result_format.read_lines(self._reader, number_of_lines)
+
+    def get_bytes_iter(self) -> Generator[bytes, None, None]:
+        return self._reader.get_bytes_iter()
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        return self._result_format.get_raw_iter(self._reader)
 
     def read_raw(self) -> str:
-        return self._reader.read_raw()
+        return self._result_format.read_raw(self._reader)
+
+    def read_rows(
+        self, offset: int, limit: int, with_columns: bool = False
+    ) -> List[List[str]]:
+        """Read limit rows starting from the row number offset.
+           If the result has a row index, only the rows close to offset are read
+
+        Arguments:
+            offset {int} -- Row number of the first row, 0 is the row after columns
+            limit {int} -- The max number of rows to return
+            with_columns {bool} -- If true, the columns are returned before the rows
+
+        Returns:
+            List[List[str]] -- The rows
+        """
+        row_index = None
+        if offset > 0:
+            row_index = read_row_index(self._store_type, self._uri_suffix)
+        return self._result_format.read_rows(
+            self._reader, offset, limit, row_index, with_columns=with_columns
+        )
 
     @property
     def has_download_url(self):
-        return self._reader.has_download_url
+        # Binary results are converted to csv before download
+        return not self._result_format.is_binary and self._reader.has_download_url
 
     def get_download_url(self, custom_name=None):
         return self._reader.get_download_url(custom_name=custom_name)
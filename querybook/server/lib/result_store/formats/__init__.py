@@ -0,0 +1,41 @@
+from env import QuerybookSettings
+from lib.result_store.all_result_stores import ALL_RESULT_STORES
+from lib.utils.compression import remove_compression_extension
+from .base_format import BaseResultFormat
+from .arrow_format import ArrowResultFormat
+from .csv_format import CSVResultFormat
+
+
+ALL_RESULT_FORMATS = {
+    result_format.format_name: result_format
+    for result_format in (CSVResultFormat(), ArrowResultFormat())
+}
+DEFAULT_RESULT_FORMAT = ALL_RESULT_FORMATS["csv"]
+
+
+def get_result_format_by_uri(uri: str) -> BaseResultFormat:
+    """Find the format of the stored file by its extension,
+    files without a known extension (such as logs) are
+    treated as csv
+    """
+    file_extension = remove_compression_extension(uri).rsplit(".", 1)[-1]
+    for result_format in ALL_RESULT_FORMATS.values():
+        if result_format.file_extension == file_extension:
+            return result_format
+    return DEFAULT_RESULT_FORMAT
+
+
+def get_upload_result_format() -> BaseResultFormat:
+    """Get the format to upload new results with, which is
+    RESULT_STORE_FORMAT unless the result store cannot
+    hold binary data
+    """
+    format_name = QuerybookSettings.RESULT_STORE_FORMAT
+    if format_name not in ALL_RESULT_FORMATS:
+        raise ValueError(f"Invalid result store format {format_name}")
+
+    result_format = ALL_RESULT_FORMATS[format_name]
+    uploader = ALL_RESULT_STORES[QuerybookSettings.RESULT_STORE_TYPE].uploader
+    if result_format.is_binary and not uploader.supports_binary():
+        return DEFAULT_RESULT_FORMAT
+    return result_format
@@ -0,0 +1,260 @@
+import datetime
+from io import BufferedReader
+from typing import Any, Generator, List, Optional
+
+from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.utils.csv import serialize_cell
+from .base_format import BaseResultFormat, BaseResultWriter, BytesIterIO
+
+# Number of rows encoded into a single arrow record batch
+ARROW_RECORD_BATCH_SIZE = 10000
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise Exception(
+            "pyarrow is not installed. "
+            + "Please make sure it is installed "
+            + "to use the arrow result format"
+        )
+    return pyarrow
+
+
+def get_arrow_type(pa, values: List[Any]):
+    """Find the arrow type to store the values losslessly.
+       Values that can't be typed are stored as serialized strings
+
+    Args:
+        pa: the pyarrow module
+        values (List[Any]): values of a column
+
+    Returns:
+        The arrow DataType, None if all values are None
+    """
+    value_types = set(map(type, values))
+    value_types.discard(type(None))
+
+    if len(value_types) == 0:
+        return None
+    if len(value_types) > 1:
+        return pa.string()
+
+    value_type = value_types.pop()
+    if value_type == bool:
+        return pa.bool_()
+    elif value_type == int:
+        return pa.int64()
+    elif value_type == float:
+        return pa.float64()
+    elif value_type == datetime.date:
+        return pa.date32()
+    elif value_type == datetime.datetime:
+        # Timezones are kept in the string representation
+        if any(value.tzinfo is not None for value in values if value is not None):
+            return pa.string()
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def values_to_arrow_array(pa, values: List[Any], arrow_type):
+    if arrow_type != pa.string():
+        try:
+            return pa.array(values, type=arrow_type)
+        except (pa.ArrowException, OverflowError, TypeError):
+            # i.e int larger than int64, fallback to string
+            pass
+
+    return pa.array(
+        [
+            value if value is None or isinstance(value, str) else serialize_cell(value)
+            for value in values
+        ],
+        type=pa.string(),
+    )
+
+
+class UploaderSink(object):
+    """File-like object given to the arrow stream writer, buffers the
+    small writes of arrow and pass them as a whole to the uploader
+    """
+
+    def __init__(self, uploader: BaseUploader):
+        self._uploader = uploader
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def upload(self) -> bool:
+        if len(self._chunks) == 0:
+            return True
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return self._uploader.write(data)
+
+
+class ArrowResultWriter(BaseResultWriter):
+    """Writes the result as a sequence of arrow IPC streams.
+
+    Column types are inferred from the rows of the first record batch,
+    if a later batch does not fit the schema, the current stream is closed
+    and a new stream is started with the updated schema.
+    """
+
+    def __init__(self, uploader: BaseUploader):
+        super(ArrowResultWriter, self).__init__(uploader)
+        self._pa = import_pyarrow()
+        self._sink = UploaderSink(uploader)
+        self._columns = []
+        self._rows = []
+        self._schema = None
+        self._stream_writer = None
+
+    def write_columns(self, columns: List[str]) -> bool:
+        self._columns = [serialize_cell(column) for column in columns]
+        return True
+
+    def write_rows(self, rows: List[List[Any]]) -> int:
+        # Number of the given rows uploaded, negative while the
+        # buffered rows of the previous calls are flushed first
+        rows_uploaded = -len(self._rows)
+        self._rows.extend(rows)
+        while len(self._rows) >= ARROW_RECORD_BATCH_SIZE:
+            if not self._flush():
+                # The rows after the failed batch are dropped as well,
+                # so the result has no gap
+                self._rows = []
+                return max(rows_uploaded, 0)
+            rows_uploaded += ARROW_RECORD_BATCH_SIZE
+        return len(rows)
+
+    def end(self) -> None:
+        while len(self._rows) or self._stream_writer is None:
+            self._flush()
+        if self._stream_writer is not None:
+            self._stream_writer.close()
+            self._stream_writer = None
+            self._sink.upload()
+
+    def _flush(self) -> bool:
+        pa = self._pa
+        rows = self._rows[:ARROW_RECORD_BATCH_SIZE]
+        self._rows = self._rows[ARROW_RECORD_BATCH_SIZE:]
+
+        columns_values = list(zip(*rows)) if len(rows) else [[] for _ in self._columns]
+        arrow_types = []
+        for idx, values in enumerate(columns_values):
+            arrow_type = get_arrow_type(pa, values)
+            if arrow_type is None:
+                arrow_type = (
+                    self._schema.field(idx).type
+                    if self._schema is not None
+                    else pa.string()
+                )
+            arrow_types.append(arrow_type)
+
+        arrays = [
+            values_to_arrow_array(pa, values, arrow_type)
+            for values, arrow_type in zip(columns_values, arrow_types)
+        ]
+        schema = pa.schema(
+            [pa.field(name, array.type) for name, array in zip(self._columns, arrays)]
+        )
+
+        if self._schema is None or not schema.equals(self._schema):
+            if self._stream_writer is not None:
+                self._stream_writer.close()
+            self._schema = schema
+            self._stream_writer = pa.ipc.new_stream(self._sink, schema)
+
+        if len(rows):
+            self._stream_writer.write_batch(
+                pa.RecordBatch.from_arrays(arrays, schema=schema)
+            )
+        return self._sink.upload()
+
+
+def arrow_column_to_strings(pa, column) -> List[str]:
+    values = column.to_pylist()
+    if pa.types.is_string(column.type):
+        return ["null" if value is None else value for value in values]
+    return [serialize_cell(value) for value in values]
+
+
+class ArrowResultFormat(BaseResultFormat):
+    @property
+    def format_name(self) -> str:
+        return "arrow"
+
+    @property
+    def file_extension(self) -> str:
+        return "arrow"
+
+    @property
+    def is_binary(self) -> bool:
+        return True
+
+    def get_writer(self, uploader: BaseUploader) -> BaseResultWriter:
+        return ArrowResultWriter(uploader)
+
+    def get_csv_iter(
+        self, reader: BaseReader, number_of_lines: Optional[int]
+    ) -> Generator[List[str], None, None]:
+        # get_bytes_iter is called eagerly so the result can
+        # still be iterated after the reader is ended
+        stream = BufferedReader(BytesIterIO(reader.get_bytes_iter()))
+        return self._read_rows(stream, number_of_lines)
+
+    def _read_rows(
+        self, stream: BufferedReader, number_of_lines: Optional[int]
+    ) -> Generator[List[str], None, None]:
+        pa = import_pyarrow()
+
+        lines_left = number_of_lines
+        has_read_columns = False
+        while lines_left != 0 and len(stream.peek(1)):
+            try:
+                stream_reader = pa.ipc.open_stream(stream)
+            except pa.ArrowInvalid:
+                # Incomplete stream, the upload was likely cut short
+                break
+
+            if not has_read_columns:
+                has_read_columns = True
+                yield stream_reader.schema.names
+                if lines_left is not None:
+                    lines_left -= 1
+
+            while lines_left != 0:
+                try:
+                    batch = stream_reader.read_next_batch()
+                except StopIteration:
+                    break
+                except pa.ArrowInvalid:
+                    return
+
+                if lines_left is not None:
+                    batch = batch.slice(0, lines_left)
+                    lines_left -= batch.num_rows
+
+                columns = [
+                    arrow_column_to_strings(pa, column) for column in batch.columns
+                ]
+                yield from map(list, zip(*columns))
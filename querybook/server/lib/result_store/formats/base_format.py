@@ -0,0 +1,181 @@
+from abc import ABC, abstractmethod
+from io import RawIOBase
+from itertools import islice
+from typing import Any, Generator, Iterator, List, Optional, Tuple
+
+from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.utils.csv import row_to_csv, rows_to_csv
+
+# (row number, byte offset of the row in the stored file)
+RowIndex = List[Tuple[int, int]]
+
+# Number of rows converted into a single csv chunk by get_raw_iter
+RAW_CHUNK_ROW_COUNT = 1000
+
+
+class BaseResultWriter(ABC):
+    """Base interface for encoding query results into an uploader"""
+
+    def __init__(self, uploader: BaseUploader):
+        self._uploader = uploader
+
+    @abstractmethod
+    def write_columns(self, columns: List[str]) -> bool:
+        """Write the header of the result, must be called
+           once before any write_rows
+
+        Arguments:
+            columns {List[str]} -- The column names
+
+        Returns:
+            bool -- Whether or not the upload was successful
+        """
+        pass
+
+    @abstractmethod
+    def write_rows(self, rows: List[List[Any]]) -> int:
+        """Write a block of rows of the result, the writer may
+           buffer the rows until end() is called
+
+        Arguments:
+            rows {List[List[Any]]} -- The row values returned by the cursor
+
+        Returns:
+            int -- The number of rows written, if it is less than len(rows)
+                   then the upload limit is reached
+        """
+        pass
+
+    def write_row(self, row: List[Any]) -> bool:
+        return self.write_rows([row]) == 1
+
+    def end(self) -> None:
+        """Flush any buffered rows into the uploader.
+        The uploader itself is not ended
+        """
+        pass
+
+    @property
+    def row_index(self) -> Optional[RowIndex]:
+        """Byte offsets of the rows written, recorded every few rows.
+        Row numbers start at 0 for the first row after the columns.
+        None if the format cannot be read from a row offset
+        """
+        return None
+
+
+class BaseResultFormat(ABC):
+    """Describes how a statement result is encoded in the result store.
+    The result stored can be read back as rows of strings, with
+    the first row being the columns, regardless of the format.
+    """
+
+    @property
+    @abstractmethod
+    def format_name(self) -> str:
+        """Name of the format, used in RESULT_STORE_FORMAT"""
+        raise NotImplementedError()
+
+    @property
+    @abstractmethod
+    def file_extension(self) -> str:
+        """File extension of the uploaded result, used to
+        identify the format when the result is read
+        """
+        raise NotImplementedError()
+
+    @property
+    def is_binary(self) -> bool:
+        """If true, the writer uploads bytes instead of strings"""
+        return False
+
+    @abstractmethod
+    def get_writer(self, uploader: BaseUploader) -> BaseResultWriter:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_csv_iter(
+        self, reader: BaseReader, number_of_lines: Optional[int]
+    ) -> Generator[List[str], None, None]:
+        """Decode the result into rows of strings
+
+        Arguments:
+            reader {BaseReader} -- An already started store reader
+            number_of_lines {Optional[int]} -- The number of rows to return,
+                including the column row. If None the entire result is read
+
+        Returns:
+            Generator[List[str], None, None] -- generator for parsed rows
+        """
+        raise NotImplementedError()
+
+    def read_lines(self, reader: BaseReader, number_of_lines: int) -> List[str]:
+        """Return the result as csv lines (without line terminator)"""
+        return [
+            row_to_csv(row)[:-1] for row in self.get_csv_iter(reader, number_of_lines)
+        ]
+
+    def get_raw_iter(self, reader: BaseReader) -> Generator[str, None, None]:
+        """Return the entire result as csv string chunks"""
+        csv_iter = self.get_csv_iter(reader, None)
+        while True:
+            rows = list(islice(csv_iter, RAW_CHUNK_ROW_COUNT))
+            if len(rows) == 0:
+                break
+            yield rows_to_csv(rows)
+
+    def read_raw(self, reader: BaseReader) -> str:
+        """Return the entire result as a csv string"""
+        return "".join(self.get_raw_iter(reader))
+
+    def read_rows(
+        self,
+        reader: BaseReader,
+        offset: int,
+        limit: int,
+        row_index: Optional[RowIndex] = None,
+        with_columns: bool = False,
+    ) -> List[List[str]]:
+        """Return limit rows starting from the row number offset
+
+        Arguments:
+            reader {BaseReader} -- An already started store reader
+            offset {int} -- Row number of the first row returned, 0 is
+                the first row after the columns
+            limit {int} -- The max number of rows returned
+            row_index {Optional[RowIndex]} -- The row index written along with the
+                result, if given the rows before offset may not be read
+            with_columns {bool} -- If true, the columns are returned before the
+                rows. The reader can only be read once, so the columns cannot be
+                read separately before
+
+        Returns:
+            List[List[str]] -- The rows
+        """
+        csv_iter = self.get_csv_iter(reader, None)
+        columns = list(islice(csv_iter, 1))
+        rows = list(islice(csv_iter, offset, offset + limit))
+        return columns + rows if with_columns else rows
+
+
+class BytesIterIO(RawIOBase):
+    """Readable file-like object over a generator of bytes"""
+
+    def __init__(self, bytes_iter: Iterator[bytes]):
+        self._bytes_iter = bytes_iter
+        self._left_over = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        while len(self._left_over) == 0:
+            chunk = next(self._bytes_iter, None)
+            if chunk is None:
+                return 0
+            self._left_over = memoryview(chunk)
+
+        size = min(len(buffer), len(self._left_over))
+        buffer[:size] = self._left_over[:size]
+        self._left_over = self._left_over[size:]
+        return size
@@ -0,0 +1,134 @@
+import bisect
+import csv
+from io import BufferedReader, TextIOWrapper
+from itertools import islice
+from typing import Any, Generator, List, Optional
+
+from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.utils.csv import row_to_csv, rows_to_csv
+from .base_format import BaseResultFormat, BaseResultWriter, BytesIterIO, RowIndex
+
+# The byte offset of a row is recorded every ROW_INDEX_INTERVAL rows
+ROW_INDEX_INTERVAL = 1000
+
+
+def get_utf8_length(data: str) -> int:
+    return len(data.encode("utf-8"))
+
+
+class CSVResultWriter(BaseResultWriter):
+    def __init__(self, uploader: BaseUploader):
+        super(CSVResultWriter, self).__init__(uploader)
+        self._bytes_written = 0
+        self._rows_written = 0
+        self._row_index = []
+
+    def write_columns(self, columns: List[str]) -> bool:
+        return self._write(row_to_csv(columns))
+
+    def write_rows(self, rows: List[List[Any]]) -> int:
+        # Serialize the rows in parts that start at indexed rows
+        # so the byte offsets of these rows are known
+        parts = []
+        row_index = []
+        part_offset = self._bytes_written
+        part_start = 0
+        while part_start < len(rows):
+            row_number = self._rows_written + part_start
+            part_end = min(
+                len(rows),
+                part_start + ROW_INDEX_INTERVAL - row_number % ROW_INDEX_INTERVAL,
+            )
+            if row_number % ROW_INDEX_INTERVAL == 0:
+                row_index.append((row_number, part_offset))
+
+            part = rows_to_csv(rows[part_start:part_end])
+            parts.append(part)
+            part_offset += get_utf8_length(part)
+            part_start = part_end
+
+        data = "".join(parts)
+        if self._write(data, part_offset - self._bytes_written):
+            self._rows_written += len(rows)
+            self._row_index.extend(row_index)
+            return len(rows)
+
+        # The block exceeded the upload limit,
+        # upload as many rows of it as possible
+        for idx, row in enumerate(rows):
+            bytes_offset = self._bytes_written
+            if not self._write(row_to_csv(row)):
+                return idx
+            if self._rows_written % ROW_INDEX_INTERVAL == 0:
+                self._row_index.append((self._rows_written, bytes_offset))
+            self._rows_written += 1
+        return len(rows)
+
+    def _write(self, data: str, data_length: int = None) -> bool:
+        if not self._uploader.write(data):
+            return False
+        self._bytes_written += (
+            get_utf8_length(data) if data_length is None else data_length
+        )
+        return True
+
+    @property
+    def row_index(self) -> Optional[RowIndex]:
+        return self._row_index
+
+
+class CSVResultFormat(BaseResultFormat):
+    @property
+    def format_name(self) -> str:
+        return "csv"
+
+    @property
+    def file_extension(self) -> str:
+        return "csv"
+
+    def get_writer(self, uploader: BaseUploader) -> BaseResultWriter:
+        return CSVResultWriter(uploader)
+
+    def get_csv_iter(
+        self, reader: BaseReader, number_of_lines: Optional[int]
+    ) -> Generator[List[str], None, None]:
+        return reader.get_csv_iter(number_of_lines)
+
+    def read_lines(self, reader: BaseReader, number_of_lines: int) -> List[str]:
+        return reader.read_lines(number_of_lines)
+
+    def get_raw_iter(self, reader: BaseReader) -> Generator[str, None, None]:
+        return reader.get_raw_iter()
+
+    def read_raw(self, reader: BaseReader) -> str:
+        return reader.read_raw()
+
+    def read_rows(
+        self,
+        reader: BaseReader,
+        offset: int,
+        limit: int,
+        row_index: Optional[RowIndex] = None,
+        with_columns: bool = False,
+    ) -> List[List[str]]:
+        if not row_index or offset < row_index[0][0]:
+            return super(CSVResultFormat, self).read_rows(
+                reader, offset, limit, with_columns=with_columns
+            )
+
+        # The rows are read with another range read
+        columns = list(self.get_csv_iter(reader, 1)) if with_columns else []
+
+        # Start reading from the closest indexed row before offset
+        indexed_row_number, bytes_offset = row_index[
+            bisect.bisect_right(row_index, (offset, float("inf"))) - 1
+        ]
+        text_stream = TextIOWrapper(
+            BufferedReader(BytesIterIO(reader.get_bytes_iter(bytes_offset))),
+            encoding="utf-8",
+            newline="",
+        )
+        rows_offset = offset - indexed_row_number
+        return columns + list(
+            islice(csv.reader(text_stream), rows_offset, rows_offset + limit)
+        )
@@ -0,0 +1,144 @@
+"""
+Cache of the rows returned by get_statement_execution_result.
+A finished statement execution result never changes, so the
+preview is kept in the process memory and in redis to avoid
+reading the result store again.
+
+The executor also saves the first rows of the result while uploading
+it (see ResultPreviewCollector), so even the first read of a result
+does not need the result store.
+"""
+from typing import Any, List, Optional
+
+from clients.redis_client import with_redis
+from env import QuerybookSettings
+from lib.utils import json
+from lib.utils.cache import SizedLRUCache
+from lib.utils.csv import serialize_cell
+
+_local_preview_cache = SizedLRUCache(QuerybookSettings.RESULT_PREVIEW_CACHE_LOCAL_SIZE)
+
+
+def get_preview_cache_key(statement_execution_id: int, limit: int) -> str:
+    return f"statement_execution_result_preview:{statement_execution_id}:{limit}"
+
+
+def get_upload_preview_cache_key(statement_execution_id: int) -> str:
+    return f"statement_execution_result_upload_preview:{statement_execution_id}"
+
+
+def is_preview_cache_enabled() -> bool:
+    return QuerybookSettings.RESULT_PREVIEW_CACHE_EXPIRATION > 0
+
+
+@with_redis
+def get_result_preview(
+    statement_execution_id: int, limit: int, redis_conn=None
+) -> Optional[List[List[str]]]:
+    """Get the first limit rows (and the columns) of the result
+
+    Returns:
+        Optional[List[List[str]]]: The cached rows, None if not cached
+    """
+    if not is_preview_cache_enabled():
+        return None
+
+    result = _get_cached_value(
+        get_preview_cache_key(statement_execution_id, limit), redis_conn
+    )
+    if result is not None:
+        return result
+
+    upload_preview = _get_cached_value(
+        get_upload_preview_cache_key(statement_execution_id), redis_conn
+    )
+    if upload_preview is not None:
+        rows = upload_preview["rows"]
+        # 1 row for column
+        if upload_preview["is_complete"] or len(rows) >= limit + 1:
+            return rows[: limit + 1]
+    return None
+
+
+@with_redis
+def set_result_preview(
+    statement_execution_id: int, limit: int, result: List[List[str]], redis_conn=None
+):
+    if not is_preview_cache_enabled():
+        return
+
+    _set_cached_value(
+        get_preview_cache_key(statement_execution_id, limit), result, redis_conn
+    )
+
+
+@with_redis
+def set_upload_preview(
+    statement_execution_id: int,
+    rows: List[List[str]],
+    is_complete: bool,
+    redis_conn=None,
+):
+    """Save the first rows of the result, called by the executor
+
+    Arguments:
+        statement_execution_id {int}
+        rows {List[List[str]]} -- The columns followed by the first rows
+        is_complete {bool} -- Whether or not rows contains the entire result
+    """
+    if not is_preview_cache_enabled():
+        return
+
+    _set_cached_value(
+        get_upload_preview_cache_key(statement_execution_id),
+        {"rows": rows, "is_complete": is_complete},
+        redis_conn,
+    )
+
+
+def _get_cached_value(key: str, redis_conn) -> Optional[Any]:
+    value = _local_preview_cache.get(key)
+    if value is not None:
+        return value
+
+    raw_value = redis_conn.get(key)
+    if raw_value is None:
+        return None
+
+    value = json.loads(raw_value)
+    _local_preview_cache.set(key, value, len(raw_value))
+    return value
+
+
+def _set_cached_value(key: str, value: Any, redis_conn):
+    raw_value = json.dumps(value)
+    redis_conn.set(key, raw_value, ex=QuerybookSettings.RESULT_PREVIEW_CACHE_EXPIRATION)
+    _local_preview_cache.set(key, value, len(raw_value))
+
+
+class ResultPreviewCollector(object):
+    """Keep the first rows written to the result store,
+    as they would be read back from the store
+    """
+
+    def __init__(self, max_row_count: int):
+        self._max_row_count = max_row_count
+        self._rows = []
+        self._is_complete = True
+
+    def add_columns(self, columns: List[str]):
+        self.add_rows([columns])
+
+    def add_rows(self, rows: List[List[Any]]):
+        # 1 row for column
+        remaining = self._max_row_count + 1 - len(self._rows)
+        if len(rows) > remaining:
+            self._is_complete = False
+        self._rows.extend(
+            [serialize_cell(cell) for cell in row] for row in rows[:remaining]
+        )
+
+    def save(self, statement_execution_id: int):
+        if self._max_row_count <= 0:
+            return
+        set_upload_preview(statement_execution_id, self._rows, self._is_complete)
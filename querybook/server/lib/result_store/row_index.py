@@ -0,0 +1,61 @@
+from typing import Optional
+
+from env import QuerybookSettings
+from lib.utils.compression import get_compression_by_uri
+from .all_result_stores import ALL_RESULT_STORES
+from .formats.base_format import RowIndex
+from clients.common import FileDoesNotExist
+
+
+def get_row_index_uri(uri: str) -> str:
+    return f"{uri}.index"
+
+
+def upload_row_index(uri: str, row_index: Optional[RowIndex]):
+    """Upload the row index of the result stored at uri as
+       a sidecar file. Skipped if the result store cannot read from
+       a byte offset or if the result is compressed
+
+    Arguments:
+        uri {str} -- The uri the result is uploaded to (without store type)
+        row_index {Optional[RowIndex]} -- The row index given by the result writer
+    """
+    store = ALL_RESULT_STORES[QuerybookSettings.RESULT_STORE_TYPE]
+    if (
+        not row_index
+        or not store.reader.supports_range_read()
+        or get_compression_by_uri(uri) is not None
+    ):
+        return
+
+    with store.uploader(get_row_index_uri(uri)) as uploader:
+        uploader.write(
+            "".join(
+                f"{row_number},{bytes_offset}\n"
+                for row_number, bytes_offset in row_index
+            )
+        )
+
+
+def read_row_index(store_type: str, uri: str) -> Optional[RowIndex]:
+    """Read the row index of the result stored at uri
+
+    Returns:
+        Optional[RowIndex] -- None if the result has no row index
+    """
+    store = ALL_RESULT_STORES[store_type]
+    if not store.reader.supports_range_read() or get_compression_by_uri(uri):
+        return None
+
+    try:
+        with store.reader(get_row_index_uri(uri)) as reader:
+            raw = b"".join(reader.get_bytes_iter()).decode("utf-8")
+    except (FileDoesNotExist, FileNotFoundError):
+        # Results uploaded before the row index was added
+        return None
+
+    row_index = []
+    for line in raw.splitlines():
+        row_number, bytes_offset = line.split(",")
+        row_index.append((int(row_number), int(bytes_offset)))
+    return row_index
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Union
 
 
 class BaseUploader(ABC):
@@ -26,12 +26,23 @@ class BaseUploader(ABC):
 
         pass
 
+    @classmethod
+    def supports_binary(cls) -> bool:
+        """Override this to return True if write() also accepts bytes,
+           which is required to store binary result formats such as arrow
+
+        Returns:
+            bool -- Whether or not bytes can be uploaded
+        """
+        return False
+
     @abstractmethod
-    def write(self, data: str) -> bool:
+    def write(self, data: Union[str, bytes]) -> bool:
         """Upload part of the string
 
         Arguments:
-            data {str} -- Part of the string to upload
+            data {Union[str, bytes]} -- Part of the string to upload,
+                bytes are only passed if supports_binary() is True
 
         Returns:
             bool -- Whether or not the upload was successful
@@ -104,6 +115,39 @@ class BaseReader(ABC):
         """
         pass
 
+    @classmethod
+    def supports_range_read(cls) -> bool:
+        """Override this to return True if get_bytes_iter can
+           start from a byte offset without reading the bytes before it
+
+        Returns:
+            bool -- Whether or not byte_offset is supported
+        """
+        return False
+
+    def get_bytes_iter(self, byte_offset: int = 0) -> Generator[bytes, None, None]:
+        """Read the entire file as raw bytes, chunk by chunk.
+           Required to read binary result formats such as arrow
+
+        Arguments:
+            byte_offset {int} -- Start reading from this position of the file,
+                only supported if supports_range_read() is True and the
+                file is not compressed
+
+        Returns:
+            Generator[bytes, None, None] -- generator of raw byte chunks
+        """
+        raise NotImplementedError()
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        """Read the entire file as string, chunk by chunk. Override this
+           so that the file is never held entirely in memory
+
+        Returns:
+            Generator[str, None, None] -- generator of string chunks
+        """
+        yield self.read_raw()
+
     @abstractmethod
     def read_raw(self) -> str:
         """Read the entire string as raw
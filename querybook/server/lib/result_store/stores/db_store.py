@@ -1,12 +1,23 @@
+import base64
 from itertools import islice
 from typing import Generator, List, Optional
 
 from env import QuerybookSettings
 from lib.result_store.stores.base_store import BaseReader, BaseUploader
 from logic import result_store
+from lib.utils.compression import compress, decompress, get_compression_by_uri
 from lib.utils.csv import str_to_csv_iter, LINE_TERMINATOR
 
 
+# Compressed values are stored as base64 since the value column is text
+def encode_compressed_value(value: str, compression: str) -> str:
+    return base64.b64encode(compress(value, compression)).decode("ascii")
+
+
+def decode_compressed_value(value: str, compression: str) -> str:
+    return decompress(base64.b64decode(value), compression).decode("utf-8")
+
+
 class DBReader(BaseReader):
     def __init__(self, uri: str, **kwargs):
         self._uri = uri
@@ -15,7 +26,12 @@ class DBReader(BaseReader):
     def start(self):
         kvs = result_store.get_key_value_store(self._uri)
         if kvs:
-            self._text = kvs.value
+            compression = get_compression_by_uri(self._uri)
+            self._text = (
+                kvs.value
+                if compression is None
+                else decode_compressed_value(kvs.value, compression)
+            )
 
     def _get_first_n_lines(self, n: Optional[int]) -> List[str]:
         maxsplit = n if n is not None else -1
@@ -76,5 +92,9 @@ class DBUploader(BaseUploader):
         return True
 
     def end(self):
-        result_store.create_key_value_store(key=self._uri, value="".join(self._chunks))
+        value = "".join(self._chunks)
+        compression = get_compression_by_uri(self._uri)
+        if compression is not None:
+            value = encode_compressed_value(value, compression)
+        result_store.create_key_value_store(key=self._uri, value=value)
         self._reset_variables()
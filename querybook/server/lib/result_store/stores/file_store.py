@@ -1,8 +1,15 @@
 import csv
+from io import TextIOWrapper
 from itertools import islice
 import os
-from typing import Optional
+from typing import IO, Generator, Optional, Union
 from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.utils.compression import (
+    StreamCompressor,
+    assert_uncompressed_range_read,
+    get_compression_by_uri,
+    open_decompressed,
+)
 from env import QuerybookSettings
 
 # to use, enable docker volume inside docker-compose.yml
@@ -25,12 +32,20 @@ def get_file_uri(raw_uri: str) -> str:
 class FileUploader(BaseUploader):
     def __init__(self, uri: str):
         self.uri = get_file_uri(uri)
+        self._compression = get_compression_by_uri(uri)
+        self._compressor = None
 
     def start(self):
         self._chunks_length = 0
         os.makedirs(self.uri_dir_path, exist_ok=True)
+        if self._compression is not None:
+            self._compressor = StreamCompressor(self._compression)
 
-    def write(self, data: str):
+    @classmethod
+    def supports_binary(cls) -> bool:
+        return True
+
+    def write(self, data: Union[str, bytes]):
         # write each line into csv
         data_len = len(data)
         if (
@@ -40,12 +55,20 @@ class FileUploader(BaseUploader):
             return False
 
         self._chunks_length += data_len
-        with open(self.uri, "a") as result_file:
-            result_file.write(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._append(data)
         return True
 
+    def _append(self, data: Union[str, bytes]):
+        write_mode = "ab" if isinstance(data, bytes) else "a"
+        with open(self.uri, write_mode) as result_file:
+            result_file.write(data)
+
     def end(self):
-        pass
+        if self._compressor is not None:
+            self._append(self._compressor.flush())
+            self._compressor = None
 
     @property
     def uri_dir_path(self):
@@ -56,17 +79,25 @@ class FileUploader(BaseUploader):
 class FileReader(BaseReader):
     def __init__(self, uri: str, **kwargs):
         self.uri = get_file_uri(uri)
+        self._compression = get_compression_by_uri(uri)
 
     def start(self):
         pass
 
+    def _open(self, binary: bool = False) -> IO:
+        if self._compression is None:
+            return open(self.uri, "rb" if binary else "r")
+
+        result_file = open_decompressed(self.uri, self._compression)
+        return result_file if binary else TextIOWrapper(result_file)
+
     def get_csv_iter(self, number_of_lines: Optional[int]):
-        with open(self.uri) as result_file:
+        with self._open() as result_file:
             reader = csv.reader(result_file)
-            return islice(reader, number_of_lines)
+            yield from islice(reader, number_of_lines)
 
     def read_lines(self, number_of_lines: int):
-        with open(self.uri) as result_file:
+        with self._open() as result_file:
             lines = []
             line_count = 0
             for row in result_file:
@@ -77,8 +108,31 @@ class FileReader(BaseReader):
                     break
             return lines
 
+    @classmethod
+    def supports_range_read(cls) -> bool:
+        return True
+
+    def get_bytes_iter(self, byte_offset: int = 0) -> Generator[bytes, None, None]:
+        if byte_offset > 0:
+            assert_uncompressed_range_read(self.uri)
+        with self._open(binary=True) as result_file:
+            result_file.seek(byte_offset)
+            while True:
+                chunk = result_file.read(QuerybookSettings.STORE_READ_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        with self._open() as result_file:
+            while True:
+                chunk = result_file.read(QuerybookSettings.STORE_READ_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
     def read_raw(self):
-        with open(self.uri) as result_file:
+        with self._open() as result_file:
             return result_file.read()
 
     def end(self):
@@ -1,4 +1,4 @@
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Union
 
 from clients import google_client  # Needed to patch GoogleDownloadClient in tests
 from clients.google_client import (
@@ -7,23 +7,45 @@ from clients.google_client import (
 )
 from lib.result_store.stores.base_store import BaseReader, BaseUploader
 from env import QuerybookSettings
+from lib.utils.compression import (
+    StreamCompressor,
+    assert_uncompressed_range_read,
+    get_compression_by_uri,
+)
 
 
 class GoogleUploader(BaseUploader):
     def __init__(self, uri: str):
         self._uri = uri
+        self._compressor = None
 
     def start(self):
+        compression = get_compression_by_uri(self._uri)
         self._uploader = GoogleUploadClient(
-            QuerybookSettings.STORE_BUCKET_NAME, self.uri
+            QuerybookSettings.STORE_BUCKET_NAME,
+            self.uri,
+            content_encoding=compression,
         )
         self._uploader.start()
+        if compression is not None:
+            self._compressor = StreamCompressor(compression)
+
+    @classmethod
+    def supports_binary(cls) -> bool:
+        return True
 
-    def write(self, data: str) -> bool:
-        self._uploader.write(data.encode())
+    def write(self, data: Union[str, bytes]) -> bool:
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        elif isinstance(data, str):
+            data = data.encode()
+        self._uploader.write(data)
         return True
 
     def end(self):
+        if self._compressor is not None:
+            self._uploader.write(self._compressor.flush())
+            self._compressor = None
         self._uploader.stop()
         self._uploader = None
 
@@ -46,6 +68,9 @@ class GoogleReader(BaseReader):
         reader_kwargs = {}
         if "max_read_size" in self._kwargs:
             reader_kwargs["max_read_size"] = self._kwargs.get("max_read_size")
+        compression = get_compression_by_uri(self._uri)
+        if compression is not None:
+            reader_kwargs["compression"] = compression
         self._reader = google_client.GoogleDownloadClient(
             QuerybookSettings.STORE_BUCKET_NAME,
             self.uri,
@@ -60,9 +85,26 @@ class GoogleReader(BaseReader):
     def read_lines(self, number_of_lines: int) -> List[str]:
         return self._reader.read_lines(number_of_lines)
 
+    @classmethod
+    def supports_range_read(cls) -> bool:
+        return True
+
+    def get_bytes_iter(self, byte_offset: int = 0) -> Generator[bytes, None, None]:
+        reader = self._reader
+        if byte_offset > 0:
+            assert_uncompressed_range_read(self._uri)
+            reader = google_client.GoogleDownloadClient(
+                QuerybookSettings.STORE_BUCKET_NAME,
+                self.uri,
+                byte_offset=byte_offset,
+            )
+        return iter(reader.read_decompressed_bytes, b"")
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        return self._reader.get_raw_iter()
+
     def read_raw(self) -> str:
-        # TODO: implement read raw for Google reader
-        raise NotImplementedError()
+        return "".join(self.get_raw_iter())
 
     def end(self):
         self._reader = None
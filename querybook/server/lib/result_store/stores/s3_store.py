@@ -1,7 +1,12 @@
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Union
 
 from lib.result_store.stores.base_store import BaseReader, BaseUploader
 from env import QuerybookSettings
+from lib.utils.compression import (
+    StreamCompressor,
+    assert_uncompressed_range_read,
+    get_compression_by_uri,
+)
 from clients import s3_client  # Needed to patch S3FileReader in tests
 from clients.s3_client import MultiPartUploader, S3KeySigner
 
@@ -9,17 +14,32 @@ from clients.s3_client import MultiPartUploader, S3KeySigner
 class S3Uploader(BaseUploader):
     def __init__(self, uri: str):
         self._uploader = None
+        self._compressor = None
         self._uri = uri
 
     def start(self):
+        compression = get_compression_by_uri(self._uri)
         self._uploader = MultiPartUploader(
-            QuerybookSettings.STORE_BUCKET_NAME, self.uri
+            QuerybookSettings.STORE_BUCKET_NAME,
+            self.uri,
+            content_encoding=compression,
         )
+        if compression is not None:
+            self._compressor = StreamCompressor(compression)
+
+    @classmethod
+    def supports_binary(cls) -> bool:
+        return True
 
-    def write(self, data: str) -> bool:
+    def write(self, data: Union[str, bytes]) -> bool:
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
         return self._uploader.write(data)
 
     def end(self):
+        if self._compressor is not None:
+            self._uploader.write(self._compressor.flush())
+            self._compressor = None
         self._uploader.complete()
         self._uploader = None
 
@@ -42,6 +62,9 @@ class S3Reader(BaseReader):
         reader_kwargs = {}
         if "max_read_size" in self._kwargs:
             reader_kwargs["max_read_size"] = self._kwargs.get("max_read_size")
+        compression = get_compression_by_uri(self._uri)
+        if compression is not None:
+            reader_kwargs["compression"] = compression
         self._reader = s3_client.S3FileReader(
             QuerybookSettings.STORE_BUCKET_NAME,
             self.uri,
@@ -56,9 +79,26 @@ class S3Reader(BaseReader):
     def read_lines(self, number_of_lines: int) -> List[str]:
         return self._reader.read_lines(number_of_lines)
 
+    @classmethod
+    def supports_range_read(cls) -> bool:
+        return True
+
+    def get_bytes_iter(self, byte_offset: int = 0) -> Generator[bytes, None, None]:
+        reader = self._reader
+        if byte_offset > 0:
+            assert_uncompressed_range_read(self._uri)
+            reader = s3_client.S3FileReader(
+                QuerybookSettings.STORE_BUCKET_NAME,
+                self.uri,
+                byte_offset=byte_offset,
+            )
+        return iter(reader.read_decompressed_bytes, b"")
+
+    def get_raw_iter(self) -> Generator[str, None, None]:
+        return self._reader.get_raw_iter()
+
     def read_raw(self) -> str:
-        # TODO: implement read raw for s3 reader
-        raise NotImplementedError()
+        return "".join(self.get_raw_iter())
 
     def end(self):
         self._reader = None
@@ -1,4 +1,7 @@
+from collections import OrderedDict
 import hashlib
+from threading import Lock
+from typing import Any, Hashable, Optional
 from urllib.parse import quote
 
 
@@ -13,3 +16,40 @@ def make_template_fragment_key(fragment_name, vary_on=None):
     key = ":".join(quote(str(var)) for var in vary_on)
     args = hashlib.md5(key.encode())
     return TEMPLATE_FRAGMENT_KEY_TEMPLATE % (fragment_name, args.hexdigest())
+
+
+class SizedLRUCache(object):
+    """In-process LRU cache bounded by the total size of its values,
+    the least recently used values are evicted first
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._size = 0
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._values:
+                return None
+            self._values.move_to_end(key)
+            return self._values[key][0]
+
+    def set(self, key: Hashable, value: Any, size: int):
+        with self._lock:
+            if key in self._values:
+                self._size -= self._values.pop(key)[1]
+            if size > self._max_size:
+                return
+
+            self._values[key] = (value, size)
+            self._size += size
+            while self._size > self._max_size:
+                _, (_, evicted_size) = self._values.popitem(last=False)
+                self._size -= evicted_size
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if key in self._values:
+                self._size -= self._values.pop(key)[1]
@@ -0,0 +1,153 @@
+import zlib
+from io import BufferedReader, RawIOBase
+from typing import IO, Optional, Union
+
+# Compression name -> file extension, the compression names
+# are also the values used in the Content-Encoding header
+COMPRESSION_FILE_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+GZIP_COMPRESSION_LEVEL = 6
+ZSTD_COMPRESSION_LEVEL = 3
+
+
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception(
+            "zstandard is not installed. "
+            + "Please make sure it is installed "
+            + "to use the zstd compression"
+        )
+    return zstandard
+
+
+def assert_valid_compression(compression: Optional[str]):
+    if compression is not None and compression not in COMPRESSION_FILE_EXTENSIONS:
+        raise ValueError(f"Invalid compression {compression}")
+
+
+def add_compression_extension(uri: str, compression: Optional[str]) -> str:
+    assert_valid_compression(compression)
+    if compression is None:
+        return uri
+    return f"{uri}.{COMPRESSION_FILE_EXTENSIONS[compression]}"
+
+
+def get_compression_by_uri(uri: str) -> Optional[str]:
+    """Find the compression of the stored file by its extension
+
+    Returns:
+        Optional[str]: The compression name, None if not compressed
+    """
+    file_extension = uri.rsplit(".", 1)[-1]
+    for compression, extension in COMPRESSION_FILE_EXTENSIONS.items():
+        if extension == file_extension:
+            return compression
+    return None
+
+
+def remove_compression_extension(uri: str) -> str:
+    compression = get_compression_by_uri(uri)
+    if compression is None:
+        return uri
+    return uri[: -len(COMPRESSION_FILE_EXTENSIONS[compression]) - 1]
+
+
+def assert_uncompressed_range_read(uri: str):
+    """Compressed files cannot be read from an arbitrary byte offset"""
+    if get_compression_by_uri(uri) is not None:
+        raise ValueError(f"Cannot read {uri} from a byte offset, it is compressed")
+
+
+class StreamCompressor(object):
+    """Compress data incrementally, the output of every compress()
+    call followed by flush() forms a single compressed file
+    """
+
+    def __init__(self, compression: str):
+        assert_valid_compression(compression)
+        if compression == "gzip":
+            self._compressor = zlib.compressobj(
+                GZIP_COMPRESSION_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+            )
+        else:
+            zstandard = import_zstandard()
+            self._compressor = zstandard.ZstdCompressor(
+                level=ZSTD_COMPRESSION_LEVEL
+            ).compressobj()
+
+    def compress(self, data: Union[str, bytes]) -> bytes:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class StreamDecompressor(object):
+    def __init__(self, compression: str):
+        assert_valid_compression(compression)
+        self._compression = compression
+        if compression == "gzip":
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        else:
+            zstandard = import_zstandard()
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        # Truncated files are not considered as errors, the upload
+        # could be stopped early and the data read is still valid
+        if self._compression == "gzip":
+            return self._decompressor.flush()
+        return b""
+
+
+def compress(data: Union[str, bytes], compression: str) -> bytes:
+    compressor = StreamCompressor(compression)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    decompressor = StreamDecompressor(compression)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class DecompressedFileIO(RawIOBase):
+    """Readable binary stream over the decompressed content of a file"""
+
+    def __init__(self, compressed_file: IO[bytes], compression: str):
+        self._file = compressed_file
+        self._decompressor = StreamDecompressor(compression)
+        self._left_over = b""
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        while len(self._left_over) == 0 and not self._eof:
+            raw = self._file.read(len(buffer))
+            if raw:
+                self._left_over = self._decompressor.decompress(raw)
+            else:
+                self._left_over = self._decompressor.flush()
+                self._eof = True
+
+        size = min(len(buffer), len(self._left_over))
+        buffer[:size] = self._left_over[:size]
+        self._left_over = self._left_over[size:]
+        return size
+
+    def close(self):
+        self._file.close()
+        super(DecompressedFileIO, self).close()
+
+
+def open_decompressed(path: str, compression: str) -> IO[bytes]:
+    """Open a compressed local file as a readable binary stream"""
+    return BufferedReader(DecompressedFileIO(open(path, "rb"), compression))
@@ -2,14 +2,18 @@ import csv
 import datetime
 from io import StringIO
 import json
+import math
+import re
 import sys
-from typing import Generator, List, Tuple
+from typing import Any, Callable, Generator, List, Sequence, Union
 
 from .utils import DATE_STRING, DATETIME_STRING
 
 LINE_TERMINATOR = "\n"
 COLUMN_TERMINATOR = ","
 COLUMN_ESCAPE = '"'
+LINE_TERMINATOR_BYTES = LINE_TERMINATOR.encode()
+COLUMN_ESCAPE_BYTES = COLUMN_ESCAPE.encode()
 
 
 # HACK: https://stackoverflow.com/questions/15063936/csv-error-field-larger-than-field-limit-131072
@@ -62,79 +66,160 @@ def row_to_csv(row):
     return ",".join(output) + "\n"
 
 
-def csv_sniffer(lines: List[str]) -> int:
-    """Given n number of lines, figure out
-       the last valid line for a csv. The CSV
-       is comma separated and quoted with ".
+should_escape_regex = re.compile("|".join(map(re.escape, should_escape_list)))
+
+
+def escape_cell(str_col: str) -> str:
+    if should_escape_regex.search(str_col):
+        return '"%s"' % str_col.replace('"', '""')
+    return str_col
+
+
+def serialize_float(cell: float) -> str:
+    # Same as json.dumps, which uses repr except for nan/inf
+    if cell != cell or cell in (float("inf"), float("-inf")):
+        return json.dumps(cell)
+    return repr(cell)
+
+
+# Serializers of the column types that never need csv escaping
+SAFE_COLUMN_SERIALIZERS = {
+    int: str,
+    float: serialize_float,
+    bool: lambda cell: "true" if cell else "false",
+    # Same as DATETIME_STRING, without the extra function call
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: DATE_STRING,
+}
+
+
+def get_column_serializer(column: Sequence[Any]) -> Callable[[Any], str]:
+    """Decide once how to serialize all the values of a column,
+       the result is the same as calling serialize_cell + escape
+       on every value
 
     Args:
-        lines (List[str]): Strings
+        column (Sequence[Any]): All values of a column
 
     Returns:
-        int: The last valid index for CSV line (inclusive).
-             lines[:return_val + 1] is a valid CSV block.
+        Callable[[Any], str]: The serializer for the column values
     """
-    last_valid_index = None
-
-    is_inside_cell = False  # Is inside a CSV cell, ie cursor | is in "|cell\n"
-    max_columns_count = None  # All rows should be at least this many
-    columns_count = 0  # The expected number of columns
-
-    for line_idx, line in enumerate(lines):
-        line_len = len(line)
-
-        char_idx = 0
-        while char_idx < line_len:
-            char = line[char_idx]
-
-            if char == COLUMN_ESCAPE:
-                if is_inside_cell:
-                    next_char = line[char_idx + 1] if char_idx < line_len - 1 else None
-                    if next_char == COLUMN_ESCAPE:
-                        # We are seeing "", which is a escaped version of "
-                        char_idx += 2
-                        continue
-                    else:
-                        is_inside_cell = False
-                else:
-                    is_inside_cell = True
-            elif not is_inside_cell and char == COLUMN_TERMINATOR:
-                columns_count += 1
-            char_idx += 1
-
-        # Done looping over the entire line
-        if not is_inside_cell:  # In this case, it is a valid line
-            if max_columns_count is None:
-                max_columns_count = columns_count
-
-            if columns_count > max_columns_count:
-                raise ValueError(
-                    f"CSV is not valid, expected {max_columns_count + 1} cols but seen {columns_count + 1} cols"
-                )
-
-            columns_count = 0
-            last_valid_index = line_idx
+    column_types = set(map(type, column))
+    has_none = type(None) in column_types
+    column_types.discard(type(None))
+
+    serializer = None
+    if len(column_types) == 0:
+        return lambda cell: "null"
+    elif len(column_types) == 1:
+        column_type = next(iter(column_types))
+        if column_type == str:
+            # Check escaping for the entire column at once
+            str_column = (
+                [cell for cell in column if cell is not None] if has_none else column
+            )
+            serializer = (
+                escape_cell if should_escape_regex.search("".join(str_column)) else str
+            )
+        elif column_type == float and all(
+            map(math.isfinite, (cell for cell in column if cell is not None))
+        ):
+            serializer = repr
+        else:
+            serializer = SAFE_COLUMN_SERIALIZERS.get(column_type)
 
-    return last_valid_index
+    if serializer is None:
+        return lambda cell: escape_cell(serialize_cell(cell))
+    if has_none:
+        return lambda cell: "null" if cell is None else serializer(cell)
+    return serializer
 
 
-def split_csv_to_chunks(lines: List[str]) -> Tuple[List[str], List[str]]:
-    """Given a list of lines, break them into 2 parts
-       The first part is a valid CSV chunk, the second part
-       is partial CSV chunk
+def rows_to_csv(rows: List[List[Any]]) -> str:
+    """Serialize a block of rows into csv, equivalent to
+       "".join(map(row_to_csv, rows)) but the serialization
+       is dispatched per column instead of per cell
 
     Args:
-        lines (List[str]): List of lines that do not have \n in them
+        rows (List[List[Any]]): rows with the same number of columns
 
     Returns:
-        Tuple[List[str], List[str]]: [Valid CSV, Partial block]
+        str: the csv block, ending with a line terminator
+    """
+    if len(rows) == 0:
+        return ""
+    if len(set(map(len, rows))) > 1:
+        # Rows have different lengths, so they cannot be handled per column
+        return "".join(map(row_to_csv, rows))
+
+    serialized_columns = [
+        list(map(get_column_serializer(column), column)) for column in zip(*rows)
+    ]
+    if len(serialized_columns) == 0:
+        return LINE_TERMINATOR * len(rows)
+
+    return (
+        LINE_TERMINATOR.join(map(COLUMN_TERMINATOR.join, zip(*serialized_columns)))
+        + LINE_TERMINATOR
+    )
+
+
+class CSVRowEndFinder(object):
+    """Finds where the complete csv rows end in consecutive chunks of a
+    csv file. The CSV is comma separated and quoted with ".
+
+    A line terminator ends a row if it is not inside a quoted cell,
+    which is the case when an even number of quotes come before it
+    (escaped quotes "" count as two). Only the quote positions are
+    visited in python, the rest of the chunk is scanned with find.
     """
 
-    last_valid_csv_idx = csv_sniffer(lines)
+    def __init__(self):
+        # Is inside a CSV cell at the end of the last chunk
+        self._is_inside_cell = False
+
+    def find_last_row_end(
+        self, chunk: Union[str, bytes, bytearray], start: int = 0, end: int = None
+    ) -> int:
+        """Read the next chunk of the file
+
+        Args:
+            chunk (Union[str, bytes, bytearray]): The chunk following the previous one,
+                only chunk[start:end] is read
+            start (int): Start of the chunk to read, used to search
+                in a buffer without slicing it
+            end (int): End of the chunk to read, defaults to the chunk length
+
+        Returns:
+            int: Index of the last line terminator in chunk that ends a row,
+                 -1 if no row ends in this chunk
+        """
+        if isinstance(chunk, str):
+            escape, terminator = COLUMN_ESCAPE, LINE_TERMINATOR
+        else:
+            escape, terminator = COLUMN_ESCAPE_BYTES, LINE_TERMINATOR_BYTES
+        end = len(chunk) if end is None else min(end, len(chunk))
+
+        last_row_end = -1
+        is_inside_cell = self._is_inside_cell
+        pos = start
+        while True:
+            escape_pos = chunk.find(escape, pos, end)
+            if escape_pos == -1:
+                if not is_inside_cell:
+                    last_row_end = max(last_row_end, chunk.rfind(terminator, pos, end))
+                break
+
+            if not is_inside_cell:
+                last_row_end = max(
+                    last_row_end, chunk.rfind(terminator, pos, escape_pos)
+                )
+            is_inside_cell = not is_inside_cell
+            pos = escape_pos + 1
 
-    if last_valid_csv_idx is None:
-        return [], lines
+        self._is_inside_cell = is_inside_cell
+        return last_row_end
 
-    valid_csv_chunk = lines[: last_valid_csv_idx + 1]
-    partial_csv_lines = lines[last_valid_csv_idx + 1 :]
-    return valid_csv_chunk, partial_csv_lines
+    @property
+    def is_inside_cell(self) -> bool:
+        return self._is_inside_cell
@@ -7,7 +7,7 @@ from const.impression import ImpressionItemType
 from const.query_execution import QueryExecutionStatus
 from env import QuerybookSettings
 from elasticsearch import Elasticsearch, RequestsHttpConnection
-from lib.query_analysis.lineage import get_table_statement_type, process_query
+from lib.query_analysis.analysis import get_query_analysis
 
 from lib.utils.utils import (
     DATETIME_TO_UTC,
@@ -164,10 +164,10 @@ def query_execution_to_es(query_execution, data_cell=None, session=None):
     engine_id = query_execution.engine_id
     engine = get_query_engine_by_id(engine_id, session=session)
 
-    table_names, _ = process_query(
+    query_analysis = get_query_analysis(
         query_execution.query, language=(engine and engine.language)
     )
-    table_names = list(chain.from_iterable(table_names))
+    table_names = list(chain.from_iterable(query_analysis.table_per_statement))
 
     duration = (
         DATETIME_TO_UTC(query_execution.completed_at)
@@ -188,7 +188,7 @@ def query_execution_to_es(query_execution, data_cell=None, session=None):
         "environment_id": environment_ids,
         "author_uid": query_execution.uid,
         "engine_id": engine_id,
-        "statement_type": get_table_statement_type(query_execution.query),
+        "statement_type": query_analysis.statement_types,
         "created_at": DATETIME_TO_UTC(query_execution.created_at),
         "duration": duration,
         "full_table_name": table_names,
@@ -271,8 +271,8 @@ def query_cell_to_es(query_cell, session=None):
     engine = get_query_engine_by_id(engine_id, session=session)
 
     query = query_cell.context
-    table_names, _ = process_query(query, language=(engine and engine.language))
-    table_names = list(chain.from_iterable(table_names))
+    query_analysis = get_query_analysis(query, language=(engine and engine.language))
+    table_names = list(chain.from_iterable(query_analysis.table_per_statement))
 
     datadoc = query_cell.doc
 
@@ -284,7 +284,7 @@ def query_cell_to_es(query_cell, session=None):
         "environment_id": datadoc and datadoc.environment_id,
         "author_uid": datadoc and datadoc.owner_uid,
         "engine_id": engine_id,
-        "statement_type": get_table_statement_type(query),
+        "statement_type": query_analysis.statement_types,
         "created_at": DATETIME_TO_UTC(query_cell.created_at),
         "full_table_name": table_names,
         "query_text": query,
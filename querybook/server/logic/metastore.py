@@ -189,7 +189,8 @@ def create_table(
         "table_created_at": datetime.datetime.fromtimestamp(float(table_created_at))
         if table_created_at
         else None,
-        "table_updated_by": datetime.datetime.fromtimestamp(float(table_updated_at))
+        "table_updated_by": table_updated_by,
+        "table_updated_at": datetime.datetime.fromtimestamp(float(table_updated_at))
         if table_updated_at
         else None,
         "data_size_bytes": data_size_bytes,
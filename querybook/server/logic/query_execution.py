@@ -210,6 +210,7 @@ def update_statement_execution(
     completed_at=None,
     result_row_count=None,
     result_path=None,
+    result_truncated=None,
     has_log=None,
     log_path=None,
     commit=True,
@@ -235,6 +236,9 @@ def update_statement_execution(
     if result_path is not None:
         statement_execution.result_path = result_path
 
+    if result_truncated is not None:
+        statement_execution.result_truncated = result_truncated
+
     if has_log is not None:
         statement_execution.has_log = has_log
 
@@ -126,6 +126,8 @@ class StatementExecution(Base):
 
     result_row_count = sql.Column(sql.BigInteger, nullable=False, default=0)
     result_path = sql.Column(sql.String(length=url_length))
+    # True if the result was cut off by the row limit or the upload limit
+    result_truncated = sql.Column(sql.Boolean, nullable=False, default=False)
 
     has_log = sql.Column(sql.Boolean, nullable=False, default=False)
     log_path = sql.Column(sql.String(length=url_length))
@@ -143,6 +145,7 @@ class StatementExecution(Base):
             "completed_at": self.completed_at,
             "result_row_count": self.result_row_count,
             "result_path": self.result_path,
+            "result_truncated": self.result_truncated,
             "has_log": self.has_log,
             "log_path": self.log_path,
         }
@@ -3,11 +3,11 @@ from celery import chain
 from app.db import DBSession
 from app.flask_app import celery
 
-from const.query_execution import QueryExecutionStatus
+from const.query_execution import QueryExecutionPriority, QueryExecutionStatus
 from const.schedule import NotifyOn, TaskRunStatus
 
 from lib.logger import get_logger
-from lib.query_analysis.templating import render_templated_query
+from lib.query_analysis.templating import TemplatedQueryRenderer
 from lib.scheduled_datadoc.export import export_datadoc
 from lib.scheduled_datadoc.legacy import convert_if_legacy_datadoc_schedule
 from lib.scheduled_datadoc.notification import notifiy_on_datadoc_complete
@@ -54,11 +54,13 @@ def run_datadoc_with_config(
 
         runner_id = user_id if user_id is not None else data_doc.owner_uid
         query_cells = data_doc.get_query_cells()
+        # The doc variables are resolved once for all the cells
+        query_renderer = TemplatedQueryRenderer(data_doc.meta)
 
         # Preping chain jobs each unit is a [make_qe_task, run_query_task] combo
         for index, query_cell in enumerate(query_cells):
             engine_id = query_cell.meta["engine"]
-            query = render_templated_query(query_cell.context, data_doc.meta, engine_id)
+            query = query_renderer.render(query_cell.context, engine_id)
 
             start_query_execution_kwargs = {
                 "cell_id": query_cell.id,
@@ -77,7 +79,9 @@ def run_datadoc_with_config(
                 else _start_query_execution_task.s(**start_query_execution_kwargs)
             )
 
-            tasks_to_run.append(run_query_task.s())
+            tasks_to_run.append(
+                run_query_task.s(priority=QueryExecutionPriority.SCHEDULED.value)
+            )
 
         # Create db entry record
         record_id = create_task_run_record_for_celery_task(self, session=session)
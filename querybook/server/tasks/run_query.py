@@ -1,18 +1,35 @@
 import traceback
 import datetime
+from typing import Tuple
 from celery.contrib.abortable import AbortableTask
-from celery.exceptions import SoftTimeLimitExceeded
+from celery.exceptions import Retry, SoftTimeLimitExceeded
 from celery.utils.log import get_task_logger
 
 from app.db import with_session, DBSession
-from app.flask_app import celery
-from const.query_execution import QueryExecutionStatus
+from app.flask_app import celery, socketio
+from const.query_execution import (
+    QueryExecutionPriority,
+    QueryExecutionStatus,
+    QUERY_EXECUTION_NAMESPACE,
+)
+from env import QuerybookSettings
 from lib.query_executor.notification import notifiy_on_execution_completion
 from lib.query_executor.executor_factory import create_executor_from_execution
 from lib.query_executor.exc import QueryExecutorException
-from lib.query_executor.utils import format_error_message
+from lib.query_executor.executor_multiplexer import (
+    can_multiplex_executors,
+    get_executor_multiplexer,
+)
+from lib.query_executor.query_scheduler import (
+    get_engine_max_running,
+    get_query_execution_job_id,
+    is_query_scheduler_enabled,
+    release_job,
+    wait_for_admission,
+)
+from lib.query_executor.utils import format_error_message, spread_dict
 
-from logic import query_execution as qe_logic
+from logic import admin as admin_logic, query_execution as qe_logic
 from logic.elasticsearch import update_query_execution_by_id
 from tasks.log_query_per_table import log_query_per_table_task
 
@@ -28,14 +45,28 @@ LOG = get_task_logger(__name__)
     # worth to check later
     acks_late=True,
 )
-def run_query_task(self, query_execution_id):
+def run_query_task(
+    self, query_execution_id, priority=QueryExecutionPriority.INTERACTIVE.value
+):
     executor = None
     error_message = None
     query_execution_status = QueryExecutionStatus.INITIALIZED
+    is_scheduled = False
+    is_queued = False
 
     try:
-        executor = create_executor_from_execution(query_execution_id, celery_task=self)
-        run_executor_until_finish(self, executor)
+        is_cancelled, is_scheduled = wait_for_query_execution_admission(
+            self, query_execution_id, QueryExecutionPriority(priority)
+        )
+        if not is_cancelled:
+            executor = create_executor_from_execution(
+                query_execution_id, celery_task=self
+            )
+            run_executor_until_finish(self, executor)
+    except Retry:
+        # The query is still queued, a later run of the task completes it
+        is_queued = True
+        raise
     except SoftTimeLimitExceeded:
         # SoftTimeLimitExceeded
         # This exception happens when query has been running for more than
@@ -52,22 +83,106 @@ def run_query_task(self, query_execution_id):
     finally:
         # When the finally block is reached, it is expected
         # that the executor should be in one of the end state
-        with DBSession() as session:
-            query_execution_status = get_query_execution_final_status(
-                query_execution_id, executor, error_message, session=session
+        if not is_queued:
+            with DBSession() as session:
+                query_execution_status = get_query_execution_final_status(
+                    query_execution_id, executor, error_message, session=session
+                )
+                notifiy_on_execution_completion(query_execution_id, session=session)
+                update_query_execution_by_id(query_execution_id, session=session)
+
+                # Executor exists means the query actually executed
+                # This prevents cases when query_execution got executed twice
+                if executor and query_execution_status == QueryExecutionStatus.DONE:
+                    log_query_per_table_task.delay(query_execution_id)
+
+            if is_scheduled:
+                release_job(get_query_execution_job_id(query_execution_id))
+
+    return query_execution_status.value if executor is not None else None
+
+
+def wait_for_query_execution_admission(
+    celery_task, query_execution_id, priority: QueryExecutionPriority
+) -> Tuple[bool, bool]:
+    """Wait for a slot of the query scheduler, the queue position
+       is sent to the query execution room while waiting
+
+    Returns:
+        Tuple[bool, bool] -- True if the query execution got cancelled while it
+                             waited, and True if the query execution must be
+                             released from the scheduler
+    """
+    job_id = get_query_execution_job_id(query_execution_id)
+    with DBSession() as session:
+        query_execution = qe_logic.get_query_execution_by_id(
+            query_execution_id, session=session
+        )
+        if query_execution is None:
+            # The executor raises the error
+            return False, False
+
+        # The cancel of a queued query is kept in the db since
+        # each retry of the task resets its aborted state
+        if query_execution.status == QueryExecutionStatus.CANCEL:
+            release_job(job_id)
+            socketio.emit(
+                "query_cancel",
+                query_execution.to_dict(),
+                namespace=QUERY_EXECUTION_NAMESPACE,
+                room=query_execution_id,
             )
-            notifiy_on_execution_completion(query_execution_id, session=session)
-            update_query_execution_by_id(query_execution_id, session=session)
+            return True, False
+
+        engine = admin_logic.get_query_engine_by_id(
+            query_execution.engine_id, session=session
+        )
+        engine_max_running = get_engine_max_running(engine)
+        if not is_query_scheduler_enabled(engine_max_running):
+            return False, False
 
-            # Executor exists means the query actually executed
-            # This prevents cases when query_execution got executed twice
-            if executor and query_execution_status == QueryExecutionStatus.DONE:
-                log_query_per_table_task.delay(query_execution_id)
+        # Cancelled queries do not wait, they are cancelled by the executor
+        if celery_task.is_aborted():
+            return False, True
 
-    return query_execution_status.value if executor is not None else None
+        # So that the query can be cancelled while it waits
+        if query_execution.task_id != celery_task.request.id:
+            query_execution = qe_logic.update_query_execution(
+                query_execution_id, task_id=celery_task.request.id, session=session
+            )
+        query_execution_dict = query_execution.to_dict()
+
+    def on_queued(queue_position):
+        socketio.emit(
+            "query_queued",
+            spread_dict(query_execution_dict, {"queue_position": queue_position}),
+            namespace=QUERY_EXECUTION_NAMESPACE,
+            room=query_execution_id,
+        )
+
+    is_scheduled = wait_for_admission(
+        celery_task,
+        job_id,
+        query_execution_dict["uid"],
+        query_execution_dict["engine_id"],
+        priority,
+        engine_max_running=engine_max_running,
+        on_queued=on_queued,
+    )
+    return False, is_scheduled
 
 
 def run_executor_until_finish(celery_task, executor):
+    if QuerybookSettings.EXECUTOR_MULTIPLEX_MAX_QUERIES > 0:
+        if can_multiplex_executors():
+            get_executor_multiplexer(
+                QuerybookSettings.EXECUTOR_MULTIPLEX_MAX_QUERIES
+            ).run(celery_task, executor)
+            return
+        LOG.warning(
+            "EXECUTOR_MULTIPLEX_MAX_QUERIES is ignored by the prefork and solo pools"
+        )
+
     while True:
         if celery_task.is_aborted():
             executor.cancel()
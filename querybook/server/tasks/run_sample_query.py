@@ -3,11 +3,19 @@ from datetime import datetime
 from app.flask_app import celery
 from app.db import DBSession
 
+from const.query_execution import QueryExecutionPriority
 from const.time import seconds_in_a_day
 from lib.query_analysis.samples import make_samples_query
+from lib.query_executor.query_scheduler import (
+    get_engine_max_running,
+    get_sample_query_job_id,
+    release_job,
+    wait_for_admission,
+)
 from lib.utils.utils import DATETIME_TO_UTC
 from lib.utils.execute_query import ExecuteQuery
 from lib.utils import mysql_cache
+from logic import admin as admin_logic
 
 
 class SampleQueryRunTimeError(Exception):
@@ -26,37 +34,55 @@ def run_sample_query(
     order_by,
     order_by_asc,
 ):
-    # Initialize progress to 0 for polling purposes
-    self.update_state(state="PROGRESS", meta=0)
-
     with DBSession() as session:
-        query = make_samples_query(
-            table_id,
-            limit=limit,
-            partition=partition,
-            where=where,
-            order_by=order_by,
-            order_by_asc=order_by_asc,
-            session=session,
+        engine_max_running = get_engine_max_running(
+            admin_logic.get_query_engine_by_id(engine_id, session=session)
         )
+    job_id = get_sample_query_job_id(self.request.id)
+    is_scheduled = wait_for_admission(
+        self,
+        job_id,
+        uid,
+        engine_id,
+        QueryExecutionPriority.SAMPLE,
+        engine_max_running=engine_max_running,
+    )
 
-        async_execute_query = ExecuteQuery(True)
-        async_execute_query(query, engine_id, uid=uid, session=session)
-        poll_query_until_finish(self, async_execute_query)
+    try:
+        # Initialize progress to 0 for polling purposes
+        self.update_state(state="PROGRESS", meta=0)
 
-        results = {
-            "created_at": DATETIME_TO_UTC(datetime.now()),
-            "value": async_execute_query.result,
-            "engine_id": engine_id,
-            "created_by": uid,
-        }
+        with DBSession() as session:
+            query = make_samples_query(
+                table_id,
+                limit=limit,
+                partition=partition,
+                where=where,
+                order_by=order_by,
+                order_by_asc=order_by_asc,
+                session=session,
+            )
 
-        mysql_cache.set_key(
-            f"table_samples_{table_id}_{uid}",
-            results,
-            expires_after=seconds_in_a_day,
-            session=session,
-        )
+            async_execute_query = ExecuteQuery(True)
+            async_execute_query(query, engine_id, uid=uid, session=session)
+            poll_query_until_finish(self, async_execute_query)
+
+            results = {
+                "created_at": DATETIME_TO_UTC(datetime.now()),
+                "value": async_execute_query.result,
+                "engine_id": engine_id,
+                "created_by": uid,
+            }
+
+            mysql_cache.set_key(
+                f"table_samples_{table_id}_{uid}",
+                results,
+                expires_after=seconds_in_a_day,
+                session=session,
+            )
+    finally:
+        if is_scheduled:
+            release_job(job_id)
 
 
 def poll_query_until_finish(task, async_execute_query):
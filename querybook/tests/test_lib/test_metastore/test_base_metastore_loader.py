@@ -0,0 +1,73 @@
+from unittest import TestCase, mock
+
+from lib.metastore.base_metastore_loader import (
+    BaseMetastoreLoader,
+    get_latest_partition_cache_key,
+)
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class GetLatestPartitionTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+        settings_patch = mock.patch(
+            "lib.metastore.base_metastore_loader.QuerybookSettings"
+        )
+        self.settings = settings_patch.start()
+        self.settings.LATEST_PARTITION_CACHE_TTL = 60
+        self.addCleanup(settings_patch.stop)
+
+        self.loader = mock.Mock(metastore_id=1)
+        self.loader.fetch_latest_partition.return_value = "dt=2021-01-01"
+
+    def get_latest_partition(self, conditions=None):
+        return BaseMetastoreLoader.get_latest_partition(
+            self.loader, "default", "table", conditions, redis_conn=self.redis
+        )
+
+    def test_cached(self):
+        self.assertEqual(self.get_latest_partition(), "dt=2021-01-01")
+        self.assertEqual(self.get_latest_partition(), "dt=2021-01-01")
+        self.loader.fetch_latest_partition.assert_called_once_with(
+            "default", "table", None
+        )
+
+        # The conditions are part of the key
+        self.loader.fetch_latest_partition.return_value = None
+        self.assertIsNone(self.get_latest_partition({"dt": "2020-01-01"}))
+        self.assertIsNone(self.get_latest_partition({"dt": "2020-01-01"}))
+        self.assertEqual(self.loader.fetch_latest_partition.call_count, 2)
+
+    def test_cache_key(self):
+        self.assertEqual(
+            get_latest_partition_cache_key(1, "default", "table", {"a": "1", "b": "2"}),
+            get_latest_partition_cache_key(1, "default", "table", {"b": "2", "a": "1"}),
+        )
+        self.assertNotEqual(
+            get_latest_partition_cache_key(1, "default", "table"),
+            get_latest_partition_cache_key(2, "default", "table"),
+        )
+
+    def test_cache_disabled(self):
+        self.settings.LATEST_PARTITION_CACHE_TTL = 0
+        self.get_latest_partition()
+        self.get_latest_partition()
+        self.assertEqual(self.loader.fetch_latest_partition.call_count, 2)
+        self.assertEqual(self.redis.values, {})
+
+    def test_redis_failure(self):
+        self.redis = mock.Mock()
+        self.redis.get.side_effect = Exception("Connection refused")
+        self.redis.set.side_effect = Exception("Connection refused")
+        self.assertEqual(self.get_latest_partition(), "dt=2021-01-01")
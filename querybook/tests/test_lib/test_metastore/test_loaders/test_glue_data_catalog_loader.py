@@ -1,5 +1,5 @@
 import unittest
-from unittest import TestCase
+from unittest import TestCase, mock
 
 import boto3
 from datetime import datetime
@@ -256,3 +256,47 @@ class GlueDataCatalogLoaderTestCase(TestCase):
             DB_NAME_A, TABLE_NAME_A_1, conditions
         )
         self.assertEqual(result_partitions, expected_partitions)
+
+    @mock_glue
+    def test_fetch_latest_partition(self):
+        self.client.create_database(DatabaseInput={"Name": DB_NAME_A})
+        self.client.create_table(DatabaseName=DB_NAME_A, TableInput=TABLE_INPUT_A_1)
+        for partition_input in [
+            PARTITION_INPUT_A_4,
+            PARTITION_INPUT_A_1,
+            PARTITION_INPUT_A_3,
+            PARTITION_INPUT_A_2,
+        ]:
+            self.client.create_partition(
+                DatabaseName=DB_NAME_A,
+                TableName=TABLE_NAME_A_1,
+                PartitionInput=partition_input,
+            )
+
+        self.assertEqual(
+            self.loader.fetch_latest_partition(DB_NAME_A, TABLE_NAME_A_1),
+            "partition_date=2021-04-04/partition_hour=20",
+        )
+
+        # moto does not support the filter expression of get_partitions
+        with mock.patch.object(
+            self.loader.glue_client,
+            "get_partitions",
+            return_value={"Partitions": [PARTITION_INPUT_A_3, PARTITION_INPUT_A_2]},
+        ) as get_partitions_mock:
+            self.assertEqual(
+                self.loader.fetch_latest_partition(
+                    DB_NAME_A, TABLE_NAME_A_1, {"partition_date": "2021-03-03"}
+                ),
+                "partition_date=2021-03-03/partition_hour=22",
+            )
+            get_partitions_mock.assert_called_once_with(
+                DB_NAME_A, TABLE_NAME_A_1, "partition_date='2021-03-03'"
+            )
+
+            get_partitions_mock.return_value = {"Partitions": []}
+            self.assertIsNone(
+                self.loader.fetch_latest_partition(
+                    DB_NAME_A, TABLE_NAME_A_1, {"partition_date": "2020-01-01"}
+                )
+            )
@@ -0,0 +1,55 @@
+import unittest
+from unittest import TestCase, mock
+
+hmsclient_import_failed = False
+try:
+    from clients.hms_client import HiveMetastoreClient, get_values_from_partition_name
+except ImportError:
+    hmsclient_import_failed = True
+
+
+@unittest.skipIf(
+    hmsclient_import_failed, "Skipping test because hmsclient is not available"
+)
+class HiveMetastoreClientTestCase(TestCase):
+    def setUp(self):
+        self.hmc = HiveMetastoreClient(hmss_ro_addrs=["localhost:9083"])
+        self.read_client = mock.Mock()
+        self.read_client.get_partition_names.return_value = [
+            "dt=2021-01-01/hr=01",
+            "dt=2021-01-01/hr=02",
+            "dt=2021-01-02/hr=01",
+        ]
+
+        perform_read_op_patch = mock.patch.object(
+            self.hmc,
+            "_perform_read_op",
+            side_effect=lambda function_to_run: function_to_run(),
+        )
+        perform_read_op_patch.start()
+        self.addCleanup(perform_read_op_patch.stop)
+        self.hmc._read_client = self.read_client
+
+    def test_get_latest_partition(self):
+        self.assertEqual(
+            self.hmc.get_latest_partition("default", "table"), "dt=2021-01-02/hr=01"
+        )
+        self.assertEqual(
+            self.hmc.get_latest_partition("default", "table", {"dt": "2021-01-01"}),
+            "dt=2021-01-01/hr=02",
+        )
+        self.assertEqual(
+            self.hmc.get_latest_partition("default", "table", {"hr": "01"}),
+            "dt=2021-01-02/hr=01",
+        )
+        self.assertIsNone(
+            self.hmc.get_latest_partition("default", "table", {"dt": "2020-01-01"})
+        )
+        # Only the partition names are fetched
+        self.read_client.get_partitions_by_filter.assert_not_called()
+
+    def test_get_values_from_partition_name(self):
+        self.assertEqual(
+            get_values_from_partition_name("dt=2021-01-01/path=a%2Fb"),
+            {"dt": "2021-01-01", "path": "a/b"},
+        )
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from lib.metastore.utils import MetastoreTableACLChecker, get_metastore_acl_checker
+
+
+class MetastoreTableACLCheckerTestCase(TestCase):
+    def test_no_acl(self):
+        acl_checker = MetastoreTableACLChecker({})
+        self.assertFalse(acl_checker.has_acl)
+        self.assertTrue(acl_checker.is_table_valid("db", "table"))
+        self.assertEqual(acl_checker.get_invalid_tables(["db.table"]), [])
+
+    def test_allowlist(self):
+        acl_checker = MetastoreTableACLChecker(
+            {"type": "allowlist", "tables": ["table", "db.table", "db2.*"]}
+        )
+        self.assertTrue(acl_checker.is_table_valid("default", "table"))
+        self.assertTrue(acl_checker.is_table_valid("db", "table"))
+        self.assertTrue(acl_checker.is_table_valid("db2", "other_table"))
+        self.assertFalse(acl_checker.is_table_valid("db", "other_table"))
+        self.assertEqual(
+            acl_checker.get_invalid_tables(
+                ["db.table", "db.other_table", "db3.table", "db.other_table"]
+            ),
+            ["db.other_table", "db3.table"],
+        )
+
+    def test_denylist(self):
+        acl_checker = MetastoreTableACLChecker(
+            {"type": "denylist", "tables": ["db.table", "db2.*"]}
+        )
+        self.assertFalse(acl_checker.is_table_valid("db", "table"))
+        self.assertFalse(acl_checker.is_table_valid("db2", "other_table"))
+        self.assertTrue(acl_checker.is_table_valid("db", "other_table"))
+        self.assertEqual(
+            acl_checker.get_invalid_tables(["db.other_table", "db2.table"]),
+            ["db2.table"],
+        )
+
+
+class GetMetastoreACLCheckerTestCase(TestCase):
+    def test_cached_until_changed(self):
+        acl_control = {"type": "denylist", "tables": ["db.table"]}
+        acl_checker = get_metastore_acl_checker(1000, acl_control)
+        self.assertIs(get_metastore_acl_checker(1000, dict(acl_control)), acl_checker)
+
+        new_acl_checker = get_metastore_acl_checker(
+            1000, {"type": "denylist", "tables": ["db.other_table"]}
+        )
+        self.assertIsNot(new_acl_checker, acl_checker)
+        self.assertTrue(new_acl_checker.is_table_valid("db", "table"))
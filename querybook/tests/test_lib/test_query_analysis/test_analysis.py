@@ -0,0 +1,97 @@
+from unittest import TestCase, mock
+
+from lib.query_analysis import get_statement_ranges
+from lib.query_analysis.analysis import (
+    QueryAnalysis,
+    get_query_analysis,
+    get_query_analysis_cache_key,
+)
+from lib.query_analysis.lineage import get_table_statement_type, process_query
+
+QUERY = """
+-- Create the table
+CREATE TABLE db.target AS
+SELECT * FROM db.source;
+
+use db;
+insert into target select * from source2 JOIN db2.source3;
+"""
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class QueryAnalysisTestCase(TestCase):
+    def test_same_as_separate_analysis(self):
+        analysis = QueryAnalysis.from_query(QUERY, "presto")
+        table_per_statement, lineage_per_statement = process_query(QUERY, "presto")
+
+        self.assertEqual(analysis.statement_ranges, get_statement_ranges(QUERY))
+        self.assertEqual(analysis.statement_types, get_table_statement_type(QUERY))
+        self.assertEqual(
+            [sorted(tables) for tables in analysis.table_per_statement],
+            [sorted(tables) for tables in table_per_statement],
+        )
+        self.assertEqual(analysis.lineage_per_statement, lineage_per_statement)
+
+    def test_to_dict(self):
+        analysis = QueryAnalysis.from_query(QUERY)
+        restored_analysis = QueryAnalysis.from_dict(analysis.to_dict())
+
+        self.assertEqual(restored_analysis.to_dict(), analysis.to_dict())
+        self.assertEqual(restored_analysis.statement_ranges, analysis.statement_ranges)
+
+
+class GetQueryAnalysisTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+        cache_patch = mock.patch(
+            "lib.query_analysis.analysis._local_query_analysis_cache"
+        )
+        self.local_cache = cache_patch.start()
+        self.local_cache.get.return_value = None
+        self.addCleanup(cache_patch.stop)
+
+        from_query_patch = mock.patch.object(
+            QueryAnalysis, "from_query", wraps=QueryAnalysis.from_query
+        )
+        self.from_query_mock = from_query_patch.start()
+        self.addCleanup(from_query_patch.stop)
+
+    def test_cached_in_redis(self):
+        analysis = get_query_analysis(QUERY, "presto", redis_conn=self.redis)
+        self.assertEqual(self.from_query_mock.call_count, 1)
+        self.assertIn(get_query_analysis_cache_key(QUERY, "presto"), self.redis.values)
+
+        cached_analysis = get_query_analysis(QUERY, "presto", redis_conn=self.redis)
+        self.assertEqual(self.from_query_mock.call_count, 1)
+        self.assertEqual(cached_analysis.to_dict(), analysis.to_dict())
+
+        # The tables depend on the language
+        get_query_analysis(QUERY, "sqlite", redis_conn=self.redis)
+        self.assertEqual(self.from_query_mock.call_count, 2)
+
+    def test_cached_in_memory(self):
+        analysis = QueryAnalysis.from_query(QUERY)
+        self.local_cache.get.return_value = analysis
+        self.from_query_mock.reset_mock()
+
+        self.assertIs(get_query_analysis(QUERY, redis_conn=self.redis), analysis)
+        self.from_query_mock.assert_not_called()
+
+    def test_redis_failure(self):
+        redis = mock.Mock()
+        redis.get.side_effect = Exception("Connection refused")
+        redis.set.side_effect = Exception("Connection refused")
+
+        analysis = get_query_analysis(QUERY, redis_conn=redis)
+        self.assertEqual(analysis.statement_ranges, get_statement_ranges(QUERY))
@@ -0,0 +1,156 @@
+import random
+from unittest import TestCase
+
+from lib.query_analysis import (
+    get_statement_ranges,
+    get_statement_ranges_with_sqlparse,
+    get_statements,
+)
+
+QUERIES = [
+    "",
+    "   ",
+    ";;",
+    "select 1",
+    "select 1\n",
+    "select 1;",
+    "select 1 ; ",
+    "select 1; select 2",
+    "select 1;\nselect 2;\n\n",
+    "-- comment\nselect 1",
+    "# comment\nselect 1",
+    "#comment\nselect 1",
+    "select 1 -- x;y\n; select 2",
+    "select 1; -- comment\nselect 2",
+    "/* c */ select 1",
+    "/* a; b */ select 1; /* c */ ;",
+    "select 1 /* ; */; select 2",
+    "--+ hint\nselect 1",
+    "/*+ hint */ select 1",
+    "select 'a;b'; select 2",
+    "select 'it''s;'; select 2",
+    "select 'a\\';b'; select 2",
+    "select 'unterminated; select 2",
+    'select "a;b" from t; select 2',
+    'select "unterminated; select 2',
+    "select `a;b` from t; select 2",
+    "select [a;b] from t; select 2",
+    "select $$a;b$$; select 2",
+    "select $tag$a;b$tag$; select 2",
+    "select $1; select x$$; select 2$$",
+    "select a+--b;\nselect 2",
+    "select a+/* c; */; select 2",
+    "select t.b# c;\nselect 2",
+    "select a# c;\nselect 2",
+    "select case when a then 1 end; select 2",
+    "begin; select 1; end;",
+    "create table a as select 1; select 2",
+    "create procedure p begin select 1; select 2; end; select 3",
+    "create function f() declare x int; begin return 1; end; select 1",
+    """
+-- Create the table
+CREATE TABLE db.target AS
+SELECT * FROM db.source;
+
+use db;
+insert into target select * from source2 JOIN db2.source3;
+""",
+]
+
+RANDOM_QUERY_PARTS = [
+    "select",
+    " ",
+    "\n",
+    "\r\n",
+    "\t",
+    ";",
+    "-",
+    "--",
+    "--+",
+    "#",
+    "# ",
+    "/*",
+    "/*+",
+    "*/",
+    "*",
+    "/",
+    "+",
+    "'",
+    "''",
+    '"',
+    "`",
+    "´",
+    "\\",
+    "$$",
+    "$a$",
+    "$1",
+    "[",
+    "]",
+    "(",
+    ")",
+    ".",
+    "a",
+    "x#",
+    "t.b",
+    "1",
+    "-1",
+    "E5",
+    "0x1F",
+    "%s",
+    "@a",
+    "##t",
+    "case",
+    "end",
+    "join",
+    "left join",
+    "not null",
+    "create",
+    "begin",
+    "declare",
+    "if",
+]
+
+
+class GetStatementRangesTestCase(TestCase):
+    def test_ranges(self):
+        self.assertEqual(get_statement_ranges(""), [])
+        self.assertEqual(get_statement_ranges(";;"), [])
+        self.assertEqual(get_statement_ranges("select 1\n"), [(0, 9)])
+        self.assertEqual(get_statement_ranges("/* c */ select 1"), [(0, 16)])
+        self.assertEqual(
+            get_statement_ranges("select 1 -- x;y\n; select 2"), [(0, 16), (18, 26)]
+        )
+        self.assertEqual(
+            get_statement_ranges("-- c\nselect 'a;b';\n\n select 2; ;"),
+            [(5, 17), (21, 29)],
+        )
+
+    def test_procedure(self):
+        query = "create procedure p begin select 1; select 2; end; select 3"
+        self.assertEqual(get_statement_ranges(query), [(0, 33), (50, 58)])
+
+    def test_same_as_sqlparse(self):
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    get_statement_ranges(query),
+                    get_statement_ranges_with_sqlparse(query),
+                )
+
+    def test_same_as_sqlparse_random_queries(self):
+        rand = random.Random(0)
+        for _ in range(500):
+            query = "".join(
+                rand.choice(RANDOM_QUERY_PARTS) for _ in range(rand.randint(0, 30))
+            )
+            with self.subTest(query=query):
+                self.assertEqual(
+                    get_statement_ranges(query),
+                    get_statement_ranges_with_sqlparse(query),
+                )
+
+    def test_get_statements(self):
+        self.assertEqual(
+            get_statements("-- c\nselect 'a;b' /* d */;\nselect 2;"),
+            ["select 'a;b'", "select 2"],
+        )
@@ -5,6 +5,7 @@ from jinja2.sandbox import SandboxedEnvironment
 
 from lib.query_analysis.templating import (
     LatestPartitionException,
+    TemplatedQueryRenderer,
     _detect_cycle,
     _escape_sql_comments,
     create_get_latest_partition,
@@ -455,6 +456,21 @@ class LatestPartitionTestCase(TemplatingTestCase):
         )
         self.assertEqual(templated_query, 'select * from table where dt="2021-01-01"')
 
+    def test_latest_partition_memoized(self):
+        templated_query = render_templated_query(
+            'select * from table where dt="{{ latest_partition("default.table", "dt") }}"'
+            ' or dt="{{ latest_partition("default.table", "dt") }}"',
+            {},
+            self.DEFAULT_ENGINE_ID,
+        )
+        self.assertEqual(
+            templated_query,
+            'select * from table where dt="2021-01-01" or dt="2021-01-01"',
+        )
+        self.metastore_loader_mock.get_latest_partition.assert_called_once_with(
+            "default", "table", None
+        )
+
     def test_multiple_partition_columns_partition_not_provided(self):
         self.metastore_loader_mock.get_latest_partition.return_value = (
             "dt=2021-01-01/hr=01"
@@ -466,3 +482,66 @@ class LatestPartitionTestCase(TemplatingTestCase):
             {},
             self.DEFAULT_ENGINE_ID,
         )
+
+
+class TemplatedQueryRendererTestCase(LatestPartitionTestCase):
+    def test_render_many_queries(self):
+        renderer = TemplatedQueryRenderer(
+            {
+                "latest_part": '{{latest_partition("default.table", "dt")}}',
+                "table": "default.{{ name }}",
+                "name": "table",
+            }
+        )
+        self.assertEqual(
+            renderer.render(
+                'select * from {{ table }} where dt="{{ latest_part }}"',
+                self.DEFAULT_ENGINE_ID,
+            ),
+            'select * from default.table where dt="2021-01-01"',
+        )
+        self.assertEqual(
+            renderer.render(
+                "select count(*) from {{ table }} -- {{ unknown }}",
+                self.DEFAULT_ENGINE_ID,
+            ),
+            "select count(*) from default.table -- {{ unknown }}",
+        )
+        # The variables are only resolved once per engine
+        self.metastore_loader_mock.get_latest_partition.assert_called_once()
+
+        renderer.render("select {{ latest_part }}", 2)
+        self.assertEqual(self.metastore_loader_mock.get_latest_partition.call_count, 2)
+
+    def test_exception(self):
+        renderer = TemplatedQueryRenderer(
+            {"date": "{{ date2 }}", "date2": "{{ date }}"}
+        )
+        self.assertRaises(
+            QueryHasCycleException,
+            renderer.render,
+            "select 1",
+            self.DEFAULT_ENGINE_ID,
+        )
+        self.assertRaises(
+            QueryHasCycleException,
+            renderer.render,
+            "select 2",
+            self.DEFAULT_ENGINE_ID,
+        )
+
+    def test_compile_once(self):
+        query = "select * from {{ table }} -- test_compile_once"
+        with mock.patch.object(
+            SandboxedEnvironment,
+            "compile",
+            autospec=True,
+            side_effect=SandboxedEnvironment.compile,
+        ) as compile_mock:
+            render_templated_query(query, {"table": "a"}, self.DEFAULT_ENGINE_ID)
+            compile_count = compile_mock.call_count
+            self.assertEqual(
+                render_templated_query(query, {"table": "b"}, self.DEFAULT_ENGINE_ID),
+                "select * from b -- test_compile_once",
+            )
+            self.assertEqual(compile_mock.call_count, compile_count)
@@ -0,0 +1,122 @@
+import time
+from threading import Event
+from unittest import TestCase
+
+from lib.query_executor.base_client import (
+    DEFAULT_FETCH_SIZE,
+    CursorBaseClass,
+    prefetch_iter,
+)
+
+
+class FakeCursor(CursorBaseClass):
+    def __init__(self, row_count: int):
+        self._rows = iter([[i] for i in range(row_count)])
+        self.fetch_sizes = []
+        self.cancelled = False
+
+    def run(self, query):
+        pass
+
+    def poll(self):
+        return True
+
+    def cancel(self):
+        self.cancelled = True
+
+    def get_one_row(self):
+        return next(self._rows, None)
+
+    def get_n_rows(self, n: int):
+        self.fetch_sizes.append(n)
+        return super(FakeCursor, self).get_n_rows(n)
+
+    def get_columns(self):
+        return ["i"]
+
+
+class CursorFetchOptionsTestCase(TestCase):
+    def test_default_fetch_size(self):
+        cursor = FakeCursor(5)
+        self.assertEqual(list(cursor.get_rows_chunk_iter()), [[[i] for i in range(5)]])
+        self.assertEqual(cursor.fetch_sizes, [DEFAULT_FETCH_SIZE] * 2)
+
+    def test_fetch_size(self):
+        cursor = FakeCursor(5)
+        cursor.set_fetch_options(fetch_size=2)
+        self.assertEqual(
+            list(cursor.get_rows_chunk_iter()),
+            [[[0], [1]], [[2], [3]], [[4]]],
+        )
+        self.assertEqual(cursor.get_rows(), [])
+
+    def test_prefetch(self):
+        cursor = FakeCursor(5)
+        cursor.set_fetch_options(fetch_size=2, prefetch=True)
+        self.assertEqual(
+            list(cursor.get_rows_chunk_iter()),
+            [[[0], [1]], [[2], [3]], [[4]]],
+        )
+
+    def test_row_limit(self):
+        cursor = FakeCursor(5)
+        cursor.set_fetch_options(fetch_size=2, row_limit=3)
+        self.assertEqual(list(cursor.get_rows_chunk_iter()), [[[0], [1]], [[2]]])
+        self.assertTrue(cursor.result_truncated)
+        self.assertTrue(cursor.cancelled)
+
+    def test_row_limit_not_reached(self):
+        cursor = FakeCursor(3)
+        cursor.set_fetch_options(fetch_size=2, row_limit=3)
+        self.assertEqual(list(cursor.get_rows_chunk_iter()), [[[0], [1]], [[2]]])
+        self.assertFalse(cursor.result_truncated)
+        self.assertFalse(cursor.cancelled)
+
+
+class PrefetchIterTestCase(TestCase):
+    def test_items(self):
+        self.assertEqual(list(prefetch_iter(iter(range(10)))), list(range(10)))
+        self.assertEqual(list(prefetch_iter(iter([]))), [])
+
+    def test_error(self):
+        def items():
+            yield 1
+            raise ValueError("fetch")
+
+        iterator = prefetch_iter(items())
+        self.assertEqual(next(iterator), 1)
+        with self.assertRaises(ValueError):
+            next(iterator)
+
+    def test_stop_early(self):
+        produced = []
+
+        def items():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        iterator = prefetch_iter(items())
+        self.assertEqual(next(iterator), 0)
+        iterator.close()
+        # At most 1 item is produced ahead, plus 1 waiting to be queued
+        self.assertLessEqual(len(produced), 3)
+
+    def test_break_while_producing(self):
+        fetching = Event()
+        fetched = []
+
+        def items():
+            yield 0
+            fetching.set()
+            time.sleep(0.1)
+            fetched.append(1)
+            yield 1
+
+        iterator = prefetch_iter(items())
+        for _ in iterator:
+            fetching.wait()
+            break
+        iterator.close()
+        # The producer is done with the iterator once closed
+        self.assertEqual(fetched, [1])
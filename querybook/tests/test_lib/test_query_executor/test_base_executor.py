@@ -1,5 +1,11 @@
-from unittest import TestCase
-from lib.query_executor.base_executor import QueryExecutorBaseClass
+from unittest import TestCase, mock
+from lib.query_executor import base_executor
+from lib.query_executor.base_executor import (
+    QueryExecutorBaseClass,
+    QueryExecutorLogger,
+)
+from lib.query_executor.clients.bigquery import BigQueryCursor
+from lib.query_executor.clients.hive import HiveCursor
 
 
 class QueryExecutorBaseMatchTestCase(TestCase):
@@ -31,3 +37,150 @@ class QueryExecutorBaseMatchTestCase(TestCase):
         self.assertTrue(TestEngine.match("French", "Test"))
         self.assertFalse(TestEngine.match("English", "Prod"))
         self.assertFalse(TestEngine.match("Spanish", "Test"))
+
+
+class QueryExecutorGetCursorTestCase(TestCase):
+    def setUp(self):
+        for patch in (
+            mock.patch.object(base_executor, "QueryExecutorLogger"),
+            mock.patch.object(base_executor, "get_client_pool"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        base_executor.get_client_pool.return_value.acquire.side_effect = (
+            lambda key, create_client: create_client()
+        )
+
+    def get_cursor(self, cursor_class):
+        client = mock.Mock()
+        client.cursor.return_value = cursor_class(mock.Mock())
+
+        class TestExecutor(QueryExecutorBaseClass):
+            @classmethod
+            def EXECUTOR_LANGUAGE(cls):
+                return "test"
+
+            @classmethod
+            def EXECUTOR_NAME(cls):
+                return "test"
+
+            @classmethod
+            def EXECUTOR_TEMPLATE(cls):
+                return None
+
+            @classmethod
+            def _get_client(cls, client_setting):
+                return client
+
+        executor = TestExecutor(
+            1,
+            mock.Mock(),
+            "select 1",
+            [(0, 8)],
+            {"fetch_size": 10, "prefetch": True, "row_limit": 100},
+        )
+        return executor._get_cursor()
+
+    def test_overridden_fetch_options(self):
+        # Cursors of the engines that override set_fetch_options
+        # must take all of the fetch options
+        for cursor_class in (HiveCursor, BigQueryCursor):
+            with self.subTest(cursor_class=cursor_class):
+                cursor = self.get_cursor(cursor_class)
+                self.assertEqual(cursor._fetch_size, 10)
+                self.assertEqual(cursor._cursor.arraysize, 10)
+                self.assertTrue(cursor._prefetch)
+                self.assertEqual(cursor._row_limit, 100)
+
+
+class QueryExecutorLoggerUpdateTestCase(TestCase):
+    def setUp(self):
+        self.now = 0
+        for name, patch in (
+            ("qe_logic", mock.patch.object(base_executor, "qe_logic")),
+            ("socketio", mock.patch.object(base_executor, "socketio")),
+            ("DBSession", mock.patch.object(base_executor, "DBSession")),
+            (
+                "append_live_logs",
+                mock.patch.object(base_executor, "append_live_logs"),
+            ),
+            (
+                "time",
+                mock.patch.object(
+                    base_executor.time, "time", side_effect=lambda: self.now
+                ),
+            ),
+        ):
+            setattr(self, name, patch.start())
+            self.addCleanup(patch.stop)
+
+        self.qe_logic.create_statement_execution.return_value.to_dict.return_value = {
+            "id": 1
+        }
+        self.celery_task = mock.MagicMock()
+        self.celery_task.request.id = "abc"
+        self.logger = QueryExecutorLogger(1, self.celery_task, "select 1", [(0, 8)])
+        self.logger.on_statement_start(0)
+        self.socketio.emit.reset_mock()
+
+    def get_statement_updates(self):
+        return [
+            args[1]
+            for args, _ in self.socketio.emit.call_args_list
+            if args[0] == "statement_update"
+        ]
+
+    def test_coalesce_updates(self):
+        self.logger.on_statement_update(log="a", percent_complete=10)
+        self.now = 1
+        self.logger.on_statement_update(log="b", percent_complete=20)
+        self.assertEqual(self.get_statement_updates(), [])
+
+        self.now = QueryExecutorLogger.UPDATE_FLUSH_INTERVAL
+        self.logger.on_statement_update(log="c")
+        self.assertEqual(
+            self.get_statement_updates(),
+            [
+                {
+                    "query_execution_id": 1,
+                    "id": 1,
+                    "log": ["a", "b", "c"],
+                    "percent_complete": 20,
+                }
+            ],
+        )
+        # The log shorter than a chunk is kept until the statement ends
+        self.append_live_logs.assert_called_once_with(1, [])
+
+    def test_flush_meta_info_immediately(self):
+        self.logger.on_statement_update(log="a", meta_info="url")
+        self.assertEqual(
+            self.get_statement_updates(),
+            [{"query_execution_id": 1, "id": 1, "meta_info": "url", "log": ["a"]}],
+        )
+        self.qe_logic.update_statement_execution.assert_called_with(1, meta_info="url")
+
+        # Same meta info is not sent again
+        self.logger.on_statement_update(meta_info="url")
+        self.assertEqual(len(self.get_statement_updates()), 1)
+
+    def test_flush_large_log(self):
+        self.logger.on_statement_update(
+            log="a" * QueryExecutorLogger.UPDATE_FLUSH_LOG_SIZE
+        )
+        self.assertEqual(len(self.get_statement_updates()), 1)
+
+    def test_flush_on_cancel(self):
+        self.logger.on_statement_update(percent_complete=50)
+        with mock.patch.object(self.logger, "_upload_log", return_value=(None, False)):
+            self.logger.on_cancel()
+        self.assertEqual(
+            self.get_statement_updates(),
+            [{"query_execution_id": 1, "id": 1, "percent_complete": 50}],
+        )
+
+    def test_update_progress_task_id(self):
+        self.logger.update_progress()
+        self.celery_task.update_state.assert_called_with(
+            task_id="abc", state="PROGRESS", meta=mock.ANY
+        )
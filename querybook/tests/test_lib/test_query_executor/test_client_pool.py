@@ -0,0 +1,116 @@
+from unittest import TestCase, mock
+
+from lib.query_executor import client_pool
+from lib.query_executor.base_client import ClientBaseClass
+from lib.query_executor.client_pool import (
+    ClientPool,
+    get_client_pool_key,
+    is_session_free_statement,
+)
+
+
+class FakeClient(ClientBaseClass):
+    REUSABLE = True
+
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+    def cursor(self):
+        pass
+
+    def is_healthy(self):
+        return self.healthy
+
+    def close(self):
+        self.closed = True
+
+
+class ClientPoolTestCase(TestCase):
+    def setUp(self):
+        self.now = 0
+        time_patch = mock.patch.object(
+            client_pool.time, "time", side_effect=lambda: self.now
+        )
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+        self.pool = ClientPool(idle_timeout=60)
+
+    def test_key(self):
+        self.assertEqual(
+            get_client_pool_key("Executor", {"a": 1, "proxy_user": "u"}),
+            get_client_pool_key("Executor", {"proxy_user": "u", "a": 1}),
+        )
+        self.assertNotEqual(
+            get_client_pool_key("Executor", {"a": 1, "proxy_user": "u"}),
+            get_client_pool_key("Executor", {"a": 1, "proxy_user": "v"}),
+        )
+
+    def test_reuse(self):
+        client = self.pool.acquire("key", FakeClient)
+        # Used clients are not shared
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+
+        self.pool.release("key", client)
+        self.assertIsNot(self.pool.acquire("other key", FakeClient), client)
+        self.assertIs(self.pool.acquire("key", FakeClient), client)
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+
+    def test_unhealthy_client(self):
+        client = self.pool.acquire("key", FakeClient)
+        self.pool.release("key", client)
+        client.healthy = False
+
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+        self.assertTrue(client.closed)
+
+    def test_idle_eviction(self):
+        client = self.pool.acquire("key", FakeClient)
+        self.pool.release("key", client)
+
+        self.now = 61
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+        self.assertTrue(client.closed)
+
+    def test_not_reusable(self):
+        client = self.pool.acquire("key", FakeClient)
+        client.REUSABLE = False
+        self.pool.release("key", client)
+
+        self.assertTrue(client.closed)
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+
+    def test_changed_session(self):
+        client = self.pool.acquire("key", FakeClient)
+        self.pool.release("key", client, reusable=False)
+
+        self.assertTrue(client.closed)
+        self.assertIsNot(self.pool.acquire("key", FakeClient), client)
+
+
+class IsSessionFreeStatementTestCase(TestCase):
+    def test_session_free_statements(self):
+        for statement in (
+            "select 1",
+            "SELECT 1",
+            "with a as (select 1) select * from a",
+            "/* comment */ (select 1) union (select 2)",
+            "-- comment\ninsert into a select 1",
+            "show tables",
+            "describe a",
+        ):
+            with self.subTest(statement=statement):
+                self.assertTrue(is_session_free_statement(statement))
+
+    def test_session_statements(self):
+        for statement in (
+            "use db",
+            "set hive.exec.parallel=true",
+            "create temporary table a as select 1",
+            "alter session set timezone = 'UTC'",
+            "-- select\nuse db",
+            "selected",
+        ):
+            with self.subTest(statement=statement):
+                self.assertFalse(is_session_free_statement(statement))
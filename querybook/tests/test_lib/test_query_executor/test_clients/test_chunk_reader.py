@@ -6,18 +6,15 @@ MOCK_CSV_LINES = ["foo,bar,baz", "hello,world", "a,b,c,d"]
 
 
 class MockChunkReaderDerivedClass(ChunkReader):
-    def __init__(
-        self,
-        read_size=5,
-        max_read_size=20,
-    ):
+    def __init__(self, read_size=5, max_read_size=20, raw=MOCK_RAW_CSV):
         self._curr_char = 0
+        self._raw = raw.encode("utf-8")
         super(MockChunkReaderDerivedClass, self).__init__(
             read_size=read_size, max_read_size=max_read_size
         )
 
-    def read(self):
-        next_chunk = MOCK_RAW_CSV[self._curr_char : self._curr_char + self._read_size]
+    def read_bytes(self):
+        next_chunk = self._raw[self._curr_char : self._curr_char + self._read_size]
         self._curr_char += self._read_size
         return next_chunk
 
@@ -34,3 +31,45 @@ class ChunkReaderTestCase(TestCase):
     def test_set_max_read_size_set(self):
         reader = MockChunkReaderDerivedClass(max_read_size=25)
         self.assertEqual(reader.read_lines(), MOCK_CSV_LINES[:2])
+
+    def test_get_raw_iter(self):
+        # max_read_size does not apply to raw reads
+        reader = MockChunkReaderDerivedClass()
+        chunks = list(reader.get_raw_iter())
+        self.assertEqual(chunks[0], MOCK_RAW_CSV[:5])
+        self.assertEqual("".join(chunks), MOCK_RAW_CSV)
+
+    def test_get_csv_iter(self):
+        raw = 'foo,bar\n"multi\nline ""cell""",2\n3,"中文"'
+        expected = [["foo", "bar"], ['multi\nline "cell"', "2"], ["3", "中文"]]
+        for read_size in range(1, len(raw.encode("utf-8")) + 1):
+            reader = MockChunkReaderDerivedClass(
+                read_size=read_size, max_read_size=None, raw=raw
+            )
+            self.assertEqual(list(reader.get_csv_iter()), expected)
+
+        reader = MockChunkReaderDerivedClass(max_read_size=None, raw=raw)
+        self.assertEqual(list(reader.get_csv_iter(2)), expected[:2])
+
+    def test_get_csv_iter_incomplete_row(self):
+        raw = 'foo,bar\n1,"2'
+        reader = MockChunkReaderDerivedClass(max_read_size=None, raw=raw)
+        self.assertEqual(list(reader.get_csv_iter()), [["foo", "bar"]])
+
+    def test_get_csv_iter_max_read_size(self):
+        reader = MockChunkReaderDerivedClass(max_read_size=20)
+        self.assertEqual(list(reader.get_csv_iter()), [["foo", "bar", "baz"]])
+
+        reader = MockChunkReaderDerivedClass(max_read_size=25)
+        self.assertEqual(
+            list(reader.get_csv_iter()),
+            [["foo", "bar", "baz"], ["hello", "world"]],
+        )
+
+    def test_read_lines_multi_byte_chars(self):
+        reader = MockChunkReaderDerivedClass(
+            read_size=1, max_read_size=None, raw="中文\n한국어\nend"
+        )
+        self.assertEqual(reader.read_lines(), ["中文", "한국어", "end"])
+        reader = MockChunkReaderDerivedClass(read_size=1, raw="中文\n한국어\nend")
+        self.assertEqual("".join(reader.get_raw_iter()), "中文\n한국어\nend")
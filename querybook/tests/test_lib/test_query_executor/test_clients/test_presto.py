@@ -0,0 +1,38 @@
+from unittest import TestCase, mock
+
+from lib.query_executor.clients import presto
+from lib.query_executor.clients.presto import PrestoCursor
+
+
+class PrestoCursorTestCase(TestCase):
+    def setUp(self):
+        sleep_patch = mock.patch.object(presto, "sleep")
+        self.sleep = sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+
+        self.pyhive_cursor = mock.Mock(_STATE_NONE=0, _STATE_RUNNING=1, _state=1)
+        self.pyhive_cursor.poll.return_value = {
+            "stats": {"completedSplits": 1, "totalSplits": 4}
+        }
+        self.cursor = PrestoCursor(self.pyhive_cursor)
+
+    def test_single_request_per_interval(self):
+        for _ in range(3):
+            self.cursor.wait_for_update(5)
+            self.assertFalse(self.cursor.poll())
+
+        self.assertEqual(self.pyhive_cursor.poll.call_count, 3)
+        self.sleep.assert_called_with(5 - presto.NEXT_URI_MAX_WAIT)
+        self.assertEqual(self.cursor.percent_complete, 25)
+
+    def test_poll_without_wait(self):
+        self.cursor.poll()
+        self.cursor.poll()
+        self.assertEqual(self.pyhive_cursor.poll.call_count, 2)
+
+    def test_finished_query(self):
+        self.pyhive_cursor._state = 2
+        self.cursor.wait_for_update(5)
+
+        self.sleep.assert_not_called()
+        self.assertTrue(self.cursor.poll())
@@ -0,0 +1,49 @@
+from threading import Event
+from unittest import TestCase
+
+from clients.common import UploadPipeline
+
+
+class UploadPipelineTestCase(TestCase):
+    def setUp(self):
+        self.pipeline = UploadPipeline(max_workers=2, max_in_flight=4)
+        self.addCleanup(self.pipeline.shutdown)
+
+    def test_done_calls_are_dropped(self):
+        pipeline = UploadPipeline(max_workers=1, max_in_flight=4)
+        self.addCleanup(pipeline.shutdown)
+
+        for i in range(10):
+            pipeline.submit(lambda: i)
+        # Runs after all the previous calls are done, only itself is left
+        pending = pipeline.submit(lambda: len(pipeline._futures))
+        self.assertEqual(pending.result(), 1)
+
+        pipeline.wait()
+        self.assertEqual(len(pipeline._futures), 0)
+
+    def test_pending_calls_are_kept(self):
+        release = Event()
+        self.pipeline.submit(release.wait)
+        self.assertEqual(len(self.pipeline._futures), 1)
+
+        release.set()
+        self.pipeline.wait()
+        self.assertEqual(len(self.pipeline._futures), 0)
+
+    def test_failure_is_raised(self):
+        error = ValueError("upload failed")
+
+        def fail():
+            raise error
+
+        self.pipeline.submit(fail)
+        with self.assertRaises(ValueError):
+            self.pipeline.wait()
+        self.assertEqual(len(self.pipeline._futures), 0)
+
+        self.pipeline.submit(fail)
+        with self.pipeline._done:
+            self.pipeline._done.wait_for(lambda: not self.pipeline._futures)
+        with self.assertRaises(ValueError):
+            self.pipeline.submit(lambda: None)
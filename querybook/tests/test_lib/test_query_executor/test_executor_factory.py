@@ -0,0 +1,50 @@
+from unittest import TestCase, mock
+
+from lib.query_analysis.analysis import QueryAnalysis
+from lib.query_executor.executor_factory import _assert_safe_query
+from lib.query_executor.exc import InvalidQueryExecution
+
+QUERY = "select * from db.table; select * from db.other_table"
+
+
+class AssertSafeQueryTestCase(TestCase):
+    def setUp(self):
+        self.engine = mock.Mock(metastore_id=1, language="presto")
+        self.metastore = mock.Mock(
+            id=1, acl_control={"type": "denylist", "tables": ["db.other_table"]}
+        )
+
+        get_engine_patch = mock.patch(
+            "logic.admin.get_query_engine_by_id", return_value=self.engine
+        )
+        get_engine_patch.start()
+        self.addCleanup(get_engine_patch.stop)
+
+        get_metastore_patch = mock.patch(
+            "logic.admin.get_query_metastore_by_id", return_value=self.metastore
+        )
+        get_metastore_patch.start()
+        self.addCleanup(get_metastore_patch.stop)
+
+        get_query_analysis_patch = mock.patch(
+            "lib.query_executor.executor_factory.get_query_analysis",
+            side_effect=lambda query, language: QueryAnalysis.from_query(
+                query, language
+            ),
+        )
+        self.get_query_analysis_mock = get_query_analysis_patch.start()
+        self.addCleanup(get_query_analysis_patch.stop)
+
+    def test_table_not_allowed(self):
+        with self.assertRaises(InvalidQueryExecution):
+            _assert_safe_query(QUERY, 1, session=mock.Mock())
+        self.get_query_analysis_mock.assert_called_once_with(QUERY, "presto")
+
+    def test_table_allowed(self):
+        self.metastore.acl_control = {"type": "denylist", "tables": ["db.table2"]}
+        _assert_safe_query(QUERY, 1, session=mock.Mock())
+
+    def test_no_acl(self):
+        self.metastore.acl_control = {}
+        _assert_safe_query(QUERY, 1, session=mock.Mock())
+        self.get_query_analysis_mock.assert_not_called()
@@ -0,0 +1,127 @@
+import time
+from threading import Event, Thread, local
+from unittest import TestCase, mock
+
+from const.query_execution import QueryExecutionStatus
+from lib.query_executor import executor_multiplexer
+from lib.query_executor.executor_multiplexer import (
+    ExecutorMultiplexer,
+    can_multiplex_executors,
+)
+
+
+class FakeExecutor(object):
+    def __init__(self, polls_until_done: int, error: Exception = None):
+        self.status = QueryExecutionStatus.RUNNING
+        self.poll_count = 0
+        self._polls_until_done = polls_until_done
+        self._error = error
+
+    def poll(self):
+        self.poll_count += 1
+        if self._error is not None:
+            raise self._error
+        if self.poll_count >= self._polls_until_done:
+            self.status = QueryExecutionStatus.DONE
+
+    def cancel(self):
+        self.status = QueryExecutionStatus.CANCEL
+
+    def next_poll_interval(self):
+        return 0.01
+
+
+def get_celery_task(is_aborted=False):
+    celery_task = mock.MagicMock()
+    celery_task.is_aborted.return_value = is_aborted
+    return celery_task
+
+
+class ThreadLocalCeleryTask(object):
+    """Same as celery, the request is only set in the thread of the task"""
+
+    def __init__(self, task_id, aborted_task_ids):
+        self._local = local()
+        self._local.request = mock.Mock(id=task_id)
+        self._aborted_task_ids = aborted_task_ids
+
+    @property
+    def request(self):
+        return getattr(self._local, "request", mock.Mock(id=None))
+
+    def is_aborted(self, **kwargs):
+        return kwargs.get("task_id", self.request.id) in self._aborted_task_ids
+
+
+class TaskInterrupt(BaseException):
+    """Same as the greenlet kill of a revoked task"""
+
+
+class InterruptedEvent(Event):
+    def wait(self, timeout=None):
+        super(InterruptedEvent, self).wait(0.05)
+        raise TaskInterrupt()
+
+
+class ExecutorMultiplexerTestCase(TestCase):
+    def test_run_executors(self):
+        multiplexer = ExecutorMultiplexer(max_executors=2, max_poll_workers=2)
+        executors = [FakeExecutor(polls_until_done=i + 1) for i in range(5)]
+        threads = [
+            Thread(target=multiplexer.run, args=(get_celery_task(), executor))
+            for executor in executors
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        for i, executor in enumerate(executors):
+            self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+            self.assertEqual(executor.poll_count, i + 1)
+
+    def test_abort(self):
+        multiplexer = ExecutorMultiplexer(max_executors=1)
+        executor = FakeExecutor(polls_until_done=10)
+        multiplexer.run(get_celery_task(is_aborted=True), executor)
+
+        self.assertEqual(executor.status, QueryExecutionStatus.CANCEL)
+        self.assertEqual(executor.poll_count, 0)
+
+    def test_abort_from_poll_thread(self):
+        multiplexer = ExecutorMultiplexer(max_executors=1)
+        executor = FakeExecutor(polls_until_done=10)
+        multiplexer.run(ThreadLocalCeleryTask("abc", ["abc"]), executor)
+
+        self.assertEqual(executor.status, QueryExecutionStatus.CANCEL)
+        self.assertEqual(executor.poll_count, 0)
+
+    def test_interrupted_run(self):
+        multiplexer = ExecutorMultiplexer(max_executors=1)
+        executor = FakeExecutor(polls_until_done=1000)
+        with mock.patch.object(executor_multiplexer, "Event", InterruptedEvent):
+            with self.assertRaises(TaskInterrupt):
+                multiplexer.run(get_celery_task(), executor)
+
+        time.sleep(0.05)
+        self.assertEqual(executor.status, QueryExecutionStatus.CANCEL)
+        poll_count = executor.poll_count
+        time.sleep(0.05)
+        self.assertEqual(executor.poll_count, poll_count)
+
+    def test_poll_error(self):
+        multiplexer = ExecutorMultiplexer(max_executors=1)
+        executor = FakeExecutor(polls_until_done=10, error=ValueError("poll"))
+        with self.assertRaises(ValueError):
+            multiplexer.run(get_celery_task(), executor)
+
+
+class CanMultiplexExecutorsTestCase(TestCase):
+    def test_thread(self):
+        self.assertFalse(can_multiplex_executors())
+
+        results = []
+        thread = Thread(target=lambda: results.append(can_multiplex_executors()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [True])
@@ -0,0 +1,75 @@
+from unittest import TestCase, mock
+
+from lib.query_executor import live_log
+
+
+class FakeRedisPipeline(object):
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self._commands.append((name, args))
+
+    def execute(self):
+        for name, args in self._commands:
+            getattr(self._redis, name)(*args)
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.lists = {}
+        self.expirations = {}
+
+    def pipeline(self):
+        return FakeRedisPipeline(self)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(value.encode("utf-8") for value in values)
+
+    def ltrim(self, key, start, end):
+        values = self.lists.get(key, [])
+        end = len(values) if end == -1 else end + 1
+        self.lists[key] = values[start:end]
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        end = len(values) if end == -1 else end + 1
+        return values[start:end]
+
+    def expire(self, key, seconds):
+        self.expirations[key] = seconds
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+
+class LiveLogTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def test_append_get_delete(self):
+        live_log.append_live_logs(1, ["a", "b"], redis_conn=self.redis)
+        live_log.append_live_logs(1, [], redis_conn=self.redis)
+        live_log.append_live_logs(1, ["c"], redis_conn=self.redis)
+        live_log.append_live_logs(2, ["d"], redis_conn=self.redis)
+
+        self.assertEqual(
+            live_log.get_live_logs(1, redis_conn=self.redis), ["a", "b", "c"]
+        )
+        self.assertEqual(
+            live_log.get_live_logs(1, limit=2, redis_conn=self.redis), ["a", "b"]
+        )
+        self.assertEqual(
+            self.redis.expirations[live_log.get_live_log_key(1)],
+            live_log.LIVE_LOG_EXPIRATION,
+        )
+
+        live_log.delete_live_logs(1, redis_conn=self.redis)
+        self.assertEqual(live_log.get_live_logs(1, redis_conn=self.redis), [])
+        self.assertEqual(live_log.get_live_logs(2, redis_conn=self.redis), ["d"])
+
+    def test_max_chunks(self):
+        with mock.patch.object(live_log, "LIVE_LOG_MAX_CHUNKS", 2):
+            live_log.append_live_logs(1, ["a", "b", "c"], redis_conn=self.redis)
+        self.assertEqual(live_log.get_live_logs(1, redis_conn=self.redis), ["b", "c"])
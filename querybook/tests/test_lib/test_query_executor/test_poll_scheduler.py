@@ -0,0 +1,47 @@
+from unittest import TestCase, mock
+
+from lib.query_executor import poll_scheduler
+from lib.query_executor.poll_scheduler import PollScheduler
+
+
+class PollSchedulerTestCase(TestCase):
+    def setUp(self):
+        self.now = 0
+        time_patch = mock.patch.object(
+            poll_scheduler.time, "time", side_effect=lambda: self.now
+        )
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+    def test_backoff(self):
+        scheduler = PollScheduler(min_interval=1, max_interval=10, backoff_factor=2)
+        self.assertEqual(
+            [scheduler.next_interval() for _ in range(6)], [1, 2, 4, 8, 10, 10]
+        )
+
+        scheduler.reset()
+        self.assertEqual(scheduler.next_interval(), 1)
+
+    def test_no_progress(self):
+        scheduler = PollScheduler(min_interval=1, max_interval=10, backoff_factor=2)
+        scheduler.record_progress(None)
+        scheduler.record_progress(0)
+        self.now = 10
+        scheduler.record_progress(0)
+        self.assertIsNone(scheduler.get_estimated_time_left())
+
+    def test_bounded_by_progress_rate(self):
+        scheduler = PollScheduler(min_interval=1, max_interval=10, backoff_factor=2)
+        for _ in range(5):
+            scheduler.next_interval()
+
+        scheduler.record_progress(10)
+        self.now = 10
+        scheduler.record_progress(60)
+        # 5% per second, 40% left
+        self.assertEqual(scheduler.get_estimated_time_left(), 8)
+        self.assertEqual(scheduler.next_interval(), 8)
+
+        self.now = 19
+        scheduler.record_progress(99)
+        self.assertEqual(scheduler.next_interval(), 1)
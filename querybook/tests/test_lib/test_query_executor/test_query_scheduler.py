@@ -0,0 +1,353 @@
+import time
+from contextlib import contextmanager
+from unittest import TestCase, mock
+
+from const.query_execution import QueryExecutionPriority
+from lib.query_executor import query_scheduler
+from lib.query_executor.query_scheduler import (
+    QuerySchedulerState,
+    RUNNING_JOB_EXPIRATION,
+    WAITING_JOB_EXPIRATION,
+    release_job,
+    touch_job,
+    try_admit_job,
+    wait_for_admission,
+)
+
+INTERACTIVE = QueryExecutionPriority.INTERACTIVE
+SCHEDULED = QueryExecutionPriority.SCHEDULED
+
+
+class QuerySchedulerStateTestCase(TestCase):
+    def admit_all(self, state, jobs, now=0):
+        return [
+            job_id
+            for job_id, uid, engine_id, priority in jobs
+            if state.admit(job_id, uid, engine_id, priority, now)
+        ]
+
+    def test_no_limit(self):
+        state = QuerySchedulerState()
+        self.assertEqual(
+            self.admit_all(state, [("a", 1, 1, INTERACTIVE), ("b", 1, 1, INTERACTIVE)]),
+            ["a", "b"],
+        )
+
+    def test_max_running(self):
+        state = QuerySchedulerState(max_running=2)
+        self.assertEqual(
+            self.admit_all(
+                state,
+                [
+                    ("a", 1, 1, INTERACTIVE),
+                    ("b", 1, 1, INTERACTIVE),
+                    ("c", 1, 1, INTERACTIVE),
+                ],
+            ),
+            ["a", "b"],
+        )
+        self.assertFalse(state.admit("c", 1, 1, INTERACTIVE, 1))
+
+        state.release("a")
+        self.assertTrue(state.admit("c", 1, 1, INTERACTIVE, 2))
+        # Already running
+        self.assertTrue(state.admit("c", 1, 1, INTERACTIVE, 3))
+
+    def test_fair_order_between_users(self):
+        state = QuerySchedulerState(max_running=1)
+        self.assertTrue(state.admit("running", 3, 1, INTERACTIVE, 0))
+
+        # User 1 queues many queries before user 2 queues one
+        for index in range(5):
+            self.assertFalse(state.admit(f"user1_{index}", 1, 1, INTERACTIVE, 0))
+        self.assertFalse(state.admit("user2_0", 2, 1, INTERACTIVE, 0))
+
+        state.release("running")
+        # user2 is second in line, after the first query of user1
+        self.assertFalse(state.admit("user2_0", 2, 1, INTERACTIVE, 1))
+        self.assertTrue(state.admit("user1_0", 1, 1, INTERACTIVE, 1))
+        state.release("user1_0")
+        self.assertFalse(state.admit("user1_1", 1, 1, INTERACTIVE, 1))
+        self.assertTrue(state.admit("user2_0", 2, 1, INTERACTIVE, 1))
+
+    def test_weighted_priorities(self):
+        state = QuerySchedulerState(max_running=1)
+        self.assertTrue(state.admit("running", 3, 1, INTERACTIVE, 0))
+
+        for index in range(4):
+            state.admit(f"scheduled_{index}", 1, 1, SCHEDULED, 0)
+            state.admit(f"interactive_{index}", 2, 1, INTERACTIVE, 0)
+        state.release("running")
+
+        admitted_job_ids = []
+        for _ in range(8):
+            for job_id in list(state.waiting.keys()):
+                job = state.waiting[job_id]
+                if state.admit(
+                    job_id,
+                    job["uid"],
+                    job["engine_id"],
+                    QueryExecutionPriority(job["priority"]),
+                    1,
+                ):
+                    admitted_job_ids.append(job_id)
+                    state.release(job_id)
+                    break
+
+        # Interactive queries get 4 times the share of scheduled queries
+        self.assertEqual(
+            admitted_job_ids[:5],
+            [
+                "interactive_0",
+                "interactive_1",
+                "interactive_2",
+                "interactive_3",
+                "scheduled_0",
+            ],
+        )
+        self.assertEqual(len(admitted_job_ids), 8)
+
+    def test_max_running_per_user_and_engine(self):
+        state = QuerySchedulerState(max_running_per_user=1, max_running_per_engine=2)
+        self.assertEqual(
+            self.admit_all(
+                state,
+                [
+                    ("a", 1, 1, INTERACTIVE),
+                    ("b", 1, 1, INTERACTIVE),
+                    ("c", 2, 1, INTERACTIVE),
+                    ("d", 3, 1, INTERACTIVE),
+                    ("e", 3, 2, INTERACTIVE),
+                ],
+            ),
+            # b is limited by user, d by engine
+            ["a", "c", "e"],
+        )
+
+    def test_engine_max_running(self):
+        state = QuerySchedulerState(max_running_per_engine=1)
+        self.assertTrue(state.admit("a", 1, 1, INTERACTIVE, 0, engine_max_running=2))
+        self.assertTrue(state.admit("b", 2, 1, INTERACTIVE, 0, engine_max_running=2))
+        self.assertFalse(state.admit("c", 3, 1, INTERACTIVE, 0, engine_max_running=2))
+        # Other engines use the default limit
+        self.assertTrue(state.admit("d", 1, 2, INTERACTIVE, 0))
+        self.assertFalse(state.admit("e", 2, 2, INTERACTIVE, 0))
+
+    def test_get_queue_position(self):
+        state = QuerySchedulerState(max_running=1)
+        state.admit("a", 1, 1, INTERACTIVE, 0)
+        state.admit("b", 1, 1, INTERACTIVE, 0)
+        state.admit("c", 1, 1, INTERACTIVE, 0)
+        state.admit("d", 2, 1, INTERACTIVE, 0)
+
+        self.assertIsNone(state.get_queue_position("a"))
+        self.assertEqual(state.get_queue_position("b"), 1)
+        self.assertEqual(state.get_queue_position("d"), 2)
+        self.assertEqual(state.get_queue_position("c"), 3)
+
+    def test_get_queue_position_per_engine(self):
+        state = QuerySchedulerState(max_running_per_engine=1)
+        self.admit_all(
+            state,
+            [
+                ("a", 1, 1, INTERACTIVE),
+                ("b", 1, 2, INTERACTIVE),
+                ("c", 2, 1, INTERACTIVE),
+                ("d", 2, 2, INTERACTIVE),
+                ("e", 3, 1, INTERACTIVE),
+            ],
+        )
+
+        self.assertEqual(state.get_queue_position("c"), 1)
+        self.assertEqual(state.get_queue_position("e"), 2)
+        # c and e wait for another engine
+        self.assertEqual(state.get_queue_position("d"), 1)
+
+    def test_get_queue_position_per_user(self):
+        state = QuerySchedulerState(max_running_per_user=1)
+        self.admit_all(
+            state,
+            [
+                ("a", 1, 1, INTERACTIVE),
+                ("b", 2, 1, INTERACTIVE),
+                ("c", 1, 1, INTERACTIVE),
+                ("d", 2, 2, INTERACTIVE),
+                ("e", 1, 2, INTERACTIVE),
+            ],
+        )
+
+        self.assertEqual(state.get_queue_position("c"), 1)
+        self.assertEqual(state.get_queue_position("d"), 1)
+        self.assertEqual(state.get_queue_position("e"), 2)
+
+    def test_expire_waiting_jobs(self):
+        state = QuerySchedulerState(max_running=1)
+        self.assertTrue(state.admit("a", 1, 1, INTERACTIVE, 0))
+        self.assertFalse(state.admit("b", 1, 1, INTERACTIVE, 0))
+        self.assertFalse(
+            state.admit("c", 2, 1, INTERACTIVE, WAITING_JOB_EXPIRATION + 1)
+        )
+        self.assertNotIn("b", state.waiting)
+
+    def test_expire_running_jobs(self):
+        state = QuerySchedulerState(max_running=2)
+        self.assertTrue(state.admit("a", 1, 1, INTERACTIVE, 0))
+        self.assertTrue(state.admit("b", 2, 1, INTERACTIVE, 0))
+        state.touch("a", RUNNING_JOB_EXPIRATION)
+
+        self.assertTrue(state.admit("c", 3, 1, INTERACTIVE, RUNNING_JOB_EXPIRATION + 1))
+        self.assertEqual(set(state.running.keys()), set(["a", "c"]))
+
+    def test_to_dict(self):
+        state = QuerySchedulerState(max_running=1)
+        state.admit("a", 1, 1, INTERACTIVE, 0)
+        state.admit("b", 1, 1, INTERACTIVE, 0)
+
+        restored_state = QuerySchedulerState(state.to_dict(), max_running=1)
+        self.assertEqual(list(restored_state.running.keys()), ["a"])
+        self.assertEqual(list(restored_state.waiting.keys()), ["b"])
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    @contextmanager
+    def lock(self, name, timeout=None):
+        yield
+
+
+class QuerySchedulerTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+        settings_patch = mock.patch(
+            "lib.query_executor.query_scheduler.QuerybookSettings"
+        )
+        self.settings = settings_patch.start()
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING = 1
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING_PER_USER = 0
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING_PER_ENGINE = 0
+        self.addCleanup(settings_patch.stop)
+
+    def test_admit_and_release(self):
+        self.assertEqual(
+            try_admit_job("a", 1, 1, INTERACTIVE, redis_conn=self.redis), (True, None)
+        )
+        self.assertEqual(
+            try_admit_job("b", 1, 1, INTERACTIVE, redis_conn=self.redis), (False, 1)
+        )
+
+        release_job("a", redis_conn=self.redis)
+        self.assertEqual(
+            try_admit_job("b", 1, 1, INTERACTIVE, redis_conn=self.redis), (True, None)
+        )
+
+    def test_touch_job(self):
+        try_admit_job("a", 1, 1, INTERACTIVE, now=0, redis_conn=self.redis)
+        touch_job("a", now=RUNNING_JOB_EXPIRATION, redis_conn=self.redis)
+
+        self.assertEqual(
+            try_admit_job(
+                "b",
+                1,
+                1,
+                INTERACTIVE,
+                now=RUNNING_JOB_EXPIRATION + 1,
+                redis_conn=self.redis,
+            ),
+            (False, 1),
+        )
+        self.assertEqual(
+            try_admit_job(
+                "b",
+                1,
+                1,
+                INTERACTIVE,
+                now=2 * RUNNING_JOB_EXPIRATION + 1,
+                redis_conn=self.redis,
+            ),
+            (True, None),
+        )
+
+    def test_job_heartbeat(self):
+        with mock.patch.object(
+            query_scheduler, "RUNNING_JOB_HEARTBEAT_INTERVAL", 0.01
+        ), mock.patch.object(query_scheduler, "touch_job") as mock_touch_job:
+            query_scheduler._start_job_heartbeat("a")
+            time.sleep(0.1)
+            release_job("a", redis_conn=self.redis)
+            touch_count = mock_touch_job.call_count
+            time.sleep(0.05)
+
+        self.assertGreater(touch_count, 0)
+        mock_touch_job.assert_called_with("a")
+        # No more touches once released
+        self.assertEqual(mock_touch_job.call_count, touch_count)
+
+    def test_disabled(self):
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING = 0
+        redis = mock.Mock()
+
+        self.assertEqual(
+            try_admit_job("a", 1, 1, INTERACTIVE, redis_conn=redis), (True, None)
+        )
+        self.assertEqual(
+            try_admit_job("b", 1, 1, INTERACTIVE, redis_conn=redis), (True, None)
+        )
+        redis.lock.assert_not_called()
+
+    def test_engine_max_running(self):
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING = 0
+
+        self.assertEqual(
+            try_admit_job(
+                "a", 1, 1, INTERACTIVE, engine_max_running=1, redis_conn=self.redis
+            ),
+            (True, None),
+        )
+        self.assertEqual(
+            try_admit_job(
+                "b", 2, 1, INTERACTIVE, engine_max_running=1, redis_conn=self.redis
+            ),
+            (False, 1),
+        )
+
+    def test_wait_for_admission(self):
+        celery_task = mock.Mock()
+        celery_task.retry.return_value = Exception("retry")
+        on_queued = mock.Mock()
+
+        with mock.patch(
+            "lib.query_executor.query_scheduler.try_admit_job",
+            return_value=(True, None),
+        ), mock.patch(
+            "lib.query_executor.query_scheduler._start_job_heartbeat"
+        ) as mock_start_job_heartbeat:
+            self.assertTrue(
+                wait_for_admission(
+                    celery_task, "a", 1, 1, INTERACTIVE, on_queued=on_queued
+                )
+            )
+        on_queued.assert_not_called()
+        mock_start_job_heartbeat.assert_called_once_with("a")
+
+        with mock.patch(
+            "lib.query_executor.query_scheduler.try_admit_job",
+            return_value=(False, 3),
+        ):
+            with self.assertRaises(Exception):
+                wait_for_admission(
+                    celery_task, "b", 1, 1, INTERACTIVE, on_queued=on_queued
+                )
+        on_queued.assert_called_once_with(3)
+        celery_task.retry.assert_called_once()
+
+        self.settings.QUERY_SCHEDULER_MAX_RUNNING = 0
+        self.assertFalse(wait_for_admission(celery_task, "c", 1, 1, INTERACTIVE))
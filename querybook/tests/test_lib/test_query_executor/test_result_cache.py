@@ -0,0 +1,145 @@
+import datetime
+from unittest import TestCase, mock
+
+from lib.query_executor.result_cache import (
+    QueryResultCache,
+    get_statement_type,
+    is_cacheable_statement,
+)
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.values = {}
+        self.expirations = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expirations[key] = ex
+
+
+class StatementTypeTestCase(TestCase):
+    def test_get_statement_type(self):
+        self.assertEqual(get_statement_type("select 1"), "SELECT")
+        self.assertEqual(
+            get_statement_type("with a as (select 1) select * from a"), "SELECT"
+        )
+        self.assertEqual(get_statement_type("insert into a select 1"), "INSERT")
+        self.assertEqual(get_statement_type("use default"), "USE")
+        self.assertEqual(get_statement_type("-- comment\nset a=1"), "SET")
+        self.assertEqual(get_statement_type(""), None)
+
+    def test_is_cacheable_statement(self):
+        self.assertTrue(is_cacheable_statement(["select 1"]))
+        self.assertTrue(is_cacheable_statement(["use db", "set a=1", "select 1"]))
+        self.assertFalse(is_cacheable_statement(["show tables"]))
+        self.assertFalse(is_cacheable_statement(["insert into a select 1"]))
+        self.assertFalse(
+            is_cacheable_statement(["insert into a select 1", "select * from a"])
+        )
+        self.assertFalse(is_cacheable_statement(["delete from a", "select * from a"]))
+
+
+class QueryResultCacheTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.result_cache = QueryResultCache(
+            engine_id=1,
+            metastore_id=2,
+            language="presto",
+            client_setting={"proxy_user": "alice"},
+            ttl=600,
+        )
+
+        get_table_by_name_patch = mock.patch(
+            "lib.query_executor.result_cache.m_logic.get_table_by_name",
+            return_value=None,
+        )
+        self.get_table_by_name_mock = get_table_by_name_patch.start()
+        self.addCleanup(get_table_by_name_patch.stop)
+
+    def set_result(self, statements, started_at=1000.0):
+        self.result_cache.set_statement_result(
+            statements,
+            statement_execution_id=10,
+            started_at=started_at,
+            result_path="s3://bucket/result.csv",
+            result_row_count=5,
+            result_truncated=False,
+            redis_conn=self.redis,
+        )
+
+    def get_result(self, statements, result_cache=None):
+        return (result_cache or self.result_cache).get_statement_result(
+            statements, redis_conn=self.redis, session=mock.Mock()
+        )
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.get_result(["select * from db.a"]))
+
+        self.set_result(["select * from db.a"])
+        self.assertEqual(list(self.redis.expirations.values()), [600])
+        self.assertEqual(
+            self.get_result(["select * from db.a"]),
+            {
+                "statement_execution_id": 10,
+                "started_at": 1000.0,
+                "result_path": "s3://bucket/result.csv",
+                "result_row_count": 5,
+                "result_truncated": False,
+            },
+        )
+
+    def test_normalized_statement(self):
+        self.set_result(["select * from db.a"])
+        self.assertIsNotNone(
+            self.get_result(["-- Get all rows\nSELECT *\n    FROM db.a;"])
+        )
+        self.assertIsNone(self.get_result(["select * from db.b"]))
+        self.assertIsNone(self.get_result(["use db", "select * from db.a"]))
+
+    def test_different_engine_user(self):
+        self.set_result(["select * from db.a"])
+        other_user_result_cache = QueryResultCache(
+            engine_id=1,
+            metastore_id=2,
+            language="presto",
+            client_setting={"proxy_user": "bob"},
+            ttl=600,
+        )
+        self.assertIsNone(
+            self.get_result(["select * from db.a"], other_user_result_cache)
+        )
+
+    def test_not_cacheable_statement(self):
+        self.set_result(["insert into db.a select 1"])
+        self.assertEqual(self.redis.values, {})
+
+    def test_statements_typed_once(self):
+        statements = ["use db", "set a=1", "select 1", "select 2"]
+        with mock.patch(
+            "lib.query_executor.result_cache.get_statement_type",
+            side_effect=get_statement_type,
+        ) as get_statement_type_mock:
+            for end_index in range(len(statements)):
+                self.get_result(statements[: end_index + 1])
+                self.set_result(statements[: end_index + 1])
+
+        self.assertEqual(get_statement_type_mock.call_count, len(statements))
+        self.assertIsNotNone(self.get_result(statements))
+
+    def test_table_updated(self):
+        started_at = datetime.datetime(2021, 1, 1, 12).timestamp()
+        self.set_result(["select * from db.a"], started_at=started_at)
+
+        table = mock.Mock(table_updated_at=datetime.datetime(2021, 1, 1, 11))
+        self.get_table_by_name_mock.return_value = table
+        self.assertIsNotNone(self.get_result(["select * from db.a"]))
+        args, _ = self.get_table_by_name_mock.call_args
+        self.assertEqual(args, ("db", "a", 2))
+
+        table.table_updated_at = datetime.datetime(2021, 1, 1, 13)
+        self.assertIsNone(self.get_result(["select * from db.a"]))
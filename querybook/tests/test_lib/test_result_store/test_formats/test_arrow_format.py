@@ -0,0 +1,203 @@
+import datetime
+from unittest import TestCase, mock
+
+from lib.result_store.formats import (
+    ALL_RESULT_FORMATS,
+    get_result_format_by_uri,
+    get_upload_result_format,
+)
+from lib.result_store.formats import arrow_format
+from lib.result_store.formats.arrow_format import ArrowResultFormat
+
+
+class MockBinaryUploader(object):
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data: bytes) -> bool:
+        assert isinstance(data, bytes)
+        self.chunks.append(data)
+        return True
+
+
+class MockLimitedBinaryUploader(MockBinaryUploader):
+    def __init__(self, max_writes: int):
+        super(MockLimitedBinaryUploader, self).__init__()
+        self._max_writes = max_writes
+
+    def write(self, data: bytes) -> bool:
+        if len(self.chunks) >= self._max_writes:
+            return False
+        return super(MockLimitedBinaryUploader, self).write(data)
+
+
+class MockBinaryReader(object):
+    def __init__(self, raw: bytes, chunk_size=7):
+        self._raw = raw
+        self._chunk_size = chunk_size
+
+    def get_bytes_iter(self):
+        for i in range(0, len(self._raw), self._chunk_size):
+            yield self._raw[i : i + self._chunk_size]
+
+
+class MockStreamReader(MockBinaryReader):
+    """Same as the S3 reader, the result can only be read once"""
+
+    def __init__(self, raw: bytes):
+        super(MockStreamReader, self).__init__(raw)
+        self._bytes_iter = super(MockStreamReader, self).get_bytes_iter()
+
+    def get_bytes_iter(self):
+        return self._bytes_iter
+
+
+def write_arrow_result(columns, rows):
+    uploader = MockBinaryUploader()
+    writer = ArrowResultFormat().get_writer(uploader)
+    writer.write_columns(columns)
+    for row in rows:
+        writer.write_row(row)
+    writer.end()
+    return b"".join(uploader.chunks)
+
+
+def read_arrow_result(raw: bytes, number_of_lines=None):
+    return list(
+        ArrowResultFormat().get_csv_iter(MockBinaryReader(raw), number_of_lines)
+    )
+
+
+class ArrowResultFormatTestCase(TestCase):
+    def test_simple_round_trip(self):
+        raw = write_arrow_result(
+            ["id", "name", "score"], [[1, "foo", 0.5], [2, "bar", 1.25]]
+        )
+        self.assertEqual(
+            read_arrow_result(raw),
+            [["id", "name", "score"], ["1", "foo", "0.5"], ["2", "bar", "1.25"]],
+        )
+
+    def test_same_strings_as_csv(self):
+        rows = [
+            [
+                True,
+                None,
+                datetime.date(2020, 1, 2),
+                datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+                [1, 2],
+                {"a": 1},
+                "中文",
+            ],
+            [False, "null", None, None, None, None, None],
+        ]
+        raw = write_arrow_result(["a", "b", "c", "d", "e", "f", "g"], rows)
+        self.assertEqual(
+            read_arrow_result(raw)[1:],
+            [
+                [
+                    "true",
+                    "null",
+                    "2020-01-02",
+                    "2020-01-02T03:04:05.000006",
+                    "[1, 2]",
+                    '{"a": 1}',
+                    "中文",
+                ],
+                ["false", "null", "null", "null", "null", "null", "null"],
+            ],
+        )
+
+    def test_duplicate_column_names(self):
+        raw = write_arrow_result(["id", "id"], [[1, "a"]])
+        self.assertEqual(read_arrow_result(raw), [["id", "id"], ["1", "a"]])
+
+    def test_empty_result(self):
+        raw = write_arrow_result(["foo", "bar"], [])
+        self.assertEqual(read_arrow_result(raw), [["foo", "bar"]])
+
+    def test_schema_change_between_batches(self):
+        with mock.patch.object(arrow_format, "ARROW_RECORD_BATCH_SIZE", 2):
+            rows = [[1], [None], [None], ["a"], [2**70]]
+            raw = write_arrow_result(["col"], rows)
+        self.assertEqual(
+            read_arrow_result(raw),
+            [["col"], ["1"], ["null"], ["null"], ["a"], [str(2**70)]],
+        )
+
+    def test_number_of_lines(self):
+        with mock.patch.object(arrow_format, "ARROW_RECORD_BATCH_SIZE", 3):
+            raw = write_arrow_result(["col"], [[i] for i in range(10)])
+
+        self.assertEqual(read_arrow_result(raw, 0), [])
+        self.assertEqual(read_arrow_result(raw, 1), [["col"]])
+        self.assertEqual(
+            read_arrow_result(raw, 5), [["col"], ["0"], ["1"], ["2"], ["3"]]
+        )
+        self.assertEqual(len(read_arrow_result(raw, 100)), 11)
+
+    def test_truncated_result(self):
+        with mock.patch.object(arrow_format, "ARROW_RECORD_BATCH_SIZE", 2):
+            raw = write_arrow_result(["col"], [[i] for i in range(10)])
+        result = read_arrow_result(raw[: len(raw) // 2])
+        self.assertEqual(result[0], ["col"])
+        self.assertEqual(result[1:], [[str(i)] for i in range(len(result) - 1)])
+
+    def test_write_rows_over_limit(self):
+        uploader = MockLimitedBinaryUploader(max_writes=1)
+        with mock.patch.object(arrow_format, "ARROW_RECORD_BATCH_SIZE", 3):
+            writer = ArrowResultFormat().get_writer(uploader)
+            writer.write_columns(["col"])
+            self.assertEqual(writer.write_rows([[0], [1]]), 2)
+            # Only the first batch (rows 0 to 2) is uploaded
+            self.assertEqual(writer.write_rows([[i] for i in range(2, 10)]), 1)
+            writer.end()
+
+        self.assertEqual(
+            read_arrow_result(b"".join(uploader.chunks)),
+            [["col"], ["0"], ["1"], ["2"]],
+        )
+
+    def test_read_rows(self):
+        with mock.patch.object(arrow_format, "ARROW_RECORD_BATCH_SIZE", 3):
+            raw = write_arrow_result(["col"], [[i] for i in range(10)])
+
+        self.assertEqual(
+            ArrowResultFormat().read_rows(MockStreamReader(raw), 4, 3),
+            [["4"], ["5"], ["6"]],
+        )
+        self.assertEqual(
+            ArrowResultFormat().read_rows(
+                MockStreamReader(raw), 8, 5, with_columns=True
+            ),
+            [["col"], ["8"], ["9"]],
+        )
+
+
+class GetResultFormatTestCase(TestCase):
+    def test_get_result_format_by_uri(self):
+        self.assertEqual(
+            get_result_format_by_uri("querybook_temp/1/result.arrow").format_name,
+            "arrow",
+        )
+        self.assertEqual(
+            get_result_format_by_uri("querybook_temp/1/result.csv").format_name,
+            "csv",
+        )
+        self.assertEqual(
+            get_result_format_by_uri("querybook_temp/1/log.txt").format_name, "csv"
+        )
+
+    def test_binary_format_fallback(self):
+        with mock.patch("lib.result_store.formats.QuerybookSettings") as mock_settings:
+            mock_settings.RESULT_STORE_FORMAT = "arrow"
+
+            mock_settings.RESULT_STORE_TYPE = "s3"
+            self.assertEqual(get_upload_result_format(), ALL_RESULT_FORMATS["arrow"])
+
+            mock_settings.RESULT_STORE_TYPE = "db"
+            self.assertEqual(get_upload_result_format(), ALL_RESULT_FORMATS["csv"])
+
+            mock_settings.RESULT_STORE_FORMAT = "parquet"
+            with self.assertRaises(ValueError):
+                get_upload_result_format()
@@ -0,0 +1,103 @@
+from unittest import TestCase, mock
+
+from lib.result_store.formats import csv_format
+from lib.result_store.formats.csv_format import CSVResultFormat
+
+
+class MockLimitedUploader(object):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.data = ""
+
+    def write(self, data: str) -> bool:
+        if len(self.data) + len(data) > self.max_size:
+            return False
+        self.data += data
+        return True
+
+
+class CSVResultWriterTestCase(TestCase):
+    def test_write_rows(self):
+        uploader = MockLimitedUploader(100)
+        writer = CSVResultFormat().get_writer(uploader)
+
+        self.assertTrue(writer.write_columns(["foo", "bar"]))
+        self.assertEqual(writer.write_rows([[1, "a"], [2, "b,c"]]), 2)
+        self.assertEqual(uploader.data, 'foo,bar\n1,a\n2,"b,c"\n')
+
+    def test_write_rows_over_limit(self):
+        uploader = MockLimitedUploader(19)
+        writer = CSVResultFormat().get_writer(uploader)
+
+        writer.write_columns(["foo", "bar"])
+        # Only the rows that fit in the limit are written
+        self.assertEqual(writer.write_rows([[1, "a"], [2, "b"], [3, "c"]]), 2)
+        self.assertEqual(uploader.data, "foo,bar\n1,a\n2,b\n")
+        self.assertEqual(writer.write_rows([[4, "d"]]), 0)
+
+
+class MockRangeReader(object):
+    def __init__(self, raw: str):
+        self._raw = raw.encode("utf-8")
+        self.byte_offsets = []
+
+    def get_csv_iter(self, number_of_lines):
+        rows = [line.split(",") for line in self._raw.decode("utf-8").splitlines()]
+        return iter(rows[:number_of_lines])
+
+    def get_bytes_iter(self, byte_offset=0):
+        self.byte_offsets.append(byte_offset)
+        for i in range(byte_offset, len(self._raw), 5):
+            yield self._raw[i : i + 5]
+
+
+class CSVRowIndexTestCase(TestCase):
+    def setUp(self):
+        interval_patch = mock.patch.object(csv_format, "ROW_INDEX_INTERVAL", 3)
+        interval_patch.start()
+        self.addCleanup(interval_patch.stop)
+
+        self.uploader = MockLimitedUploader(1000)
+        self.writer = CSVResultFormat().get_writer(self.uploader)
+        self.writer.write_columns(["col", "value"])
+        self.writer.write_rows([[i, "中文"] for i in range(4)])
+        self.writer.write_rows([[i, "中文"] for i in range(4, 10)])
+
+    def test_row_index(self):
+        raw = self.uploader.data.encode("utf-8")
+        self.assertEqual([row for row, _ in self.writer.row_index], [0, 3, 6, 9])
+        for row_number, bytes_offset in self.writer.row_index:
+            self.assertTrue(raw[bytes_offset:].startswith(b"%d," % row_number))
+
+    def test_read_rows_with_index(self):
+        reader = MockRangeReader(self.uploader.data)
+        self.assertEqual(
+            CSVResultFormat().read_rows(reader, 7, 2, self.writer.row_index),
+            [["7", "中文"], ["8", "中文"]],
+        )
+        # Starts reading at the row 6
+        self.assertEqual(reader.byte_offsets, [self.writer.row_index[2][1]])
+
+        self.assertEqual(
+            CSVResultFormat().read_rows(reader, 9, 5, self.writer.row_index),
+            [["9", "中文"]],
+        )
+
+    def test_read_rows_without_index(self):
+        reader = MockRangeReader(self.uploader.data)
+        self.assertEqual(
+            CSVResultFormat().read_rows(reader, 2, 2),
+            [["2", "中文"], ["3", "中文"]],
+        )
+        self.assertEqual(reader.byte_offsets, [])
+
+    def test_read_rows_with_columns(self):
+        reader = MockRangeReader(self.uploader.data)
+        for row_index in (None, self.writer.row_index):
+            with self.subTest(row_index=row_index):
+                self.assertEqual(
+                    CSVResultFormat().read_rows(
+                        reader, 7, 1, row_index, with_columns=True
+                    ),
+                    [["col", "value"], ["7", "中文"]],
+                )
@@ -0,0 +1,102 @@
+from unittest import TestCase, mock
+
+from lib.result_store import preview_cache
+from lib.utils.cache import SizedLRUCache
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class PreviewCacheTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+        local_cache_patch = mock.patch.object(
+            preview_cache, "_local_preview_cache", SizedLRUCache(1024)
+        )
+        local_cache_patch.start()
+        self.addCleanup(local_cache_patch.stop)
+
+        expiration_patch = mock.patch.object(
+            preview_cache.QuerybookSettings, "RESULT_PREVIEW_CACHE_EXPIRATION", 60
+        )
+        expiration_patch.start()
+        self.addCleanup(expiration_patch.stop)
+
+        redis_patch = mock.patch(
+            "clients.redis_client.get_redis", return_value=self.redis
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+
+    def test_get_set(self):
+        result = [["a", "b"], ["1", "2"]]
+        self.assertIsNone(
+            preview_cache.get_result_preview(1, 10, redis_conn=self.redis)
+        )
+
+        preview_cache.set_result_preview(1, 10, result, redis_conn=self.redis)
+        self.assertEqual(
+            preview_cache.get_result_preview(1, 10, redis_conn=self.redis), result
+        )
+        # Different limits are cached separately
+        self.assertIsNone(
+            preview_cache.get_result_preview(1, 100, redis_conn=self.redis)
+        )
+
+    def test_get_from_redis(self):
+        result = [["a", "b"], ["1", "2"]]
+        preview_cache.set_result_preview(1, 10, result, redis_conn=self.redis)
+        preview_cache._local_preview_cache.delete(
+            preview_cache.get_preview_cache_key(1, 10)
+        )
+
+        self.assertEqual(
+            preview_cache.get_result_preview(1, 10, redis_conn=self.redis), result
+        )
+
+    def test_disabled(self):
+        with mock.patch.object(
+            preview_cache.QuerybookSettings, "RESULT_PREVIEW_CACHE_EXPIRATION", 0
+        ):
+            preview_cache.set_result_preview(1, 10, [["a"]], redis_conn=self.redis)
+            self.assertEqual(self.redis.values, {})
+            self.assertIsNone(
+                preview_cache.get_result_preview(1, 10, redis_conn=self.redis)
+            )
+
+    def test_upload_preview(self):
+        collector = preview_cache.ResultPreviewCollector(2)
+        collector.add_columns(["a", "b"])
+        collector.add_rows([[1, None], ["x", 1.5], ["y", 2]])
+        collector.save(1)
+
+        self.assertEqual(
+            preview_cache.get_result_preview(1, 1, redis_conn=self.redis),
+            [["a", "b"], ["1", "null"]],
+        )
+        self.assertEqual(
+            preview_cache.get_result_preview(1, 2, redis_conn=self.redis),
+            [["a", "b"], ["1", "null"], ["x", "1.5"]],
+        )
+        # Rows after the preview are not cached
+        self.assertIsNone(preview_cache.get_result_preview(1, 3, redis_conn=self.redis))
+
+    def test_complete_upload_preview(self):
+        collector = preview_cache.ResultPreviewCollector(10)
+        collector.add_columns(["a"])
+        collector.add_rows([["x"], ["y"]])
+        collector.save(1)
+
+        self.assertEqual(
+            preview_cache.get_result_preview(1, 1000, redis_conn=self.redis),
+            [["a"], ["x"], ["y"]],
+        )
@@ -1,5 +1,5 @@
 from unittest import TestCase, mock
-from lib.result_store.stores.db_store import DBReader
+from lib.result_store.stores.db_store import DBReader, encode_compressed_value
 
 MOCK_RAW_CSV = 'foo,bar,baz\n"hello "" world","foo \t bar",","\n'
 MOCK_CSV = [["foo", "bar", "baz"], ['hello " world', "foo \t bar", ","]]
@@ -7,7 +7,11 @@ MOCK_CSV = [["foo", "bar", "baz"], ['hello " world', "foo \t bar", ","]]
 
 def mock_get_key_value_store(key: str):
     key_value_store_mock = mock.MagicMock()
-    key_value_store_mock.value = MOCK_RAW_CSV
+    key_value_store_mock.value = (
+        encode_compressed_value(MOCK_RAW_CSV, "gzip")
+        if key.endswith(".gz")
+        else MOCK_RAW_CSV
+    )
     return key_value_store_mock
 
 
@@ -35,3 +39,7 @@ class DBReaderTestCase(TestCase):
     def test_read_csv_num_less_than_file_length(self):
         with DBReader("test") as reader:
             self.assertEqual(reader.read_csv(number_of_lines=1), MOCK_CSV[:1])
+
+    def test_read_compressed(self):
+        with DBReader("test.csv.gz") as reader:
+            self.assertEqual(reader.read_csv(number_of_lines=None), MOCK_CSV)
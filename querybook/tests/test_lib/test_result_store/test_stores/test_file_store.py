@@ -102,3 +102,8 @@ class FileReaderTestCase(TestCase):
         with mock.patch("builtins.open", mock.mock_open(read_data=self.mock_raw_csv)):
             reader = FileReader("test")
             self.assertEqual(reader.read_csv(None), self.mock_csv)
+
+    def test_get_raw_iter(self):
+        with mock.patch("builtins.open", mock.mock_open(read_data=self.mock_raw_csv)):
+            reader = FileReader("test")
+            self.assertEqual("".join(reader.get_raw_iter()), self.mock_raw_csv)
@@ -1,5 +1,6 @@
 from unittest import TestCase, mock
 from env import QuerybookSettings
+from clients.s3_client import MultiPartUploader
 from lib.result_store.stores.s3_store import S3Reader
 
 
@@ -28,3 +29,54 @@ class S3FileReaderTestCase(TestCase):
             self.s3_file_reader_mock.assert_called_once_with(
                 QuerybookSettings.STORE_BUCKET_NAME, reader.uri, max_read_size=5
             )
+
+
+class MultiPartUploaderTestCase(TestCase):
+    def setUp(self):
+        boto3_client_patch = mock.patch("clients.s3_client.boto3.client")
+        self.addCleanup(boto3_client_patch.stop)
+        self.s3_mock = boto3_client_patch.start().return_value
+        self.s3_mock.create_multipart_upload.return_value = {"UploadId": "upload"}
+        self.s3_mock.upload_part.side_effect = lambda **kwargs: {
+            "ETag": '"etag%d"' % kwargs["PartNumber"]
+        }
+
+        chunk_size_patch = mock.patch.object(
+            QuerybookSettings, "STORE_MIN_UPLOAD_CHUNK_SIZE", 2
+        )
+        self.addCleanup(chunk_size_patch.stop)
+        chunk_size_patch.start()
+
+    def test_parts_completed_in_order(self):
+        uploader = MultiPartUploader("bucket", "key")
+        for data in ["abc", "def", "ghi", "j"]:
+            self.assertTrue(uploader.write(data))
+        uploader.complete()
+
+        uploaded_parts = {
+            kwargs["PartNumber"]: kwargs["Body"]
+            for _, kwargs in self.s3_mock.upload_part.call_args_list
+        }
+        self.assertEqual(uploaded_parts, {1: b"abc", 2: b"def", 3: b"ghi", 4: b"j"})
+        self.s3_mock.complete_multipart_upload.assert_called_once_with(
+            Bucket="bucket",
+            Key="key",
+            UploadId="upload",
+            MultipartUpload={
+                "Parts": [{"PartNumber": i, "ETag": "etag%d" % i} for i in range(1, 5)]
+            },
+        )
+
+    def test_failed_part_aborts_upload(self):
+        self.s3_mock.upload_part.side_effect = Exception("upload failed")
+
+        uploader = MultiPartUploader("bucket", "key")
+        with self.assertRaises(Exception):
+            for data in ["abc", "def", "ghi"]:
+                uploader.write(data)
+            uploader.complete()
+
+        self.s3_mock.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="key", UploadId="upload"
+        )
+        self.s3_mock.complete_multipart_upload.assert_not_called()
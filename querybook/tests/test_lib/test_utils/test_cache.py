@@ -0,0 +1,37 @@
+from lib.utils.cache import SizedLRUCache
+
+
+def test_sized_lru_cache_get_set():
+    cache = SizedLRUCache(10)
+    assert cache.get("a") is None
+
+    cache.set("a", [1], 4)
+    assert cache.get("a") == [1]
+
+    cache.set("a", [2], 4)
+    assert cache.get("a") == [2]
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_sized_lru_cache_evicts_least_recently_used():
+    cache = SizedLRUCache(10)
+    cache.set("a", 1, 4)
+    cache.set("b", 2, 4)
+    # "a" becomes the most recently used
+    cache.get("a")
+    cache.set("c", 3, 4)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_sized_lru_cache_skips_large_values():
+    cache = SizedLRUCache(10)
+    cache.set("a", 1, 4)
+    cache.set("b", 2, 11)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
@@ -0,0 +1,86 @@
+from io import BytesIO
+from unittest import TestCase
+
+from lib.utils.compression import (
+    DecompressedFileIO,
+    StreamCompressor,
+    StreamDecompressor,
+    add_compression_extension,
+    compress,
+    decompress,
+    get_compression_by_uri,
+    remove_compression_extension,
+)
+
+MOCK_CSV = 'foo,bar\n"中文",1\n' * 1000
+
+
+class CompressionExtensionTestCase(TestCase):
+    def test_add_compression_extension(self):
+        self.assertEqual(add_compression_extension("result.csv", None), "result.csv")
+        self.assertEqual(
+            add_compression_extension("result.csv", "gzip"), "result.csv.gz"
+        )
+        self.assertEqual(
+            add_compression_extension("result.arrow", "zstd"), "result.arrow.zst"
+        )
+        with self.assertRaises(ValueError):
+            add_compression_extension("result.csv", "brotli")
+
+    def test_get_compression_by_uri(self):
+        self.assertEqual(get_compression_by_uri("1/result.csv"), None)
+        self.assertEqual(get_compression_by_uri("1/result.csv.gz"), "gzip")
+        self.assertEqual(get_compression_by_uri("1/result.csv.zst"), "zstd")
+
+    def test_remove_compression_extension(self):
+        self.assertEqual(remove_compression_extension("1/result.csv"), "1/result.csv")
+        self.assertEqual(
+            remove_compression_extension("1/result.csv.gz"), "1/result.csv"
+        )
+
+
+class StreamCompressionTestCase(TestCase):
+    def _compress_in_chunks(self, compression: str, chunk_size: int) -> bytes:
+        compressor = StreamCompressor(compression)
+        compressed = [
+            compressor.compress(MOCK_CSV[i : i + chunk_size])
+            for i in range(0, len(MOCK_CSV), chunk_size)
+        ]
+        compressed.append(compressor.flush())
+        return b"".join(compressed)
+
+    def test_round_trip(self):
+        for compression in ["gzip", "zstd"]:
+            compressed = self._compress_in_chunks(compression, 100)
+            self.assertLess(len(compressed), len(MOCK_CSV))
+            self.assertEqual(
+                decompress(compressed, compression).decode("utf-8"), MOCK_CSV
+            )
+            self.assertEqual(
+                decompress(compress(MOCK_CSV, compression), compression),
+                MOCK_CSV.encode("utf-8"),
+            )
+
+    def test_decompress_in_chunks(self):
+        for compression in ["gzip", "zstd"]:
+            compressed = self._compress_in_chunks(compression, 1000)
+            decompressor = StreamDecompressor(compression)
+            decompressed = [
+                decompressor.decompress(compressed[i : i + 7])
+                for i in range(0, len(compressed), 7)
+            ]
+            decompressed.append(decompressor.flush())
+            self.assertEqual(b"".join(decompressed), MOCK_CSV.encode("utf-8"))
+
+    def test_truncated_file(self):
+        for compression in ["gzip", "zstd"]:
+            compressed = self._compress_in_chunks(compression, 1000)
+            decompressed = decompress(compressed[: len(compressed) // 2], compression)
+            self.assertTrue(MOCK_CSV.encode("utf-8").startswith(decompressed))
+
+    def test_decompressed_file_io(self):
+        for compression in ["gzip", "zstd"]:
+            compressed_file = BytesIO(compress(MOCK_CSV, compression))
+            with DecompressedFileIO(compressed_file, compression) as file:
+                self.assertEqual(file.read(), MOCK_CSV.encode("utf-8"))
+            self.assertTrue(compressed_file.closed)
@@ -1,7 +1,12 @@
 import datetime
 from unittest import TestCase
 
-from lib.utils.csv import serialize_cell, row_to_csv, csv_sniffer, split_csv_to_chunks
+from lib.utils.csv import (
+    serialize_cell,
+    row_to_csv,
+    rows_to_csv,
+    CSVRowEndFinder,
+)
 
 
 class SerializeCellTestCase(TestCase):
@@ -45,19 +50,70 @@ class RowToCSVTestCase(TestCase):
         self.assertEqual(row_to_csv(quote_row), '123,"Hello""World",123\n')
 
 
-class CSVSnifferTestCase(TestCase):
+class RowsToCSVTestCase(TestCase):
+    def assert_same_as_row_to_csv(self, rows):
+        self.assertEqual(rows_to_csv(rows), "".join(map(row_to_csv, rows)))
+
+    def test_simple_case(self):
+        rows = [["Hello World", 1234, 0.5, "中文"], ["Foo", 5678, 1.5, "Bar"]]
+        self.assertEqual(
+            rows_to_csv(rows), "Hello World,1234,0.5,中文\nFoo,5678,1.5,Bar\n"
+        )
+        self.assertEqual(rows_to_csv([]), "")
+
+    def test_string_escape(self):
+        rows = [[123, "Hello\nWorld"], [456, "Hello,World"], [789, 'Hello"World']]
+        self.assert_same_as_row_to_csv(rows)
+
+    def test_typed_columns_with_null(self):
+        rows = [
+            [
+                1,
+                0.5,
+                True,
+                "foo",
+                datetime.date(2020, 1, 2),
+                datetime.datetime(2020, 1, 2, 3, 4, 5),
+                None,
+            ],
+            [None, float("nan"), None, None, None, None, None],
+        ]
+        self.assert_same_as_row_to_csv(rows)
+
+    def test_mixed_columns(self):
+        rows = [
+            [1, "foo", [1, 2], {"a": ","}],
+            ["bar", 2.5, {}, None],
+            [False, "baz,", b"bytes", 2**70],
+        ]
+        self.assert_same_as_row_to_csv(rows)
+
+    def test_different_row_length(self):
+        self.assert_same_as_row_to_csv([[1, 2], [3], []])
+
+
+class CSVRowEndFinderTestCase(TestCase):
+    def find_last_row_end(self, data):
+        return CSVRowEndFinder().find_last_row_end("\n".join(data))
+
     def test_simple_csv(self):
         data = ["foo,bar", '"1", """"', '3, "4"""']
-        self.assertEqual(csv_sniffer(data), 2)
+        self.assertEqual(self.find_last_row_end(data), len("foo,bar\n" + '"1", """"'))
 
     def test_simple_csv_with_new_line(self):
-        data = ["foo,bar", '"', '1", """', '"', '3, "4"""']  # Line start  # Line End
-
-        self.assertEqual(csv_sniffer(data), 4)
+        data = [
+            "foo,bar",
+            '"',
+            '1", """',
+            '"',
+            '3, "4"""',
+            "",
+        ]  # Line start  # Line End
+        self.assertEqual(self.find_last_row_end(data), len("\n".join(data)) - 1)
 
     def test_last_line_invalid(self):
-        data = ["foo,bar", '"1", """"', '3, "']
-        self.assertEqual(csv_sniffer(data), 1)
+        data = ["foo,bar", '"1", """"', '3, "', ""]
+        self.assertEqual(self.find_last_row_end(data), len("foo,bar\n" + '"1", """"'))
 
     def test_multi_invalid_lines(self):
         data = [
@@ -67,27 +123,20 @@ class CSVSnifferTestCase(TestCase):
             '4, 5, 6 ""',
             "7, 8, 9",  # Cell continued
         ]
-        self.assertEqual(csv_sniffer(data), 1)
+        self.assertEqual(self.find_last_row_end(data), len("foo,bar\n" + '"1", """"'))
 
     def test_entire_partial_csv(self):
         data = ['foo, "bar ,', '"" baz ,', "boo"]
-        self.assertIsNone(csv_sniffer(data))
-
-    def test_invalid_csv(self):
-        data = ["foo, bar", "1, 2,3"]
-        with self.assertRaises(ValueError):
-            csv_sniffer(data)
-
-
-class SplitCSVToChunksTestCase(TestCase):
-    def test_simple_csv(self):
-        data = ["foo,bar", '"1", """"', '3, "4"""']
-        self.assertEqual(split_csv_to_chunks(data), (data, []))
-
-    def test_simple_csv_partial(self):
-        data = ["foo,bar", '"1", " 2 "', '3, "4']
-        self.assertEqual(split_csv_to_chunks(data), (data[:2], data[2:]))
-
-    def test_simple_csv_entire_partial(self):
-        data = ['"foo,bar', "1, 2", "3, 4"]
-        self.assertEqual(split_csv_to_chunks(data), ([], data))
+        self.assertEqual(self.find_last_row_end(data), -1)
+
+    def test_state_across_chunks(self):
+        finder = CSVRowEndFinder()
+        self.assertEqual(finder.find_last_row_end('a,"b\n'), -1)
+        self.assertTrue(finder.is_inside_cell)
+        self.assertEqual(finder.find_last_row_end('c""\n'), -1)
+        self.assertEqual(finder.find_last_row_end('"\nd,e\nf'), 5)
+        self.assertFalse(finder.is_inside_cell)
+
+    def test_bytes_chunk(self):
+        finder = CSVRowEndFinder()
+        self.assertEqual(finder.find_last_row_end(b'a,"b\n"\nc'), 6)
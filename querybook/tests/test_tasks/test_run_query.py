@@ -0,0 +1,95 @@
+from unittest import TestCase, mock
+
+from celery.exceptions import Retry
+
+from const.query_execution import QueryExecutionPriority, QueryExecutionStatus
+from tasks.run_query import run_query_task, wait_for_query_execution_admission
+
+
+class WaitForQueryExecutionAdmissionTestCase(TestCase):
+    def setUp(self):
+        self.query_execution = mock.Mock(
+            status=QueryExecutionStatus.INITIALIZED, engine_id=1, task_id="abc"
+        )
+        self.query_execution.to_dict.return_value = {"uid": 1, "engine_id": 1}
+
+        for name, target in (
+            ("qe_logic", "tasks.run_query.qe_logic"),
+            ("admin_logic", "tasks.run_query.admin_logic"),
+            ("release_job", "tasks.run_query.release_job"),
+            ("wait_for_admission", "tasks.run_query.wait_for_admission"),
+            ("socketio", "tasks.run_query.socketio"),
+            ("DBSession", "tasks.run_query.DBSession"),
+            ("get_engine_max_running", "tasks.run_query.get_engine_max_running"),
+        ):
+            patch = mock.patch(target)
+            setattr(self, name, patch.start())
+            self.addCleanup(patch.stop)
+
+        self.qe_logic.get_query_execution_by_id.return_value = self.query_execution
+        self.get_engine_max_running.return_value = 1
+        self.wait_for_admission.return_value = True
+
+        self.celery_task = mock.Mock()
+        self.celery_task.request.id = "abc"
+        self.celery_task.is_aborted.return_value = False
+
+    def wait(self):
+        return wait_for_query_execution_admission(
+            self.celery_task, 1, QueryExecutionPriority.INTERACTIVE
+        )
+
+    def test_admitted(self):
+        self.assertEqual(self.wait(), (False, True))
+        self.release_job.assert_not_called()
+
+    def test_cancelled_while_queued(self):
+        # The task is retried after the cancel, so it is no longer aborted
+        self.query_execution.status = QueryExecutionStatus.CANCEL
+
+        self.assertEqual(self.wait(), (True, False))
+        self.release_job.assert_called_once_with("query_execution:1")
+        self.wait_for_admission.assert_not_called()
+        self.assertEqual(self.socketio.emit.call_args[0][0], "query_cancel")
+
+
+class RunQueryTaskTestCase(TestCase):
+    def setUp(self):
+        for name, target in (
+            ("wait", "tasks.run_query.wait_for_query_execution_admission"),
+            ("create_executor", "tasks.run_query.create_executor_from_execution"),
+            ("get_final_status", "tasks.run_query.get_query_execution_final_status"),
+            ("release_job", "tasks.run_query.release_job"),
+            ("DBSession", "tasks.run_query.DBSession"),
+            ("notify", "tasks.run_query.notifiy_on_execution_completion"),
+            ("update_es", "tasks.run_query.update_query_execution_by_id"),
+        ):
+            patch = mock.patch(target)
+            setattr(self, name, patch.start())
+            self.addCleanup(patch.stop)
+
+    def test_cancelled(self):
+        self.wait.return_value = (True, False)
+        self.get_final_status.return_value = QueryExecutionStatus.CANCEL
+
+        self.assertIsNone(run_query_task.run(1))
+        self.create_executor.assert_not_called()
+        self.get_final_status.assert_called_once()
+
+    def test_queued(self):
+        self.wait.side_effect = Retry()
+
+        with self.assertRaises(Retry):
+            run_query_task.run(1)
+        self.create_executor.assert_not_called()
+        self.get_final_status.assert_not_called()
+        self.release_job.assert_not_called()
+
+    def test_admission_error(self):
+        self.wait.side_effect = Exception("redis is down")
+        self.get_final_status.return_value = QueryExecutionStatus.ERROR
+
+        run_query_task.run(1)
+        self.create_executor.assert_not_called()
+        # The query execution is set to error instead of staying initialized
+        self.assertIn("redis is down", self.get_final_status.call_args[0][2])
@@ -329,6 +329,13 @@ export const AdminQueryEngine: React.FunctionComponent<IProps> = ({
                                 options={engineStatusCheckerNames}
                                 withDeselect
                             />
+                            <SimpleField
+                                stacked
+                                name="feature_params.max_concurrent_executions"
+                                label="Max Concurrent Executions"
+                                help="Queries above the limit wait in a queue. Leave empty for no limit."
+                                type="number"
+                            />
                             <SimpleField
                                 stacked
                                 help={() => (
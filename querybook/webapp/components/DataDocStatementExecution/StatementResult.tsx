@@ -70,7 +70,10 @@ const StatementResultWithResult: React.FC<IProps> = ({
     resultLimit,
     setResultLimit,
 }) => {
-    const { result_row_count: resultRowCount } = statementExecution;
+    const {
+        result_row_count: resultRowCount,
+        result_truncated: resultTruncated,
+    } = statementExecution;
     const { data: rawData } = statementResult;
     const {
         columnNames,
@@ -128,6 +131,7 @@ const StatementResultWithResult: React.FC<IProps> = ({
             resultRowMinusColCount={resultRowMinusColCount}
             actualRowMinusColCount={actualRowMinusColCount}
             fetchedAllRows={fetchedAllRows}
+            resultTruncated={resultTruncated}
             resultLimit={resultLimit}
             setResultLimit={setResultLimit}
             isFetchingStatementResult={isFetchingStatementResult}
@@ -234,6 +238,7 @@ const FetchInfo: React.FC<{
     resultRowMinusColCount: number;
     actualRowMinusColCount: number;
     fetchedAllRows: boolean;
+    resultTruncated: boolean;
 
     resultLimit: number;
     setResultLimit: (newLimit: number) => void;
@@ -242,6 +247,7 @@ const FetchInfo: React.FC<{
     resultRowMinusColCount,
     actualRowMinusColCount,
     fetchedAllRows,
+    resultTruncated,
 
     resultLimit,
     setResultLimit,
@@ -289,6 +295,11 @@ const FetchInfo: React.FC<{
             })}
         >
             {fetchRowInfo}
+            {resultTruncated && !isFetchingStatementResult && (
+                <span className="warning-word ml4">
+                    (Result truncated at the row or size limit)
+                </span>
+            )}
         </span>
     );
 };
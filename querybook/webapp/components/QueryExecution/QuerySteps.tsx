@@ -10,6 +10,7 @@ export const QuerySteps: React.FunctionComponent<{
         task_id: taskId,
         statement_executions: statementExecutionIds,
         total,
+        queue_position: queuePosition,
     },
 }) => {
     if (status >= 3) {
@@ -25,7 +26,10 @@ export const QuerySteps: React.FunctionComponent<{
         'Finish',
     ];
 
-    if (taskId != null) {
+    if (status === QueryExecutionStatus.INITIALIZED && queuePosition != null) {
+        // Waiting for a slot of the query scheduler
+        steps[0] = `Queued (position ${queuePosition})`;
+    } else if (taskId != null) {
         // Celery have received the query
         currentStep++;
 
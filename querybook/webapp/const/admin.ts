@@ -46,6 +46,7 @@ export interface IAdminQueryEngine {
     executor_params: Record<string, any>;
     feature_params: {
         status_checker?: string;
+        max_concurrent_executions?: number;
     };
 
     environments?: IAdminEnvironment[];
@@ -54,6 +54,10 @@ export interface IQueryExecution {
     // it may have a field called total which
     // indicates the total number of statements
     total?: number;
+
+    // If the query is waiting for a slot of the query scheduler,
+    // its position in the queue
+    queue_position?: number;
 }
 
 export interface IQueryExecutionExportResult {
@@ -80,6 +84,7 @@ export interface IStatementExecution {
     error_msg?: string;
     has_log: boolean;
     result_row_count: number;
+    result_truncated?: boolean;
     statement_range_end: number;
     statement_range_start: number;
     status: number;
@@ -660,6 +660,12 @@ class QueryExecutionSocket {
             this.socket.on('query', (queryExecution: IQueryExecution) => {
                 this.processQueryExecution(queryExecution);
             });
+            this.socket.on(
+                'query_queued',
+                (queryExecution: IQueryExecution) => {
+                    this.processQueryExecution(queryExecution);
+                }
+            );
             this.socket.on('query_start', (queryExecution: IQueryExecution) => {
                 this.processQueryExecution(queryExecution);
             });